@@ -1,12 +1,42 @@
-import random, numpy as np, seaborn as sns, matplotlib.pyplot as plt
-from typing import List, Tuple
+import numpy as np
+from typing import Callable, List, NamedTuple, Optional, Tuple, Union
+from busca_local import busca_local
+from checkpoint import carregar_checkpoint, estado_criterio, estado_rng, restaurar_criterio, restaurar_rng, salvar_checkpoint
+from construcao import populacao_semeada
+from criterios import Callback, CriterioParada
+from crossover import crossover_lote, pmx_lote
+from instrumentacao import Estatisticas, ou_desligadas
+from memoizacao import CacheFitness, diversidade, novas_rotas
+from movimentos import aplicar_2opt, chaves_rotas, delta_2opt, delta_troca
+from tsplib import ler_tsplib, matriz_distancias
+from vizinhanca import DistanciasSobDemanda, vizinhos_da_matriz, vizinhos_mais_proximos
 
-# Gera uma população inicial de indivíduos
-def pop_inicial(n_pop: int, n_genes: int) -> np.ndarray:
-    pop = np.zeros((n_pop, n_genes), dtype=int)
-    for i in range(n_pop):
-        pop[i] = np.random.permutation(n_genes)
-    return pop
+# Todas as funções com sorteios recebem um numpy.random.Generator ("rng"); sem ele, um gerador novo
+# (não reprodutível) é criado. As funções principais aceitam uma semente ou um Generator em "semente".
+Semente = Union[int, np.random.Generator, None]
+
+# Estrutura de distâncias e listas de vizinhos de uma instância, montada por preparar_distancias;
+# pode ser montada uma vez e reaproveitada em várias execuções (ex.: no cache do serviço)
+class DistanciasPreparadas(NamedTuple):
+    distancias: object  # matriz n x n ou vizinhanca.DistanciasSobDemanda
+    vizinhos: Optional[np.ndarray]  # listas de candidatos da mutação (só com k_vizinhos)
+    vizinhos_busca: Optional[np.ndarray]  # listas da busca local (só no modo memético)
+
+# Gravação do estado da evolução: arquivo ".npz" e gerações entre uma gravação e outra
+class OpcoesCheckpoint(NamedTuple):
+    arquivo: str
+    intervalo: int = 50
+
+# Memoização do fitness pela rota canônica (LRU com até "capacidade_cache" rotas; None desliga) e
+# eliminação das rotas repetidas (inclusive giradas / invertidas) antes de entrarem na população
+class OpcoesMemoizacao(NamedTuple):
+    capacidade_cache: Optional[int] = None
+    eliminar_duplicatas: bool = False
+
+# Gera uma população inicial de indivíduos (todas as permutações sorteadas numa única chamada)
+def pop_inicial(n_pop: int, n_genes: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    rng = np.random.default_rng(rng)
+    return rng.permuted(np.tile(np.arange(n_genes), (n_pop, 1)), axis=1)
 
 # Avalia a adaptabilidade de um indivíduo
 def avaliar_individuo(individuo: np.ndarray, distancias: np.ndarray) -> float:
@@ -28,122 +58,329 @@ def avaliar_pop(pop: np.ndarray, distancias: np.ndarray) -> np.ndarray:
         fitness[i] = avaliar_individuo(pop[i], distancias)
     return fitness
 
-# Seleciona pais para o crossover por meio de torneio
-def selecao_pais(pop: np.ndarray, fitness: np.ndarray, n_pop: int) -> np.ndarray:
-    pais = np.zeros_like(pop)
-    for i in range(n_pop):
-        idx_1 = random.randint(0, n_pop - 1)
-        idx_2 = random.randint(0, n_pop - 1)
-        if fitness[idx_1] < fitness[idx_2]:
-            pais[i] = pop[idx_1]
-        else:
-            pais[i] = pop[idx_2]
-    return pais
+# Avalia a adaptabilidade de toda a população de uma só vez (gather + soma em NumPy)
+# A soma acumulada percorre as arestas na mesma ordem do laço de avaliar_individuo,
+# então o resultado é idêntico bit a bit ao de avaliar_pop
+def avaliar_pop_vetorizado(pop: np.ndarray, distancias: np.ndarray) -> np.ndarray:
+    arestas = distancias[pop[:, :-1], pop[:, 1:]]
+    distancia_total = np.cumsum(arestas, axis=1)[:, -1] if pop.shape[1] > 1 else np.zeros(pop.shape[0])
+    distancia_total = distancia_total + distancias[pop[:, -1], pop[:, 0]]
+    return distancia_total
+
+# Seleciona pais para o crossover por meio de torneio entre "k" indivíduos
+# Todos os competidores são sorteados de uma vez e o vencedor de cada torneio sai de um argmin por linha
+def selecao_pais(pop: np.ndarray, fitness: np.ndarray, n_pop: int, k: int = 2, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    rng = np.random.default_rng(rng)
+    competidores = rng.integers(0, pop.shape[0], size=(n_pop, k))
+    vencedores = competidores[np.arange(n_pop), np.argmin(fitness[competidores], axis=1)]
+    return pop[vencedores]
+
+# Sorteia "quantidade" pares de posições distintas (inclusive), com a primeira menor que a segunda
+def sortear_cortes(quantidade: int, n_genes: int, rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(rng)
+    ponto_corte_1 = rng.integers(0, n_genes - 1, size=quantidade)
+    ponto_corte_2 = rng.integers(ponto_corte_1 + 1, n_genes)
+    return ponto_corte_1, ponto_corte_2
 
 # Promove Partially Mapped Crossover (PMX) entre dois pais
-def crossover_pmx(pai_1: np.ndarray, pai_2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
-    n_genes = len(pai_1)
-    filho_1 = -np.ones(n_genes, dtype=int)
-    filho_2 = -np.ones(n_genes, dtype=int)
-
-    ponto_corte_1 = random.randint(0, n_genes - 2)
-    ponto_corte_2 = random.randint(ponto_corte_1 + 1, n_genes - 1)
-
-    filho_1[ponto_corte_1:ponto_corte_2+1] = pai_2[ponto_corte_1:ponto_corte_2+1]
-    filho_2[ponto_corte_1:ponto_corte_2+1] = pai_1[ponto_corte_1:ponto_corte_2+1]
-
-    def preencher_filho(filho, pai):
-        for i in range(n_genes):
-            if filho[i] == -1:
-                gene_pai = pai[i]
-                while gene_pai in filho:
-                    idx_gene_pai_filho = np.where(filho == gene_pai)[0][0]
-                    gene_pai_filho_pai = pai[idx_gene_pai_filho]
-                    gene_pai = gene_pai_filho_pai
-                filho[i] = gene_pai
-
-    preencher_filho(filho_1, pai_1)
-    preencher_filho(filho_2, pai_2)
-
-    return filho_1, filho_2
-
-# Promove crossover em toda a população
-def crossover_pop(pais: np.ndarray) -> np.ndarray:
+def crossover_pmx(pai_1: np.ndarray, pai_2: np.ndarray, rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    ponto_corte_1, ponto_corte_2 = sortear_cortes(1, len(pai_1), rng)
+    filhos_1, filhos_2 = pmx_lote(pai_1[None, :], pai_2[None, :], ponto_corte_1, ponto_corte_2)
+    return filhos_1[0], filhos_2[0]
+
+# Promove crossover em toda a população, processando todos os pares de pais de uma vez
+# "operador" pode ser 'pmx', 'ox' ou 'erx'
+def crossover_pop(pais: np.ndarray, operador: str = 'pmx', rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    rng = np.random.default_rng(rng)
     n_pop, n_genes = pais.shape
     filhos = np.zeros_like(pais)
-    for i in range(0, n_pop, 2):
-        pai_1 = pais[i]
-        pai_2 = pais[i + 1]
-        filho_1, filho_2 = crossover_pmx(pai_1, pai_2)
-        filhos[i] = filho_1
-        filhos[i + 1] = filho_2
+    cortes_1, cortes_2 = sortear_cortes(n_pop // 2, n_genes, rng)
+    filhos[0::2], filhos[1::2] = crossover_lote(pais[0::2], pais[1::2], cortes_1, cortes_2, operador, rng)
     return filhos
 
+# Troca as posições "i" e "j" do indivíduo e devolve a variação de custo (0 sem "distancias")
+def _mutacao_troca(individuo: np.ndarray, i: int, j: int, distancias: Optional[np.ndarray]) -> float:
+    delta = delta_troca(individuo, i, j, distancias) if distancias is not None else 0.0
+    individuo[i], individuo[j] = individuo[j], individuo[i]
+    return delta
+
+# Liga a cidade da posição "i" ao "vizinho" com um movimento 2-opt e devolve a variação de custo
+def _mutacao_vizinho(individuo: np.ndarray, i: int, vizinho: int, distancias: Optional[np.ndarray]) -> float:
+    j = int(np.flatnonzero(individuo == vizinho)[0])
+    inicio, fim = (i + 1, j) if j > i else (j, i - 1)
+    if inicio >= fim:
+        return 0.0
+    delta = delta_2opt(individuo, inicio, fim, distancias) if distancias is not None else 0.0
+    aplicar_2opt(individuo, inicio, fim)
+    return delta
+
 # Promove a mutação em apenas um indivíduo
-def mutacao_individuo(individuo: np.ndarray) -> None:
+# Se "distancias" for informada, devolve a variação de custo da mutação (avaliação delta)
+# Com listas de candidatos ("vizinhos"), a mutação liga uma cidade a um dos seus k vizinhos mais próximos
+# por meio de um movimento 2-opt, em vez de trocar duas posições quaisquer
+def mutacao_individuo(individuo: np.ndarray, distancias: Optional[np.ndarray] = None, vizinhos: Optional[np.ndarray] = None, rng: Optional[np.random.Generator] = None) -> float:
+    rng = np.random.default_rng(rng)
     n_genes = len(individuo)
-    ponto_troca_1 = random.randint(0, n_genes - 2)
-    ponto_troca_2 = random.randint(ponto_troca_1 + 1, n_genes - 1)
-    individuo[ponto_troca_1], individuo[ponto_troca_2] = individuo[ponto_troca_2], individuo[ponto_troca_1]
+    if vizinhos is not None:
+        i = int(rng.integers(0, n_genes))
+        return _mutacao_vizinho(individuo, i, vizinhos[individuo[i]][rng.integers(0, vizinhos.shape[1])], distancias)
+    ponto_troca_1, ponto_troca_2 = sortear_cortes(1, n_genes, rng)
+    return _mutacao_troca(individuo, int(ponto_troca_1[0]), int(ponto_troca_2[0]), distancias)
 
 # Promove mutação em toda a população
-def mutacao_pop(filhos: np.ndarray, taxa_mutacao: float) -> None:
-    n_pop = filhos.shape[0]
-    for i in range(n_pop):
-        if random.random() < taxa_mutacao:
-            mutacao_individuo(filhos[i])
+# Os sorteios de todos os indivíduos (quem sofre mutação e em quais posições) são feitos de uma vez
+# Se "fitness_filhos" for informado, o custo em cache de cada mutante é atualizado pelo delta da troca
+# Retorna a quantidade de indivíduos que sofreram mutação
+def mutacao_pop(filhos: np.ndarray, taxa_mutacao: float, distancias: Optional[np.ndarray] = None, fitness_filhos: Optional[np.ndarray] = None, vizinhos: Optional[np.ndarray] = None, rng: Optional[np.random.Generator] = None) -> int:
+    rng = np.random.default_rng(rng)
+    n_pop, n_genes = filhos.shape
+    mutantes = np.flatnonzero(rng.random(n_pop) < taxa_mutacao)
+    if vizinhos is not None:
+        posicoes = rng.integers(0, n_genes, size=len(mutantes))
+        escolhas = rng.integers(0, vizinhos.shape[1], size=len(mutantes))
+        deltas = [_mutacao_vizinho(filhos[m], int(i), vizinhos[filhos[m, i], e], distancias)
+                  for m, i, e in zip(mutantes, posicoes, escolhas)]
+    else:
+        pontos_troca_1, pontos_troca_2 = sortear_cortes(len(mutantes), n_genes, rng)
+        deltas = [_mutacao_troca(filhos[m], int(i), int(j), distancias)
+                  for m, i, j in zip(mutantes, pontos_troca_1, pontos_troca_2)]
+    if fitness_filhos is not None and len(mutantes):
+        fitness_filhos[mutantes] += deltas
+    return len(mutantes)
 
-# Seleciona sobreviventes para a próxima geração
+# Seleciona sobreviventes para a próxima geração (μ + λ)
+# Os n_pop melhores entre pais e filhos sobrevivem, escolhidos com argpartition em O(n_pop)
 def selecao_sobreviventes(pop: np.ndarray, filhos: np.ndarray, fitness: np.ndarray, fitness_filhos: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
     n_pop = pop.shape[0]
-    nova_pop = np.zeros_like(pop)
-    nova_fitness = np.zeros_like(fitness)
-    i_pop = 0
-    i_filhos = 0
-    for i in range(n_pop):
-        if fitness[i_pop] < fitness_filhos[i_filhos]:
-            nova_pop[i] = pop[i_pop]
-            nova_fitness[i] = fitness[i_pop]
-            i_pop += 1
-        else:
-            nova_pop[i] = filhos[i_filhos]
-            nova_fitness[i] = fitness_filhos[i_filhos]
-            i_filhos += 1
-    return nova_pop, nova_fitness
+    todos = np.concatenate((pop, filhos))
+    todos_fitness = np.concatenate((fitness, fitness_filhos))
+    if len(todos_fitness) > n_pop:
+        melhores = np.argpartition(todos_fitness, n_pop - 1)[:n_pop]
+    else:
+        melhores = np.arange(len(todos_fitness))
+    return todos[melhores], todos_fitness[melhores]
 
 # Calcular distância entre cidades
 def calcular_distancias(coordenadas: List[Tuple[int, int]]) -> np.ndarray:
-    n_cidades = len(coordenadas)
-    distancias = np.zeros((n_cidades, n_cidades))
-    for i in range(n_cidades):
-        for j in range(i + 1, n_cidades):
-            x1, y1 = coordenadas[i]
-            x2, y2 = coordenadas[j]
-            distancia = np.sqrt((x1 - x2)**2 + (y1 - y2)**2)
-            distancias[i][j] = distancia
-            distancias[j][i] = distancia
-    return distancias
+    return matriz_distancias(np.asarray(coordenadas, dtype=np.float64), tipo_peso=None)
+
+# Aplica a busca local 2-opt / Or-opt a cada indivíduo, atualizando o fitness pelo delta (passo memético)
+def busca_local_pop(pop: np.ndarray, fitness: np.ndarray, distancias: np.ndarray, vizinhos: np.ndarray) -> None:
+    for i in range(pop.shape[0]):
+        pop[i], delta = busca_local(pop[i], distancias, vizinhos)
+        fitness[i] += delta
+
+# Monta a estrutura de distâncias e as listas de vizinhos usadas pela evolução
+# "distancias", se informada, é usada no lugar da matriz / das distâncias sob demanda;
+# um DistanciasPreparadas é devolvido como está
+def preparar_distancias(coordenadas, k_vizinhos: Optional[int], memetico: bool, distancias=None) -> DistanciasPreparadas:
+    if isinstance(distancias, DistanciasPreparadas):
+        return distancias
+    vizinhos = None
+    if k_vizinhos:
+        distancias = DistanciasSobDemanda(coordenadas) if distancias is None else distancias
+        vizinhos, _ = vizinhos_mais_proximos(coordenadas, k_vizinhos)
+    elif distancias is None:
+        distancias = calcular_distancias(coordenadas)
+    vizinhos_busca = vizinhos
+    if memetico and vizinhos_busca is None:
+        vizinhos_busca, _ = vizinhos_da_matriz(distancias, 10)
+    return DistanciasPreparadas(distancias, vizinhos, vizinhos_busca)
 
 # Função principal de evolução
-def evolucao(coordenadas: List[Tuple[int, int]], taxa_mutacao: float, n_pop: int, n_geracoes: int):
-    n_genes = len(coordenadas)
-    distancias = calcular_distancias(coordenadas)
+# Com "k_vizinhos", a matriz n x n não é alocada: as distâncias são calculadas sob demanda
+# e a mutação fica restrita às listas dos k vizinhos mais próximos de cada cidade
+# Com "memetico", cada indivíduo gerado passa pela busca local 2-opt / Or-opt antes da seleção
+# "operador_crossover" escolhe entre PMX ('pmx'), OX ('ox') e edge recombination ('erx')
+# "semente" (inteiro ou numpy.random.Generator) torna a execução reprodutível
+# "tempo_limite" (segundos), "limite_estagnacao" (gerações sem melhoria), "custo_alvo" e "callback"
+# encerram a evolução antes de "n_geracoes"; a melhor rota encontrada até a parada é devolvida
+# "estatisticas" (instrumentacao.Estatisticas) recebe o tempo de cada etapa e os contadores da execução
+# Com "checkpoint" (OpcoesCheckpoint), o estado completo é gravado a cada checkpoint.intervalo gerações (e ao final);
+# retomar_evolucao continua dali exatamente como a execução original continuaria
+# "fracao_construida" (0 a 1) da população inicial vem das heurísticas de construção (construcao.py)
+# "distancias" permite reaproveitar uma matriz já calculada (ex.: em cache) para as mesmas coordenadas,
+# ou um DistanciasPreparadas com as listas de vizinhos também já montadas
+# "memoizacao" (OpcoesMemoizacao) liga o cache de fitness e a eliminação de rotas repetidas
+def evolucao(coordenadas: List[Tuple[int, int]], taxa_mutacao: float, n_pop: int, n_geracoes: int, vetorizado: bool = True, k_vizinhos: Optional[int] = None, memetico: bool = False, operador_crossover: str = 'pmx', tamanho_torneio: int = 2, semente: Semente = None,
+             tempo_limite: Optional[float] = None, limite_estagnacao: Optional[int] = None, custo_alvo: Optional[float] = None, callback: Optional[Callback] = None,
+             estatisticas: Optional[Estatisticas] = None, checkpoint: Optional[OpcoesCheckpoint] = None, fracao_construida: float = 0.0, distancias=None,
+             memoizacao: Optional[OpcoesMemoizacao] = None):
+    criterio = CriterioParada(tempo_limite, limite_estagnacao, custo_alvo, callback)
+    medicao = ou_desligadas(estatisticas)
+    medicao.iniciar()
+    # O tempo total e a memória são fechados mesmo se a preparação ou a evolução falharem
+    try:
+        rng = np.random.default_rng(semente)
+        n_genes = len(coordenadas)
+        with medicao.etapa('distancias'):
+            preparadas = preparar_distancias(coordenadas, k_vizinhos, memetico, distancias)
+        distancias = preparadas.distancias
+        avaliar = avaliar_pop_vetorizado if vetorizado else avaliar_pop
+
+        with medicao.etapa('inicializacao'):
+            if fracao_construida > 0:
+                pop = populacao_semeada(coordenadas, n_pop, fracao_construida, rng)
+            else:
+                pop = pop_inicial(n_pop, n_genes, rng)
+            fitness = avaliar(pop, distancias)
+        medicao.contar('avaliacoes', n_pop)
+        medicao.contar('consultas_distancia', n_pop * n_genes)
+        if memetico:
+            with medicao.etapa('busca_local'):
+                busca_local_pop(pop, fitness, distancias, preparadas.vizinhos_busca)
 
-    pop = pop_inicial(n_pop, n_genes)
-    fitness = avaliar_pop(pop, distancias)
+        memoizacao = memoizacao or OpcoesMemoizacao()
+        parametros = {'taxa_mutacao': taxa_mutacao, 'n_pop': n_pop, 'n_geracoes': n_geracoes, 'vetorizado': vetorizado,
+                      'k_vizinhos': k_vizinhos, 'memetico': memetico, 'operador_crossover': operador_crossover,
+                      'tamanho_torneio': tamanho_torneio, 'n_genes': n_genes, 'capacidade_cache': memoizacao.capacidade_cache,
+                      'eliminar_duplicatas': memoizacao.eliminar_duplicatas}
+        return _continuar_evolucao(pop, fitness, [], 0, preparadas, parametros, rng, criterio, estatisticas, checkpoint)
+    finally:
+        medicao.finalizar()
 
+# Continua a evolução de um checkpoint gravado por evolucao
+# "n_geracoes" (total, contando as já executadas) pode ser aumentado; os critérios de parada valem a partir da retomada
+# "distancias", como em evolucao, reaproveita a matriz (ou as distâncias sob demanda) usada na execução original
+# Retorna (melhor_rota, fitness_ao_longo_geracoes), com o histórico completo desde a geração 0
+def retomar_evolucao(coordenadas: List[Tuple[int, int]], arquivo_checkpoint: str, n_geracoes: Optional[int] = None,
+                     tempo_limite: Optional[float] = None, limite_estagnacao: Optional[int] = None, custo_alvo: Optional[float] = None, callback: Optional[Callback] = None,
+                     estatisticas: Optional[Estatisticas] = None, intervalo_checkpoint: int = 50, distancias=None):
+    metadados, arrays = carregar_checkpoint(arquivo_checkpoint)
+    parametros = metadados['parametros']
+    if parametros['n_genes'] != len(coordenadas):
+        raise ValueError('O checkpoint tem %d cidades, mas foram informadas %d' % (parametros['n_genes'], len(coordenadas)))
+    if n_geracoes is not None:
+        parametros['n_geracoes'] = n_geracoes
+    criterio = CriterioParada(tempo_limite, limite_estagnacao, custo_alvo, callback)
+    restaurar_criterio(criterio, metadados['criterio'])
+    medicao = ou_desligadas(estatisticas)
+    medicao.iniciar()
+    try:
+        with medicao.etapa('distancias'):
+            preparadas = preparar_distancias(coordenadas, parametros['k_vizinhos'], parametros['memetico'], distancias)
+        return _continuar_evolucao(arrays['pop'], arrays['fitness'], arrays['historico'].tolist(), metadados['geracao'], preparadas, parametros,
+                                   restaurar_rng(metadados['rng']), criterio, estatisticas, OpcoesCheckpoint(arquivo_checkpoint, intervalo_checkpoint))
+    finally:
+        medicao.finalizar()
+
+# Executa as gerações restantes (de "geracao" até parametros['n_geracoes']), gravando checkpoints se pedido
+# Quem chama abre e fecha a medição (estatisticas.iniciar / finalizar)
+def _continuar_evolucao(pop, fitness, historico: List[float], geracao: int, preparadas: DistanciasPreparadas, parametros: dict,
+                        rng: np.random.Generator, criterio: CriterioParada, estatisticas: Optional[Estatisticas], checkpoint: Optional[OpcoesCheckpoint]):
+    salvar = None
+    if checkpoint is not None and checkpoint.arquivo:
+        def salvar(geracoes_concluidas, pop, fitness, historico_novo):
+            salvar_checkpoint(checkpoint.arquivo, {'parametros': parametros, 'geracao': geracoes_concluidas, 'rng': estado_rng(rng),
+                                                   'criterio': estado_criterio(criterio)},
+                              pop=pop, fitness=fitness, historico=np.asarray(historico + historico_novo, dtype=np.float64))
+    avaliar = avaliar_pop_vetorizado if parametros['vetorizado'] else avaliar_pop
+    memoizacao = OpcoesMemoizacao(parametros.get('capacidade_cache'), parametros.get('eliminar_duplicatas', False))
+    pop, fitness, fitness_ao_longo_geracoes = executar_geracoes(pop, fitness, preparadas.distancias, parametros['taxa_mutacao'], parametros['n_geracoes'], avaliar,
+                                                                preparadas.vizinhos, preparadas.vizinhos_busca if parametros['memetico'] else None,
+                                                                parametros['operador_crossover'], parametros['tamanho_torneio'], rng, criterio, estatisticas,
+                                                                geracao, salvar, checkpoint.intervalo if checkpoint else 50, memoizacao)
+    return pop[np.argmin(fitness)], historico + fitness_ao_longo_geracoes
+
+# Executa as gerações "inicio" até "n_geracoes" - 1 a partir de uma população já avaliada
+# Com "vizinhos_busca", os filhos passam pela busca local (passo memético)
+# Com "criterio" (CriterioParada), pode parar antes de "n_geracoes"
+# Com "estatisticas", cronometra seleção, crossover, avaliação, mutação, busca local e sobreviventes
+# Com "salvar", chama salvar(geracoes_concluidas, pop, fitness, historico) a cada "intervalo_checkpoint" gerações e ao final
+# Com memoizacao.capacidade_cache, um CacheFitness (memoizacao.py) criado aqui faz só os filhos ainda não avaliados passarem
+# por "avaliar" (o conteúdo do cache não vai para o checkpoint: ao retomar, ele recomeça vazio)
+# Com memoizacao.eliminar_duplicatas, filhos repetidos entre si ou iguais a alguém da população são descartados antes da avaliação
+# (e de novo depois da mutação / busca local); com "estatisticas", acertos do cache e diversidade são registrados por geração
+def executar_geracoes(pop: np.ndarray, fitness: np.ndarray, distancias: np.ndarray, taxa_mutacao: float, n_geracoes: int, avaliar=avaliar_pop_vetorizado, vizinhos: Optional[np.ndarray] = None, vizinhos_busca: Optional[np.ndarray] = None, operador_crossover: str = 'pmx', tamanho_torneio: int = 2, rng: Optional[np.random.Generator] = None, criterio: Optional[CriterioParada] = None, estatisticas: Optional[Estatisticas] = None,
+                      inicio: int = 0, salvar: Optional[Callable[[int, np.ndarray, np.ndarray, List[float]], None]] = None, intervalo_checkpoint: int = 50,
+                      memoizacao: Optional[OpcoesMemoizacao] = None) -> Tuple[np.ndarray, np.ndarray, List[float]]:
+    rng = np.random.default_rng(rng)
+    memoizacao = memoizacao or OpcoesMemoizacao()
+    cache = CacheFitness(memoizacao.capacidade_cache) if memoizacao.capacidade_cache else None
+    eliminar_duplicatas = memoizacao.eliminar_duplicatas
+    if criterio is not None and not criterio.ativo():
+        criterio = None
+    medicao = ou_desligadas(estatisticas)
+    n_pop, n_genes = pop.shape
     fitness_ao_longo_geracoes = []
+    geracao = inicio - 1
+    chaves_pop = set()
+    if cache is not None or eliminar_duplicatas:
+        chaves = chaves_rotas(pop)
+        chaves_pop = set(chaves) if eliminar_duplicatas else chaves_pop
+        if cache is not None:
+            cache.guardar(chaves, fitness)
 
-    for geracao in range(n_geracoes):
-        pais = selecao_pais(pop, fitness, n_pop)
-        filhos = crossover_pop(pais)
-        mutacao_pop(filhos, taxa_mutacao)
-        fitness_filhos = avaliar_pop(filhos, distancias)
-        pop, fitness = selecao_sobreviventes(pop, filhos, fitness, fitness_filhos)
+    for geracao in range(inicio, n_geracoes):
+        with medicao.etapa('selecao'):
+            pais = selecao_pais(pop, fitness, n_pop, tamanho_torneio, rng)
+        with medicao.etapa('crossover'):
+            filhos = crossover_pop(pais, operador_crossover, rng)
+        chaves = None
+        if eliminar_duplicatas:
+            with medicao.etapa('duplicatas'):
+                chaves = chaves_rotas(filhos)
+                manter = novas_rotas(chaves, chaves_pop)
+                medicao.contar('duplicatas_removidas', len(filhos) - len(manter))
+                filhos, chaves = filhos[manter], [chaves[i] for i in manter]
+        with medicao.etapa('avaliacao'):
+            if cache is not None:
+                acertos, faltas = cache.acertos, cache.faltas
+                fitness_filhos = cache.avaliar(filhos, distancias, avaliar, chaves)
+                avaliados = cache.faltas - faltas
+                medicao.contar('acertos_cache', cache.acertos - acertos)
+                medicao.registrar('acertos_cache', cache.acertos - acertos)
+                medicao.registrar('faltas_cache', avaliados)
+            else:
+                fitness_filhos = avaliar(filhos, distancias)
+                avaliados = len(filhos)
+        medicao.contar('avaliacoes', avaliados)
+        medicao.contar('consultas_distancia', avaliados * n_genes)
+        with medicao.etapa('mutacao'):
+            mutantes = mutacao_pop(filhos, taxa_mutacao, distancias, fitness_filhos, vizinhos, rng)
+        medicao.contar('mutacoes', mutantes)
+        if vizinhos_busca is not None:
+            with medicao.etapa('busca_local'):
+                busca_local_pop(filhos, fitness_filhos, distancias, vizinhos_busca)
+        # A mutação e a busca local mudam rotas já avaliadas: guarda os novos custos e descarta as novas repetições
+        if (cache is not None or eliminar_duplicatas) and (mutantes or vizinhos_busca is not None):
+            with medicao.etapa('duplicatas'):
+                chaves = chaves_rotas(filhos)
+                if cache is not None:
+                    cache.guardar(chaves, fitness_filhos)
+                if eliminar_duplicatas:
+                    manter = novas_rotas(chaves, chaves_pop)
+                    medicao.contar('duplicatas_removidas', len(filhos) - len(manter))
+                    filhos, fitness_filhos = filhos[manter], fitness_filhos[manter]
+        with medicao.etapa('sobreviventes'):
+            pop, fitness = selecao_sobreviventes(pop, filhos, fitness, fitness_filhos)
+        medicao.contar('geracoes')
+        if eliminar_duplicatas or estatisticas is not None:
+            chaves = chaves_rotas(pop)
+            chaves_pop = set(chaves) if eliminar_duplicatas else chaves_pop
+            if estatisticas is not None:
+                rotas_distintas, arestas_distintas = diversidade(pop, chaves)
+                medicao.registrar('rotas_distintas', rotas_distintas)
+                medicao.registrar('arestas_distintas', arestas_distintas)
 
         fitness_ao_longo_geracoes.append(np.min(fitness)) #Armazena o fitness do melhor indivíduo da geração
 
-    return pop[np.argmin(fitness)], fitness_ao_longo_geracoes
+        parar = False
+        if criterio is not None:
+            melhor = int(np.argmin(fitness))
+            parar = criterio.atualizar(geracao, pop[melhor].copy(), float(fitness[melhor]))
+        if salvar is not None and (geracao + 1) % intervalo_checkpoint == 0:
+            with medicao.etapa('checkpoint'):
+                salvar(geracao + 1, pop, fitness, fitness_ao_longo_geracoes)
+        if parar:
+            break
+
+    # Checkpoint final (fim das gerações ou parada antecipada)
+    if salvar is not None and (geracao + 1) % intervalo_checkpoint != 0:
+        with medicao.etapa('checkpoint'):
+            salvar(geracao + 1, pop, fitness, fitness_ao_longo_geracoes)
+
+    return pop, fitness, fitness_ao_longo_geracoes
 
 # Função para calcular a distância total de uma rota
 def calcular_distancia_total(rota: List[int], distancias: np.ndarray) -> float:
@@ -158,28 +395,16 @@ def calcular_distancia_total(rota: List[int], distancias: np.ndarray) -> float:
     return distancia_total
 
 # Função principal
-def principal():
-    coordenadas = []
-    file = 'berlin52.tsp'
-
-    with open(file) as obj_file:
-        lines = obj_file.readlines()
-        read_coordinates = False
-        for line in lines:
-            if line.strip() == "NODE_COORD_SECTION":
-                read_coordinates = True
-                continue
-            elif read_coordinates and line.strip() != "EOF":
-                parts = line.strip().split()
-                if len(parts) == 3:
-                    _, x, y = parts
-                    coordenadas.append((float(x), float(y)))
-
-    taxa_mutacao = 0.001
-    n_pop = 100
-    n_geracoes = 400
-
-    melhor_rota, fitness_ao_longo_geracoes = evolucao(coordenadas, taxa_mutacao, n_pop, n_geracoes)
+# O gráfico da evolução do fitness é gravado em "arquivo_grafico" (None para não gerar gráfico)
+def principal(arquivo_grafico: Optional[str] = 'evolucao_fitness.png'):
+    coordenadas = ler_tsplib('berlin52.tsp').coordenadas
+
+    # Parâmetros padrão, substituídos pelos ajustados por autotuning.py para o tamanho da instância quando o arquivo existe
+    # (importado aqui porque autotuning importa este módulo)
+    from autotuning import parametros_ajustados
+    parametros = parametros_ajustados('ga', len(coordenadas), {'taxa_mutacao': 0.001, 'n_pop': 100, 'n_geracoes': 400})
+
+    melhor_rota, fitness_ao_longo_geracoes = evolucao(coordenadas, **parametros)
 
     # Calcula a distância total da melhor rota encontrada
     distancias = calcular_distancias(coordenadas)
@@ -187,12 +412,12 @@ def principal():
 
     print(f"Distância da melhor rota: {distancia_melhor_rota}")
 
-    plt.figure(figsize=(10, 6))
-    sns.boxplot(data=fitness_ao_longo_geracoes, whis=1.5)
-    plt.xlabel('Geração')
-    plt.ylabel('Fitness (Menor distância)')
-    plt.title('Evolução do fitness ao longo das gerações')
-    plt.show()
+    if arquivo_grafico:
+        # Importa matplotlib / seaborn só aqui, para o módulo continuar leve quando usado como biblioteca
+        from graficos import salvar_grafico
+        salvar_grafico(fitness_ao_longo_geracoes, arquivo_grafico, 'Evolução do fitness ao longo das gerações',
+                       'Geração', 'Fitness (Menor distância)', boxplot=True)
+        print(f"Gráfico salvo em {arquivo_grafico}")
 
 if __name__ == "__main__":
     principal()
\ No newline at end of file
@@ -0,0 +1,281 @@
+import argparse, itertools, json, math, os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+from typing import Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from algoritmo_genetico import evolucao
+from benchmark import PARAMETROS_PADRAO, custo_rota, gerar_agrupada, gerar_uniforme
+from enxame_de_particulas import Grafo, GrafoCandidatos, PSO
+from tsplib import InstanciaTSP, ler_tsplib, matriz_distancias
+from vizinhanca import DistanciasSobDemanda
+
+# Ajuste automático dos parâmetros do algoritmo genético e do PSO por corrida (F-Race).
+# As configurações candidatas são executadas, bloco a bloco, num conjunto de instâncias de treino
+# (cada bloco é um par instância + semente), em paralelo num pool de processos e com um orçamento
+# reduzido de avaliações (execuções parciais). A cada bloco, o teste de Friedman compara os postos das
+# configurações ainda vivas; se houver diferença significativa, as que ficaram atrás da melhor por mais
+# que a diferença crítica dos postos são eliminadas. A vencedora de cada faixa de tamanho de instância
+# é gravada em JSON, com o orçamento completo, e principal() / main() passam a usá-la.
+
+ARQUIVO_PADRAO = 'parametros_ajustados.json'
+
+# Limites superiores das faixas de tamanho (número de cidades)
+FAIXAS = (100, 1000, 10000)
+
+# Valores experimentados para cada parâmetro
+ESPACOS = {
+    'ga': {'taxa_mutacao': [0.001, 0.01, 0.05, 0.1, 0.2], 'n_pop': [50, 100, 200, 400],
+           'operador_crossover': ['pmx', 'ox', 'erx'], 'tamanho_torneio': [2, 3, 5]},
+    'pso': {'tamanho_populacao': [50, 100, 300], 'beta': [0.1, 0.3, 0.6, 0.9], 'alfa': [0.1, 0.3, 0.5, 0.9]},
+}
+
+# Parâmetros atuais de principal() / main(), sempre incluídos na corrida
+PADROES = {
+    'ga': {'taxa_mutacao': 0.001, 'n_pop': 100, 'operador_crossover': 'pmx', 'tamanho_torneio': 2},
+    'pso': {'tamanho_populacao': 300, 'beta': 0.3, 'alfa': 0.5},
+}
+
+# Orçamento completo (avaliações de custo) gravado com a vencedora: o de principal() (100 x 400) e o de main() (300 x 300)
+ORCAMENTOS = {'ga': 100 * 400, 'pso': 300 * 300}
+
+# Nome da faixa de tamanho de uma instância com "n" cidades
+def faixa_tamanho(n: int) -> str:
+    for limite in FAIXAS:
+        if n <= limite:
+            return 'ate%d' % limite
+    return 'acima%d' % FAIXAS[-1]
+
+# Converte a configuração e o orçamento de avaliações nos argumentos de evolucao / PSO
+def parametros_completos(resolvedor: str, configuracao: dict, orcamento: int) -> dict:
+    parametros = dict(configuracao)
+    if resolvedor == 'ga':
+        parametros['n_geracoes'] = max(1, orcamento // parametros['n_pop'])
+    else:
+        parametros['iteracoes'] = max(1, orcamento // parametros['tamanho_populacao'])
+    return parametros
+
+# Parâmetros ajustados para uma instância com "n" cidades; sem arquivo ou sem a faixa, devolve "padrao"
+def parametros_ajustados(resolvedor: str, n: int, padrao: dict, arquivo: str = ARQUIVO_PADRAO) -> dict:
+    if not os.path.exists(arquivo):
+        return dict(padrao)
+    with open(arquivo, encoding='utf-8') as entrada:
+        ajustados = json.load(entrada)
+    faixa = ajustados.get(resolvedor, {}).get(faixa_tamanho(n))
+    return dict(padrao, **faixa['parametros']) if faixa else dict(padrao)
+
+# ---------------------------------------------------------------------------------------------
+# Testes estatísticos (Python puro)
+
+# Função gama incompleta regularizada superior Q(a, x): série para x < a + 1, fração contínua (Lentz) no resto
+def _gama_incompleta_superior(a: float, x: float) -> float:
+    if x <= 0:
+        return 1.0
+    fator = math.exp(-x + a * math.log(x) - math.lgamma(a))
+    if x < a + 1:
+        termo = soma = 1.0 / a
+        denominador = a
+        for _ in range(10000):
+            denominador += 1
+            termo *= x / denominador
+            soma += termo
+            if abs(termo) < abs(soma) * 1e-15:
+                break
+        return max(0.0, 1.0 - soma * fator)
+    minimo = 1e-300
+    b = x + 1 - a
+    c = 1.0 / minimo
+    d = 1.0 / b
+    h = d
+    for i in range(1, 10000):
+        an = -i * (i - a)
+        b += 2
+        d = an * d + b
+        d = minimo if abs(d) < minimo else d
+        c = b + an / c
+        c = minimo if abs(c) < minimo else c
+        d = 1.0 / d
+        delta = d * c
+        h *= delta
+        if abs(delta - 1) < 1e-15:
+            break
+    return fator * h
+
+# P(X >= x) para X com distribuição qui-quadrado de "graus" graus de liberdade
+def qui_quadrado_sf(x: float, graus: int) -> float:
+    return _gama_incompleta_superior(graus / 2.0, x / 2.0)
+
+# Postos de uma lista (1 = menor), com empates recebendo a média dos postos
+def postos(valores: Sequence[float]) -> List[float]:
+    ordem = sorted(range(len(valores)), key=lambda i: valores[i])
+    resultado = [0.0] * len(valores)
+    i = 0
+    while i < len(ordem):
+        j = i
+        while j + 1 < len(ordem) and valores[ordem[j + 1]] == valores[ordem[i]]:
+            j += 1
+        for posicao in range(i, j + 1):
+            resultado[ordem[posicao]] = (i + j) / 2.0 + 1
+        i = j + 1
+    return resultado
+
+# Teste de Friedman sobre "custos" (um bloco por linha, uma configuração por coluna), com correção para empates
+# Retorna (estatística, valor-p, soma dos postos de cada configuração)
+def friedman(custos: Sequence[Sequence[float]]) -> Tuple[float, float, List[float]]:
+    b, k = len(custos), len(custos[0])
+    postos_blocos = [postos(linha) for linha in custos]
+    somas = [sum(linha[j] for linha in postos_blocos) for j in range(k)]
+    if k < 2 or b < 2:
+        return 0.0, 1.0, somas
+    soma_quadrados = sum(r * r for linha in postos_blocos for r in linha)
+    denominador = soma_quadrados - b * k * (k + 1) ** 2 / 4.0
+    if denominador <= 0:  # todos os blocos empatados
+        return 0.0, 1.0, somas
+    estatistica = (k - 1) * sum((soma - b * (k + 1) / 2.0) ** 2 for soma in somas) / denominador
+    return estatistica, qui_quadrado_sf(estatistica, k - 1), somas
+
+# Configurações que sobrevivem: soma dos postos até a diferença crítica acima da melhor
+# (aproximação normal da diferença entre somas de postos, desvio sqrt(b k (k + 1) / 6))
+def sobreviventes(somas: Sequence[float], b: int, alfa: float) -> List[int]:
+    k = len(somas)
+    critica = NormalDist().inv_cdf(1 - alfa / 2) * math.sqrt(b * k * (k + 1) / 6.0)
+    melhor = min(somas)
+    return [j for j, soma in enumerate(somas) if soma - melhor <= critica]
+
+# ---------------------------------------------------------------------------------------------
+# Corrida
+
+# Sorteia até "quantidade" configurações distintas do espaço (produto cartesiano), começando por "padrao"
+def configuracoes_candidatas(espaco: Dict[str, list], quantidade: int, rng: Optional[np.random.Generator] = None,
+                             padrao: Optional[dict] = None) -> List[dict]:
+    rng = np.random.default_rng(rng)
+    nomes = sorted(espaco)
+    todas = [dict(zip(nomes, valores)) for valores in itertools.product(*(espaco[nome] for nome in nomes))]
+    escolhidas = [dict(padrao)] if padrao else []
+    for i in rng.permutation(len(todas)):
+        if len(escolhidas) >= quantidade:
+            break
+        if todas[i] not in escolhidas:
+            escolhidas.append(todas[i])
+    return escolhidas
+
+# Executa uma configuração numa instância (dentro do pool) e devolve o custo da melhor rota
+def _executar(resolvedor: str, configuracao: dict, instancia: InstanciaTSP, semente: int, orcamento: int, tempo_limite: Optional[float]) -> float:
+    parametros = parametros_completos(resolvedor, configuracao, orcamento)
+    grande = instancia.dimensao > PARAMETROS_PADRAO['limite_matriz']
+    if resolvedor == 'ga':
+        # O GA otimiza com a mesma métrica (tipo_peso) usada para comparar as configurações
+        coordenadas = np.asarray(instancia.coordenadas)
+        distancias = DistanciasSobDemanda(coordenadas, instancia.tipo_peso) if grande else matriz_distancias(coordenadas, instancia.tipo_peso)
+        rota, _ = evolucao(coordenadas, k_vizinhos=10 if grande else None, semente=semente, tempo_limite=tempo_limite,
+                           distancias=distancias, **parametros)
+    else:
+        if grande:
+            grafo = GrafoCandidatos(instancia.coordenadas, tipo_peso=instancia.tipo_peso)
+        else:
+            grafo = Grafo.deCoordenadas(instancia.coordenadas, instancia.tipo_peso)
+        pso = PSO(grafo, semente=semente, **parametros)
+        pso.executar(tempo_limite=tempo_limite)
+        rota = np.array(pso.getGBest().getPBest())
+    return custo_rota(instancia, rota)
+
+# Corrida entre "configuracoes" nos blocos (instância, semente), com orçamento de "orcamento" avaliações por execução
+# O teste começa depois de "min_blocos" blocos; "alfa" é o nível de significância
+# Retorna um dicionário com a vencedora, o custo médio de cada sobrevivente e as eliminações de cada bloco
+def corrida(resolvedor: str, configuracoes: List[dict], instancias: Sequence[InstanciaTSP], sementes: Sequence[int] = (0, 1, 2),
+            orcamento: int = 5000, n_processos: Optional[int] = None, min_blocos: int = 5, alfa: float = 0.05,
+            tempo_limite: Optional[float] = None, verbose: bool = False) -> dict:
+    if resolvedor not in ESPACOS:
+        raise ValueError('Resolvedor desconhecido: %s' % resolvedor)
+    if not configuracoes or not instancias:
+        raise ValueError('A corrida precisa de pelo menos uma configuração e uma instância')
+    blocos = [(instancia, semente) for semente in sementes for instancia in instancias]
+    vivas = list(range(len(configuracoes)))
+    custos: List[Dict[int, float]] = []  # custos[bloco][configuração]
+    eliminacoes = []
+    with ProcessPoolExecutor(max_workers=n_processos) as executor:
+        for instancia, semente in blocos:
+            if len(vivas) == 1:
+                break
+            resultados = executor.map(_executar, itertools.repeat(resolvedor), [configuracoes[j] for j in vivas], itertools.repeat(instancia),
+                                      itertools.repeat(semente), itertools.repeat(orcamento), itertools.repeat(tempo_limite))
+            custos.append(dict(zip(vivas, resultados)))
+            if len(custos) < min_blocos:
+                continue
+            _, valor_p, somas = friedman([[bloco[j] for j in vivas] for bloco in custos])
+            if valor_p < alfa:
+                restantes = [vivas[j] for j in sobreviventes(somas, len(custos), alfa)]
+                eliminacoes.append({'bloco': len(custos), 'valor_p': valor_p, 'eliminadas': [j for j in vivas if j not in restantes]})
+                if verbose:
+                    print('bloco %d: p = %.4f, %d de %d configurações continuam' % (len(custos), valor_p, len(restantes), len(vivas)))
+                vivas = restantes
+
+    # Vencedora: menor soma de postos entre as sobreviventes (empate decidido pelo custo médio)
+    _, _, somas = friedman([[bloco[j] for j in vivas] for bloco in custos]) if len(custos) > 0 else (0, 1, [0.0] * len(vivas))
+    medias = {j: float(np.mean([bloco[j] for bloco in custos])) if custos else math.inf for j in vivas}
+    vencedora = min(range(len(vivas)), key=lambda i: (somas[i], medias[vivas[i]]))
+    return {'vencedora': configuracoes[vivas[vencedora]], 'custo_medio': medias[vivas[vencedora]], 'blocos': len(custos),
+            'sobreviventes': [{'configuracao': configuracoes[j], 'custo_medio': medias[j]} for j in vivas], 'eliminacoes': eliminacoes}
+
+# Ajusta "resolvedor" separadamente em cada faixa de tamanho das instâncias de treino e grava as vencedoras em "arquivo"
+# (preservando as faixas / resolvedores já gravados que não foram ajustados agora). Retorna o conteúdo gravado
+def ajustar(resolvedor: str, instancias: Sequence[InstanciaTSP], arquivo: str = ARQUIVO_PADRAO, n_configuracoes: int = 24,
+            sementes: Sequence[int] = (0, 1, 2), orcamento: int = 5000, n_processos: Optional[int] = None, semente: int = 0,
+            min_blocos: int = 5, alfa: float = 0.05, verbose: bool = False) -> dict:
+    rng = np.random.default_rng(semente)
+    configuracoes = configuracoes_candidatas(ESPACOS[resolvedor], n_configuracoes, rng, PADROES[resolvedor])
+    ajustados = {}
+    if os.path.exists(arquivo):
+        with open(arquivo, encoding='utf-8') as entrada:
+            ajustados = json.load(entrada)
+    faixas: Dict[str, List[InstanciaTSP]] = {}
+    for instancia in instancias:
+        faixas.setdefault(faixa_tamanho(instancia.dimensao), []).append(instancia)
+    for faixa, treino in sorted(faixas.items()):
+        if verbose:
+            print('%s / %s: %d configurações, %d instâncias' % (resolvedor, faixa, len(configuracoes), len(treino)))
+        resultado = corrida(resolvedor, configuracoes, treino, sementes, orcamento, n_processos, min_blocos, alfa, verbose=verbose)
+        ajustados.setdefault(resolvedor, {})[faixa] = {
+            'parametros': parametros_completos(resolvedor, resultado['vencedora'], ORCAMENTOS[resolvedor]),
+            'custo_medio': resultado['custo_medio'], 'blocos': resultado['blocos'],
+            'sobreviventes': len(resultado['sobreviventes']), 'instancias': [instancia.nome for instancia in treino],
+        }
+    temporario = arquivo + '.tmp'
+    with open(temporario, 'w', encoding='utf-8') as saida:
+        json.dump(ajustados, saida, indent=2)
+    os.replace(temporario, arquivo)
+    return ajustados
+
+# Instâncias de treino: arquivos TSPLIB e, para cada tamanho, "n_geradas" uniformes e agrupadas
+def instancias_treino(arquivos: Sequence[str], tamanhos: Sequence[int], n_geradas: int = 3) -> List[InstanciaTSP]:
+    instancias = [ler_tsplib(caminho) for caminho in arquivos]
+    for n in tamanhos:
+        for semente in range(n_geradas):
+            instancias.append(gerar_uniforme(n, semente)._replace(nome='uniforme%d_%d' % (n, semente)))
+            instancias.append(gerar_agrupada(n, semente)._replace(nome='agrupada%d_%d' % (n, semente)))
+    return instancias
+
+def main():
+    parser = argparse.ArgumentParser(description='Ajuste automático dos parâmetros do GA e do PSO por corrida (F-Race)')
+    parser.add_argument('--resolvedores', nargs='*', default=list(ESPACOS), choices=list(ESPACOS))
+    parser.add_argument('--tsp', nargs='*', default=['berlin52.tsp'], help='instâncias TSPLIB de treino')
+    parser.add_argument('--tamanhos', nargs='*', type=int, default=[50, 100], help='tamanhos das instâncias de treino geradas')
+    parser.add_argument('--geradas', type=int, default=3, help='instâncias geradas de cada tipo por tamanho')
+    parser.add_argument('--configuracoes', type=int, default=24, help='configurações candidatas por resolvedor')
+    parser.add_argument('--sementes', nargs='*', type=int, default=[0, 1, 2])
+    parser.add_argument('--orcamento', type=int, default=5000, help='avaliações de custo por execução parcial')
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--min-blocos', type=int, default=5, help='blocos (instância + semente) antes do primeiro teste')
+    parser.add_argument('--alfa', type=float, default=0.05, help='nível de significância do teste de Friedman')
+    parser.add_argument('--arquivo', default=ARQUIVO_PADRAO)
+    args = parser.parse_args()
+
+    instancias = instancias_treino(args.tsp, args.tamanhos, args.geradas)
+    for resolvedor in args.resolvedores:
+        ajustados = ajustar(resolvedor, instancias, args.arquivo, args.configuracoes, args.sementes, args.orcamento,
+                            args.processos, min_blocos=args.min_blocos, alfa=args.alfa, verbose=True)
+        for faixa, resultado in sorted(ajustados[resolvedor].items()):
+            print('%s / %s: %s (custo médio %.1f)' % (resolvedor, faixa, resultado['parametros'], resultado['custo_medio']))
+    print('Parâmetros gravados em %s' % args.arquivo)
+
+if __name__ == "__main__":
+    main()
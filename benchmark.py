@@ -0,0 +1,257 @@
+import argparse, csv, json, math, time, tracemalloc
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from algoritmo_genetico import evolucao
+from enxame_de_particulas import Grafo, GrafoCandidatos, PSO
+from instrumentacao import Estatisticas
+from solucao_exata import forca_bruta
+from tsplib import InstanciaTSP, distancias_pares, ler_tsplib, matriz_distancias
+from vizinhanca import DistanciasSobDemanda
+
+# Bancada de testes que compara o algoritmo genético, o PSO e a força bruta em várias instâncias
+# (berlin52 e instâncias geradas, uniformes e agrupadas) com várias sementes.
+# Cada execução registra tempo de relógio, avaliações por segundo, pico de memória (tracemalloc,
+# opcional e medido numa repetição à parte, fora do tempo), custo, gap para o ótimo (ou para o melhor custo conhecido) e tempo até atingir o alvo.
+# Os resultados vão para CSV / JSON e podem ser comparados com os de uma versão anterior.
+
+# Ótimos conhecidos das instâncias TSPLIB
+OTIMOS_CONHECIDOS = {'berlin52': 7542}
+
+RESOLVEDORES = ('ga', 'pso', 'exato')
+
+CAMPOS = ('instancia', 'n', 'resolvedor', 'semente', 'tempo_s', 'avaliacoes', 'avaliacoes_por_s',
+          'pico_memoria_mb', 'custo', 'gap', 'tempo_ate_alvo_s')
+
+# Parâmetros padrão dos resolvedores
+PARAMETROS_PADRAO = {
+    'taxa_mutacao': 0.01, 'n_pop': 100, 'n_geracoes': 200,  # algoritmo genético
+    'iteracoes': 100, 'n_particulas': 100, 'beta': 0.3, 'alfa': 0.5,  # PSO
+    'tempo_limite': None,  # orçamento por execução, em segundos
+    'limite_matriz': 2000,  # acima disso não se aloca a matriz n x n
+}
+
+# Gera uma instância com "n" cidades uniformes no quadrado [0, 1000) x [0, 1000)
+def gerar_uniforme(n: int, semente: int = 0) -> InstanciaTSP:
+    rng = np.random.default_rng(semente)
+    return InstanciaTSP('uniforme%d' % n, n, 'EUC_2D', np.round(rng.random((n, 2)) * 1000.0, 2))
+
+# Gera uma instância com "n" cidades em grupos gaussianos (por padrão cerca de sqrt(n) grupos)
+def gerar_agrupada(n: int, semente: int = 0, n_grupos: Optional[int] = None) -> InstanciaTSP:
+    rng = np.random.default_rng(semente)
+    n_grupos = n_grupos or max(1, int(math.sqrt(n)))
+    centros = rng.random((n_grupos, 2)) * 1000.0
+    grupo = rng.integers(0, n_grupos, size=n)
+    coordenadas = centros[grupo] + rng.normal(scale=1000.0 / (4.0 * n_grupos), size=(n, 2))
+    return InstanciaTSP('agrupada%d' % n, n, 'EUC_2D', np.round(np.clip(coordenadas, 0.0, 1000.0), 2))
+
+# Custo de uma rota fechada com a métrica da instância
+def custo_rota(instancia: InstanciaTSP, rota) -> float:
+    rota = np.asarray(rota)
+    coordenadas = np.asarray(instancia.coordenadas)
+    return float(distancias_pares(coordenadas[rota], coordenadas[np.roll(rota, -1)], instancia.tipo_peso).sum())
+
+# Cada executor devolve (rota, avaliacoes, trajetoria); a trajetória tem os pares (tempo, custo)
+# em que o melhor custo melhorou, medidos a partir do início da execução
+# As avaliações são as contadas pelo próprio resolvedor (instrumentacao.Estatisticas)
+
+# Algoritmo genético; acima de "limite_matriz" cidades usa distâncias sob demanda e listas de candidatos
+def executar_ga(instancia: InstanciaTSP, semente: int, parametros: dict) -> Tuple[np.ndarray, int, List[Tuple[float, float]]]:
+    trajetoria = []
+    inicio = time.perf_counter()
+
+    def registrar(geracao, rota, custo):
+        if not trajetoria or custo < registrar.ultimo:
+            registrar.ultimo = custo
+            trajetoria.append((time.perf_counter() - inicio, custo_rota(instancia, rota)))
+    registrar.ultimo = math.inf
+
+    # O GA otimiza com a mesma métrica (tipo_peso) usada para medir o custo e o gap
+    coordenadas = np.asarray(instancia.coordenadas)
+    k_vizinhos = 10 if instancia.dimensao > parametros['limite_matriz'] else None
+    distancias = DistanciasSobDemanda(coordenadas, instancia.tipo_peso) if k_vizinhos else matriz_distancias(coordenadas, instancia.tipo_peso)
+    estatisticas = Estatisticas()
+    rota, _ = evolucao(coordenadas, parametros['taxa_mutacao'], parametros['n_pop'], parametros['n_geracoes'], k_vizinhos=k_vizinhos,
+                       semente=semente, tempo_limite=parametros['tempo_limite'], callback=registrar, estatisticas=estatisticas,
+                       distancias=distancias)
+    return rota, estatisticas.contadores['avaliacoes'], trajetoria
+
+# PSO; acima de "limite_matriz" cidades usa o grafo de candidatos (sem matriz n x n)
+def executar_pso(instancia: InstanciaTSP, semente: int, parametros: dict) -> Tuple[np.ndarray, int, List[Tuple[float, float]]]:
+    trajetoria = []
+    inicio = time.perf_counter()
+
+    def registrar(iteracao, rota, custo):
+        if not trajetoria or custo < trajetoria[-1][1]:
+            trajetoria.append((time.perf_counter() - inicio, float(custo)))
+
+    if instancia.dimensao > parametros['limite_matriz']:
+        grafo = GrafoCandidatos(instancia.coordenadas, tipo_peso=instancia.tipo_peso)
+    else:
+        grafo = Grafo.deCoordenadas(instancia.coordenadas, instancia.tipo_peso)
+    pso = PSO(grafo, parametros['iteracoes'], parametros['n_particulas'], beta=parametros['beta'], alfa=parametros['alfa'], semente=semente)
+    estatisticas = Estatisticas()
+    pso.executar(tempo_limite=parametros['tempo_limite'], callback=registrar, estatisticas=estatisticas)
+    rota = np.array(pso.getGBest().getPBest())
+    # O enxame inicial é avaliado no construtor, fora de executar(); as iterações só reavaliam as partículas que mudaram
+    return rota, pso.tamanho_populacao + estatisticas.contadores['avaliacoes'], trajetoria
+
+# Força bruta com poda (só para instâncias pequenas); as avaliações são as rotas completas que a poda não cortou
+def executar_exato(instancia: InstanciaTSP, semente: int, parametros: dict) -> Tuple[np.ndarray, int, List[Tuple[float, float]]]:
+    inicio = time.perf_counter()
+    estatisticas = Estatisticas()
+    custo, rotas = forca_bruta(matriz_distancias(np.asarray(instancia.coordenadas), instancia.tipo_peso), estatisticas=estatisticas)
+    return np.array(rotas[0]), estatisticas.contadores['avaliacoes'], [(time.perf_counter() - inicio, float(custo))]
+
+EXECUTORES: Dict[str, Callable] = {'ga': executar_ga, 'pso': executar_pso, 'exato': executar_exato}
+
+# Executa "funcao" medindo o tempo de relógio e, se pedido, o pico de memória alocada (em MB)
+# O tracemalloc deixa a execução bem mais lenta, então a memória é medida numa segunda execução,
+# fora do tempo medido (com a mesma semente, ela repete o mesmo trabalho)
+def medir(funcao: Callable, medir_memoria: bool = False):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    tempo = time.perf_counter() - inicio
+    pico = None
+    if medir_memoria:
+        tracemalloc.start()
+        try:
+            funcao()
+            pico = tracemalloc.get_traced_memory()[1] / 2 ** 20
+        finally:
+            tracemalloc.stop()
+    return resultado, tempo, pico
+
+# Executa todos os resolvedores em todas as instâncias com todas as sementes
+# "tolerancia_alvo" define o alvo do tempo-até-alvo: custo <= referência * (1 + tolerancia_alvo)
+def executar_benchmark(instancias: Sequence[InstanciaTSP], resolvedores: Sequence[str] = RESOLVEDORES, sementes: Sequence[int] = (0, 1, 2),
+                       parametros: Optional[dict] = None, max_exato: int = 10, tolerancia_alvo: float = 0.05, medir_memoria: bool = False) -> List[dict]:
+    parametros = dict(PARAMETROS_PADRAO, **(parametros or {}))
+    for resolvedor in resolvedores:
+        if resolvedor not in EXECUTORES:
+            raise ValueError('Resolvedor desconhecido: %s' % resolvedor)
+
+    resultados = []
+    for instancia in instancias:
+        execucoes = []
+        for resolvedor in resolvedores:
+            if resolvedor == 'exato' and instancia.dimensao > max_exato:
+                continue
+            # A força bruta é determinística: basta uma execução
+            for semente in (sementes[:1] if resolvedor == 'exato' else sementes):
+                (rota, avaliacoes, trajetoria), tempo, pico = medir(lambda: EXECUTORES[resolvedor](instancia, semente, parametros), medir_memoria)
+                execucoes.append((resolvedor, semente, tempo, avaliacoes, pico, custo_rota(instancia, rota), trajetoria))
+
+        # Referência do gap: ótimo conhecido, ótimo da força bruta ou melhor custo de todas as execuções
+        referencia = OTIMOS_CONHECIDOS.get(instancia.nome)
+        exatos = [custo for resolvedor, _, _, _, _, custo, _ in execucoes if resolvedor == 'exato']
+        if referencia is None:
+            referencia = exatos[0] if exatos else min(custo for *_, custo, _ in execucoes)
+        alvo = referencia * (1.0 + tolerancia_alvo)
+
+        for resolvedor, semente, tempo, avaliacoes, pico, custo, trajetoria in execucoes:
+            tempo_ate_alvo = next((t for t, c in trajetoria if c <= alvo + 1e-9), None)
+            resultados.append({
+                'instancia': instancia.nome, 'n': instancia.dimensao, 'resolvedor': resolvedor, 'semente': semente,
+                'tempo_s': tempo, 'avaliacoes': avaliacoes, 'avaliacoes_por_s': avaliacoes / tempo if tempo > 0 else None,
+                'pico_memoria_mb': pico, 'custo': custo, 'gap': custo / referencia - 1.0 if referencia else 0.0,
+                'tempo_ate_alvo_s': tempo_ate_alvo})
+    return resultados
+
+# Agrupa os resultados por (instância, resolvedor): tempo médio, melhor e média do gap, etc.
+def resumir(resultados: List[dict]) -> List[dict]:
+    grupos: Dict[Tuple[str, str], List[dict]] = {}
+    for linha in resultados:
+        grupos.setdefault((linha['instancia'], linha['resolvedor']), []).append(linha)
+    resumo = []
+    for (instancia, resolvedor), linhas in grupos.items():
+        alvos = [l['tempo_ate_alvo_s'] for l in linhas if l['tempo_ate_alvo_s'] is not None]
+        resumo.append({
+            'instancia': instancia, 'n': linhas[0]['n'], 'resolvedor': resolvedor, 'execucoes': len(linhas),
+            'tempo_medio_s': float(np.mean([l['tempo_s'] for l in linhas])),
+            'avaliacoes_por_s': float(np.mean([l['avaliacoes_por_s'] or 0.0 for l in linhas])),
+            'pico_memoria_mb': max((l['pico_memoria_mb'] or 0.0) for l in linhas),
+            'melhor_gap': min(l['gap'] for l in linhas), 'gap_medio': float(np.mean([l['gap'] for l in linhas])),
+            'atingiram_alvo': len(alvos), 'tempo_ate_alvo_medio_s': float(np.mean(alvos)) if alvos else None})
+    return resumo
+
+# Compara o resumo atual com o de uma execução anterior (arquivo JSON gerado por salvar_json)
+# Devolve as linhas em que o tempo médio ou o gap médio pioraram mais que "limiar" (fração)
+def comparar(resumo: List[dict], anterior: List[dict], limiar: float = 0.10) -> List[dict]:
+    antes = {(l['instancia'], l['resolvedor']): l for l in anterior}
+    regressoes = []
+    for linha in resumo:
+        base = antes.get((linha['instancia'], linha['resolvedor']))
+        if base is None:
+            continue
+        razao_tempo = linha['tempo_medio_s'] / base['tempo_medio_s'] if base['tempo_medio_s'] > 0 else 1.0
+        piora_gap = linha['gap_medio'] - base['gap_medio']
+        if razao_tempo > 1.0 + limiar or piora_gap > limiar:
+            regressoes.append({'instancia': linha['instancia'], 'resolvedor': linha['resolvedor'],
+                               'razao_tempo': razao_tempo, 'piora_gap': piora_gap})
+    return regressoes
+
+# Grava os resultados por execução em CSV
+def salvar_csv(resultados: List[dict], caminho: str) -> None:
+    with open(caminho, 'w', newline='') as arquivo:
+        escritor = csv.DictWriter(arquivo, fieldnames=CAMPOS)
+        escritor.writeheader()
+        escritor.writerows(resultados)
+
+# Grava resultados e resumo em JSON
+def salvar_json(resultados: List[dict], resumo: List[dict], caminho: str) -> None:
+    with open(caminho, 'w') as arquivo:
+        json.dump({'resultados': resultados, 'resumo': resumo}, arquivo, indent=2)
+
+# Monta a lista de instâncias a partir dos arquivos TSPLIB e dos tamanhos das instâncias geradas
+def montar_instancias(arquivos: Sequence[str], tamanhos: Sequence[int], semente_instancias: int = 0) -> List[InstanciaTSP]:
+    instancias = [ler_tsplib(caminho) for caminho in arquivos]
+    for n in tamanhos:
+        instancias.append(gerar_uniforme(n, semente_instancias))
+        instancias.append(gerar_agrupada(n, semente_instancias))
+    return instancias
+
+def main():
+    parser = argparse.ArgumentParser(description='Compara o algoritmo genético, o PSO e a força bruta')
+    parser.add_argument('--tsp', nargs='*', default=['berlin52.tsp'], help='instâncias TSPLIB')
+    parser.add_argument('--tamanhos', nargs='*', type=int, default=[10, 100, 1000], help='tamanhos das instâncias geradas (ex.: 10 100 1000 10000)')
+    parser.add_argument('--resolvedores', nargs='*', default=list(RESOLVEDORES), choices=RESOLVEDORES)
+    parser.add_argument('--sementes', nargs='*', type=int, default=[0, 1, 2])
+    parser.add_argument('--max-exato', type=int, default=10, help='maior instância resolvida pela força bruta')
+    parser.add_argument('--tempo-limite', type=float, default=None, help='orçamento por execução, em segundos')
+    parser.add_argument('--geracoes', type=int, default=PARAMETROS_PADRAO['n_geracoes'])
+    parser.add_argument('--pop', type=int, default=PARAMETROS_PADRAO['n_pop'])
+    parser.add_argument('--iteracoes', type=int, default=PARAMETROS_PADRAO['iteracoes'])
+    parser.add_argument('--particulas', type=int, default=PARAMETROS_PADRAO['n_particulas'])
+    parser.add_argument('--tolerancia-alvo', type=float, default=0.05, help='alvo do tempo-até-alvo: gap <= tolerância')
+    parser.add_argument('--memoria', action='store_true', help='mede também o pico de memória, numa repetição de cada execução fora do tempo medido')
+    parser.add_argument('--csv', default='benchmark.csv')
+    parser.add_argument('--json', default='benchmark.json')
+    parser.add_argument('--comparar', default=None, help='JSON de uma execução anterior para detectar regressões')
+    parser.add_argument('--limiar', type=float, default=0.10, help='piora relativa considerada regressão')
+    args = parser.parse_args()
+
+    parametros = {'n_geracoes': args.geracoes, 'n_pop': args.pop, 'iteracoes': args.iteracoes,
+                  'n_particulas': args.particulas, 'tempo_limite': args.tempo_limite}
+    instancias = montar_instancias(args.tsp, args.tamanhos)
+    resultados = executar_benchmark(instancias, args.resolvedores, args.sementes, parametros, args.max_exato,
+                                    args.tolerancia_alvo, args.memoria)
+    resumo = resumir(resultados)
+    salvar_csv(resultados, args.csv)
+    salvar_json(resultados, resumo, args.json)
+
+    for linha in resumo:
+        print('%-14s %-6s tempo médio %8.3f s | %10.0f aval/s | pico %7.1f MB | melhor gap %6.2f%% | gap médio %6.2f%%'
+              % (linha['instancia'], linha['resolvedor'], linha['tempo_medio_s'], linha['avaliacoes_por_s'],
+                 linha['pico_memoria_mb'], 100 * linha['melhor_gap'], 100 * linha['gap_medio']))
+
+    if args.comparar:
+        with open(args.comparar) as arquivo:
+            regressoes = comparar(resumo, json.load(arquivo)['resumo'], args.limiar)
+        for regressao in regressoes:
+            print('Regressão em %s / %s: tempo x%.2f, gap %+.2f%%' % (regressao['instancia'], regressao['resolvedor'],
+                                                                      regressao['razao_tempo'], 100 * regressao['piora_gap']))
+        if regressoes:
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
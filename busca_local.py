@@ -0,0 +1,118 @@
+from collections import deque
+from typing import Tuple
+import numpy as np
+from movimentos import aplicar_or_opt
+
+# Busca local 2-opt / Or-opt sobre uma rota circular, guiada por listas de candidatos
+# (k vizinhos mais próximos) e "don't-look bits": só as cidades cujas arestas mudaram
+# voltam para a fila de cidades a examinar. Supõe instância simétrica.
+
+EPSILON = 1e-9
+
+# Inverte o trecho circular da rota que vai da posição "i" até a posição "j" (inclusive),
+# escolhendo o lado mais curto, e atualiza o array de posições
+def _inverter(rota: np.ndarray, posicao: np.ndarray, i: int, j: int) -> None:
+    n = len(rota)
+    tamanho = (j - i) % n + 1
+    # Inverter o complemento dá a mesma rota circular (percorrida no outro sentido)
+    if 2 * tamanho > n:
+        i, j = (j + 1) % n, (i - 1) % n
+        tamanho = n - tamanho
+    if tamanho < 2:
+        return
+    indices = (i + np.arange(tamanho)) % n
+    rota[indices] = rota[indices[::-1]]
+    posicao[rota[indices]] = indices
+
+# Tenta um movimento 2-opt que ligue a cidade "a" a um dos seus vizinhos. Retorna o delta aplicado (0 se nenhum)
+def _tentar_2opt(a, rota, posicao, distancias, vizinhos, fila, na_fila) -> float:
+    n = len(rota)
+    i = posicao[a]
+    for sentido in (1, -1):
+        b = rota[(i + sentido) % n]
+        custo_ab = distancias[a, b]
+        for c in vizinhos[a]:
+            custo_ac = distancias[a, c]
+            if custo_ac >= custo_ab:
+                break
+            j = posicao[c]
+            d = rota[(j + sentido) % n]
+            if c == b or d == a:
+                continue
+            delta = custo_ac + distancias[b, d] - custo_ab - distancias[c, d]
+            if delta < -EPSILON:
+                # Sentido direto: a b ... c d -> a c ... b d; sentido inverso: d c ... b a -> d b ... c a
+                if sentido == 1:
+                    _inverter(rota, posicao, (i + 1) % n, j)
+                else:
+                    _inverter(rota, posicao, j, (i - 1) % n)
+                _reativar((a, b, c, d), fila, na_fila)
+                return delta
+    return 0.0
+
+# Tenta mover um trecho de 1 a 3 cidades que começa em "a" para perto de um vizinho (Or-opt)
+def _tentar_or_opt(a, rota, posicao, distancias, vizinhos, fila, na_fila, tamanho_maximo) -> float:
+    n = len(rota)
+    i = posicao[a]
+    for tamanho in range(1, min(tamanho_maximo, n - 3) + 1):
+        trecho = [rota[(i + k) % n] for k in range(tamanho)]
+        inicio, fim = trecho[0], trecho[-1]
+        anterior, proximo = rota[(i - 1) % n], rota[(i + tamanho) % n]
+        ganho_remocao = distancias[anterior, inicio] + distancias[fim, proximo] - distancias[anterior, proximo]
+        if ganho_remocao <= EPSILON:
+            continue
+        no_trecho = set(trecho)
+        for extremo in (inicio, fim):
+            for c in vizinhos[extremo]:
+                if distancias[extremo, c] >= ganho_remocao:
+                    break
+                if c in no_trecho:
+                    continue
+                j = posicao[c]
+                # Considera as arestas (c, sucessor de c) e (antecessor de c, c)
+                for u, w in ((c, rota[(j + 1) % n]), (rota[(j - 1) % n], c)):
+                    if u in no_trecho or w in no_trecho:
+                        continue
+                    direto = distancias[u, inicio] + distancias[fim, w]
+                    invertido = distancias[u, fim] + distancias[inicio, w]
+                    delta = min(direto, invertido) - distancias[u, w] - ganho_remocao
+                    if delta < -EPSILON:
+                        # Gira a rota para o trecho começar na posição 0 e aplica o movimento
+                        girada = np.roll(rota, -i)
+                        nova = aplicar_or_opt(girada, 0, tamanho, int((posicao[u] - i) % n), invertido < direto)
+                        rota[:] = nova
+                        posicao[rota] = np.arange(n)
+                        _reativar((anterior, proximo, inicio, fim, u, w), fila, na_fila)
+                        return delta
+    return 0.0
+
+# Devolve cidades para a fila (desliga o "don't-look bit")
+def _reativar(cidades, fila, na_fila) -> None:
+    for cidade in cidades:
+        if not na_fila[cidade]:
+            na_fila[cidade] = True
+            fila.append(cidade)
+
+# Aplica 2-opt e Or-opt até não haver mais melhoria na vizinhança das listas de candidatos
+# Retorna a rota melhorada (uma cópia) e a variação total de custo (<= 0)
+def busca_local(rota, distancias, vizinhos: np.ndarray, usar_or_opt: bool = True, tamanho_maximo_trecho: int = 3) -> Tuple[np.ndarray, float]:
+    rota = np.array(rota, dtype=np.int64)
+    n = len(rota)
+    if n < 5:
+        return rota, 0.0
+    posicao = np.empty(n, dtype=np.int64)
+    posicao[rota] = np.arange(n)
+
+    fila = deque(rota.tolist())
+    na_fila = np.ones(n, dtype=bool)
+    delta_total = 0.0
+    while fila:
+        a = fila.popleft()
+        na_fila[a] = False
+        delta = _tentar_2opt(a, rota, posicao, distancias, vizinhos, fila, na_fila)
+        if delta == 0.0 and usar_or_opt:
+            delta = _tentar_or_opt(a, rota, posicao, distancias, vizinhos, fila, na_fila, tamanho_maximo_trecho)
+        if delta != 0.0:
+            delta_total += delta
+            _reativar((a,), fila, na_fila)
+    return rota, delta_total
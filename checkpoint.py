@@ -0,0 +1,46 @@
+import json, os
+from typing import Optional
+import numpy as np
+
+# Checkpoints dos resolvedores em arquivo ".npz" compactado.
+# Os arrays (população, fitness, pbests, ...) são gravados como estão; o estado do gerador
+# de números aleatórios e os parâmetros vão como texto JSON dentro do mesmo arquivo.
+# A gravação é atômica (arquivo temporário + os.replace), então um processo interrompido
+# no meio da gravação deixa o checkpoint anterior intacto.
+
+# Estado do gerador (bit_generator.state) como texto JSON
+def estado_rng(rng: np.random.Generator) -> str:
+    return json.dumps(rng.bit_generator.state)
+
+# Recria o gerador a partir do texto JSON gravado por estado_rng
+def restaurar_rng(texto: str) -> np.random.Generator:
+    estado = json.loads(texto)
+    bit_generator = getattr(np.random, estado['bit_generator'])()
+    bit_generator.state = estado
+    return np.random.Generator(bit_generator)
+
+# Grava os arrays e os metadados (dicionário serializável em JSON) em "caminho"
+def salvar_checkpoint(caminho: str, metadados: dict, **arrays) -> None:
+    temporario = caminho + '.tmp.npz'
+    with open(temporario, 'wb') as arquivo:
+        np.savez_compressed(arquivo, _metadados=np.array(json.dumps(metadados)), **arrays)
+    os.replace(temporario, caminho)
+
+# Lê um checkpoint: devolve (metadados, arrays)
+def carregar_checkpoint(caminho: str):
+    with np.load(caminho, allow_pickle=False) as dados:
+        arrays = {nome: dados[nome] for nome in dados.files if nome != '_metadados'}
+        if '_metadados' not in dados.files:
+            raise ValueError('Arquivo não é um checkpoint: %s' % caminho)
+        metadados = json.loads(str(dados['_metadados']))
+    return metadados, arrays
+
+# Estado do critério de parada que precisa sobreviver à interrupção (o relógio recomeça)
+def estado_criterio(criterio) -> dict:
+    return {'melhor_custo': float(criterio.melhor_custo), 'sem_melhoria': int(criterio.sem_melhoria)}
+
+# Restaura o estado gravado por estado_criterio
+def restaurar_criterio(criterio, estado: Optional[dict]) -> None:
+    if estado:
+        criterio.melhor_custo = estado['melhor_custo']
+        criterio.sem_melhoria = estado['sem_melhoria']
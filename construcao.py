@@ -0,0 +1,314 @@
+from typing import List, Optional, Sequence
+import numpy as np
+from movimentos import chave_rota
+from vizinhanca import vizinhos_mais_proximos
+
+# Heurísticas de construção de rotas para o início a quente do algoritmo genético e do PSO:
+# vizinho mais próximo, arestas gulosas, estilo Christofides (árvore geradora mínima + emparelhamento
+# guloso dos vértices de grau ímpar + circuito euleriano) e curva de Hilbert.
+# Todas trabalham sobre as listas de k vizinhos mais próximos (grade uniforme de vizinhanca.py), sem
+# matriz n x n, e usam a distância euclidiana das coordenadas; por isso servem para 10k+ cidades.
+
+METODOS = ('vizinho', 'guloso', 'christofides', 'hilbert')
+
+# Distâncias euclidianas da cidade "origem" até as cidades "destinos"
+def _distancias_de(coordenadas: np.ndarray, origem: int, destinos: np.ndarray) -> np.ndarray:
+    return np.sqrt(((coordenadas[destinos] - coordenadas[origem]) ** 2).sum(axis=1))
+
+# Conjunto disjunto (union-find) com compressão de caminho
+def _raiz(pai: List[int], a: int) -> int:
+    while pai[a] != a:
+        pai[a] = pai[pai[a]]
+        a = pai[a]
+    return a
+
+# Arestas candidatas (a < b) das listas de vizinhos, ordenadas pelo comprimento
+def _arestas_candidatas(coordenadas: np.ndarray, vizinhos: np.ndarray):
+    n, k = vizinhos.shape
+    a = np.repeat(np.arange(n), k)
+    b = vizinhos.ravel().astype(np.int64)
+    arestas = np.unique(np.stack((np.minimum(a, b), np.maximum(a, b)), axis=1), axis=0)
+    comprimentos = np.sqrt(((coordenadas[arestas[:, 0]] - coordenadas[arestas[:, 1]]) ** 2).sum(axis=1))
+    ordem = np.argsort(comprimentos, kind='stable')
+    return arestas[ordem], comprimentos[ordem]
+
+def _preparar(coordenadas, vizinhos: Optional[np.ndarray], k: int):
+    coordenadas = np.asarray(coordenadas, dtype=np.float64)
+    if vizinhos is None:
+        vizinhos, _ = vizinhos_mais_proximos(coordenadas, k)
+    return coordenadas, vizinhos
+
+# Vizinho mais próximo a partir de "inicio": segue para o vizinho livre mais próximo da lista de
+# candidatos e, se todos já foram visitados, procura entre todas as cidades livres
+def vizinho_mais_proximo(coordenadas, inicio: int = 0, vizinhos: Optional[np.ndarray] = None, k: int = 10) -> np.ndarray:
+    coordenadas, vizinhos = _preparar(coordenadas, vizinhos, k)
+    n = len(coordenadas)
+    listas = vizinhos.tolist()
+    visitada = [False] * n
+    # Cidades livres com remoção O(1) (troca com a última)
+    livres = list(range(n))
+    indice = list(range(n))
+    rota = np.empty(n, dtype=np.int64)
+    atual = int(inicio)
+    for passo in range(n):
+        rota[passo] = atual
+        visitada[atual] = True
+        ultima = livres[-1]
+        livres[indice[atual]] = ultima
+        indice[ultima] = indice[atual]
+        livres.pop()
+        proxima = -1
+        for vizinho in listas[atual]:
+            if not visitada[vizinho]:
+                proxima = vizinho
+                break
+        if proxima < 0 and livres:
+            candidatas = np.array(livres)
+            proxima = int(candidatas[np.argmin(_distancias_de(coordenadas, atual, candidatas))])
+        atual = proxima
+    return rota
+
+# Percorre fragmentos (caminhos com grau <= 2) ligando o fim de cada um ao extremo livre mais próximo
+def _ligar_fragmentos(coordenadas: np.ndarray, adjacencia: List[List[int]], pai: List[int]) -> np.ndarray:
+    n = len(coordenadas)
+    extremos = np.array([v for v in range(n) if len(adjacencia[v]) < 2], dtype=np.int64)
+    raizes = np.array([_raiz(pai, int(e)) for e in extremos], dtype=np.int64)
+    usado = np.zeros(n, dtype=bool)
+    rota = []
+    atual = int(extremos[0])
+    while True:
+        usado[_raiz(pai, atual)] = True
+        anterior = -1
+        while True:
+            rota.append(atual)
+            seguinte = [v for v in adjacencia[atual] if v != anterior]
+            if not seguinte:
+                break
+            anterior, atual = atual, seguinte[0]
+        if len(rota) >= n:
+            break
+        livres = ~usado[raizes]
+        extremos, raizes = extremos[livres], raizes[livres]
+        atual = int(extremos[np.argmin(_distancias_de(coordenadas, rota[-1], extremos))])
+    return np.array(rota, dtype=np.int64)
+
+# Arestas gulosas: aceita as arestas candidatas da menor para a maior enquanto nenhuma cidade passar
+# de grau 2 nem fechar ciclo; os fragmentos resultantes são ligados pelo extremo mais próximo
+def arestas_gulosas(coordenadas, vizinhos: Optional[np.ndarray] = None, k: int = 10) -> np.ndarray:
+    coordenadas, vizinhos = _preparar(coordenadas, vizinhos, k)
+    n = len(coordenadas)
+    if n < 3:
+        return np.arange(n, dtype=np.int64)
+    arestas, _ = _arestas_candidatas(coordenadas, vizinhos)
+    grau = [0] * n
+    pai = list(range(n))
+    adjacencia = [[] for _ in range(n)]
+    for a, b in arestas.tolist():
+        if grau[a] < 2 and grau[b] < 2:
+            raiz_a, raiz_b = _raiz(pai, a), _raiz(pai, b)
+            if raiz_a != raiz_b:
+                pai[raiz_a] = raiz_b
+                grau[a] += 1
+                grau[b] += 1
+                adjacencia[a].append(b)
+                adjacencia[b].append(a)
+    return _ligar_fragmentos(coordenadas, adjacencia, pai)
+
+# Atualiza, para cada cidade de "alvos", a menor distância (ao quadrado) até as cidades de "fontes"
+# e qual fonte a realiza; calculado em blocos com |a|^2 + |b|^2 - 2 a.b
+def _aproximar(coordenadas: np.ndarray, fontes: np.ndarray, alvos: np.ndarray, distancia: np.ndarray, origem: np.ndarray, tamanho_bloco: int = 1024) -> None:
+    if len(alvos) == 0:
+        return
+    pontos_alvo = coordenadas[alvos]
+    normas_alvo = (pontos_alvo ** 2).sum(axis=1)
+    for inicio in range(0, len(fontes), tamanho_bloco):
+        bloco = fontes[inicio:inicio + tamanho_bloco]
+        pontos = coordenadas[bloco]
+        quadrado = (pontos ** 2).sum(axis=1)[:, None] + normas_alvo[None, :] - 2.0 * pontos @ pontos_alvo.T
+        mais_proxima = np.argmin(quadrado, axis=0)
+        menor = quadrado[mais_proxima, np.arange(len(alvos))]
+        melhorou = menor < distancia[alvos]
+        distancia[alvos[melhorou]] = menor[melhorou]
+        origem[alvos[melhorou]] = bloco[mais_proxima[melhorou]]
+
+# Árvore geradora mínima (Kruskal) sobre as arestas candidatas; se o grafo de candidatos for desconexo
+# (grupos distantes), as componentes são ligadas como no algoritmo de Prim, cada uma pela menor
+# aresta até as componentes já ligadas
+def arvore_geradora(coordenadas, vizinhos: Optional[np.ndarray] = None, k: int = 10) -> np.ndarray:
+    coordenadas, vizinhos = _preparar(coordenadas, vizinhos, k)
+    n = len(coordenadas)
+    pai = list(range(n))
+    arvore = []
+    if n > 1:
+        arestas, _ = _arestas_candidatas(coordenadas, vizinhos)
+        for a, b in arestas.tolist():
+            raiz_a, raiz_b = _raiz(pai, a), _raiz(pai, b)
+            if raiz_a != raiz_b:
+                pai[raiz_a] = raiz_b
+                arvore.append((a, b))
+    if len(arvore) < n - 1:
+        _, componente, tamanhos = np.unique([_raiz(pai, v) for v in range(n)], return_inverse=True, return_counts=True)
+        fora = componente != np.argmax(tamanhos)
+        distancia = np.full(n, np.inf)
+        origem = np.full(n, -1, dtype=np.int64)
+        _aproximar(coordenadas, np.flatnonzero(~fora), np.flatnonzero(fora), distancia, origem)
+        while fora.any():
+            candidatas = np.flatnonzero(fora)
+            b = int(candidatas[np.argmin(distancia[candidatas])])
+            arvore.append((int(origem[b]), b))
+            nova = np.flatnonzero(componente == componente[b])
+            fora[nova] = False
+            _aproximar(coordenadas, nova, np.flatnonzero(fora), distancia, origem)
+    return np.array(arvore, dtype=np.int64).reshape(-1, 2)
+
+# Emparelhamento guloso dos vértices "impares": pares candidatos do mais curto para o mais longo e,
+# para os que sobrarem, o vizinho livre mais próximo
+def _emparelhar(coordenadas: np.ndarray, impares: np.ndarray, k: int) -> List[tuple]:
+    pares = []
+    livre = np.ones(len(impares), dtype=bool)
+    if len(impares) > 2:
+        vizinhos, _ = vizinhos_mais_proximos(coordenadas[impares], k)
+        arestas, _ = _arestas_candidatas(coordenadas[impares], vizinhos)
+        for a, b in arestas.tolist():
+            if livre[a] and livre[b]:
+                livre[a] = livre[b] = False
+                pares.append((int(impares[a]), int(impares[b])))
+    restantes = np.flatnonzero(livre).tolist()
+    while restantes:
+        a = restantes.pop()
+        candidatos = np.array(restantes)
+        b = int(np.argmin(_distancias_de(coordenadas[impares], a, candidatos)))
+        pares.append((int(impares[a]), int(impares[candidatos[b]])))
+        restantes.pop(b)
+    return pares
+
+# Estilo Christofides: árvore geradora mínima + emparelhamento (guloso, não perfeito de custo mínimo)
+# dos vértices de grau ímpar, circuito euleriano (Hierholzer) e atalhos sobre as cidades repetidas
+def christofides(coordenadas, vizinhos: Optional[np.ndarray] = None, k: int = 10) -> np.ndarray:
+    coordenadas, vizinhos = _preparar(coordenadas, vizinhos, k)
+    n = len(coordenadas)
+    if n < 3:
+        return np.arange(n, dtype=np.int64)
+    arvore = arvore_geradora(coordenadas, vizinhos, k)
+    grau = np.bincount(arvore.ravel(), minlength=n)
+    arestas = arvore.tolist() + _emparelhar(coordenadas, np.flatnonzero(grau % 2 == 1), k)
+
+    # Multigrafo com listas de (vizinho, id da aresta)
+    adjacencia = [[] for _ in range(n)]
+    for id_aresta, (a, b) in enumerate(arestas):
+        adjacencia[a].append((b, id_aresta))
+        adjacencia[b].append((a, id_aresta))
+    usada = [False] * len(arestas)
+    proximo_indice = [0] * n
+
+    # Hierholzer iterativo
+    pilha, circuito = [0], []
+    while pilha:
+        v = pilha[-1]
+        lista = adjacencia[v]
+        while proximo_indice[v] < len(lista) and usada[lista[proximo_indice[v]][1]]:
+            proximo_indice[v] += 1
+        if proximo_indice[v] == len(lista):
+            circuito.append(pilha.pop())
+        else:
+            w, id_aresta = lista[proximo_indice[v]]
+            usada[id_aresta] = True
+            pilha.append(w)
+
+    # Atalhos: mantém só a primeira visita de cada cidade
+    circuito = np.array(circuito, dtype=np.int64)
+    _, primeiras = np.unique(circuito, return_index=True)
+    return circuito[np.sort(primeiras)]
+
+# Ordena as cidades pela posição na curva de Hilbert de ordem "ordem" (grade 2^ordem x 2^ordem)
+def curva_hilbert(coordenadas, vizinhos: Optional[np.ndarray] = None, ordem: int = 16) -> np.ndarray:
+    coordenadas = np.asarray(coordenadas, dtype=np.float64)
+    lado = 1 << ordem
+    minimo = coordenadas.min(axis=0)
+    extensao = max(float((coordenadas.max(axis=0) - minimo).max()), 1e-12)
+    x, y = (((coordenadas - minimo) / extensao) * (lado - 1)).round().astype(np.int64).T
+    x, y = x.copy(), y.copy()
+    indice = np.zeros(len(coordenadas), dtype=np.int64)
+    s = lado // 2
+    while s > 0:
+        rx = (x & s) > 0
+        ry = (y & s) > 0
+        indice += s * s * ((3 * rx.astype(np.int64)) ^ ry.astype(np.int64))
+        # Rotaciona o quadrante
+        girar = ~ry
+        refletir = girar & rx
+        x[refletir] = lado - 1 - x[refletir]
+        y[refletir] = lado - 1 - y[refletir]
+        x[girar], y[girar] = y[girar], x[girar].copy()
+        s //= 2
+    return np.argsort(indice, kind='stable')
+
+CONSTRUTORES = {'vizinho': vizinho_mais_proximo, 'guloso': arestas_gulosas, 'christofides': christofides, 'hilbert': curva_hilbert}
+
+# Constrói até "quantidade" rotas distintas: uma de cada método (todos determinísticos) e, para completar,
+# vizinho mais próximo a partir de cidades iniciais sorteadas com "rng". A unicidade é verificada pela chave canônica
+def rotas_construidas(coordenadas, quantidade: int, rng: Optional[np.random.Generator] = None, metodos: Sequence[str] = METODOS, k: int = 10) -> List[np.ndarray]:
+    rng = np.random.default_rng(rng)
+    for metodo in metodos:
+        if metodo not in CONSTRUTORES:
+            raise ValueError('Método de construção desconhecido: %s' % metodo)
+    coordenadas = np.asarray(coordenadas, dtype=np.float64)
+    n = len(coordenadas)
+    if quantidade <= 0 or n == 0:
+        return []
+    vizinhos, _ = vizinhos_mais_proximos(coordenadas, k)
+    rotas, chaves = [], set()
+
+    def adicionar(rota):
+        chave = chave_rota(rota)
+        if chave not in chaves:
+            chaves.add(chave)
+            rotas.append(rota)
+
+    for metodo in metodos:
+        if len(rotas) >= quantidade:
+            break
+        adicionar(CONSTRUTORES[metodo](coordenadas, vizinhos=vizinhos))
+    if 'vizinho' in metodos or not metodos:
+        for inicio in rng.permutation(n)[:max(0, 2 * (quantidade - len(rotas)))]:
+            if len(rotas) >= quantidade:
+                break
+            adicionar(vizinho_mais_proximo(coordenadas, int(inicio), vizinhos))
+    return rotas
+
+# População inicial com uma fração "fracao" de rotas construídas e o resto sorteado,
+# sem repetições (rotas iguais a menos de rotação / sentido contam como repetidas)
+# "rotas_iniciais" (ex.: a população de uma execução anterior) entram antes das construídas
+def populacao_semeada(coordenadas, n_pop: int, fracao: float, rng: Optional[np.random.Generator] = None, metodos: Sequence[str] = METODOS, tentativas: int = 10,
+                      rotas_iniciais: Optional[Sequence[np.ndarray]] = None) -> np.ndarray:
+    rng = np.random.default_rng(rng)
+    n = len(coordenadas)
+    pop = np.empty((n_pop, n), dtype=np.int64)
+    chaves = set()
+    preenchidas = 0
+    for rota in rotas_iniciais if rotas_iniciais is not None else []:
+        chave = chave_rota(rota)
+        if preenchidas < n_pop and chave not in chaves:
+            chaves.add(chave)
+            pop[preenchidas] = rota
+            preenchidas += 1
+    for rota in rotas_construidas(coordenadas, min(int(round(fracao * n_pop)), n_pop - preenchidas), rng, metodos):
+        chave = chave_rota(rota)
+        if chave not in chaves:
+            chaves.add(chave)
+            pop[preenchidas] = rota
+            preenchidas += 1
+    for _ in range(tentativas):
+        if preenchidas == n_pop:
+            break
+        sorteadas = rng.permuted(np.tile(np.arange(n), (n_pop - preenchidas, 1)), axis=1)
+        for rota in sorteadas:
+            chave = chave_rota(rota)
+            if chave not in chaves:
+                chaves.add(chave)
+                pop[preenchidas] = rota
+                preenchidas += 1
+    # Instâncias minúsculas podem ter menos rotas distintas que "n_pop": completa com repetições
+    if preenchidas < n_pop:
+        pop[preenchidas:] = rng.permuted(np.tile(np.arange(n), (n_pop - preenchidas, 1)), axis=1)
+    return pop
@@ -0,0 +1,55 @@
+import time
+from typing import Callable, Optional
+import numpy as np
+
+# Critérios de parada compartilhados pelo algoritmo genético e pelo PSO.
+# O resolvedor chama "atualizar" ao fim de cada geração / iteração com a melhor rota
+# e o melhor custo até o momento; quando algum critério é atingido, "atualizar"
+# devolve True e "motivo" diz qual foi. Assim a execução pode ser interrompida
+# dentro de um prazo e ainda devolver a melhor solução encontrada até ali.
+
+# Assinatura do callback: callback(iteracao, melhor_rota, melhor_custo); devolver True pede a parada
+Callback = Callable[[int, np.ndarray, float], Optional[bool]]
+
+class CriterioParada:
+
+    def __init__(self, tempo_limite: Optional[float] = None, limite_estagnacao: Optional[int] = None, custo_alvo: Optional[float] = None, callback: Optional[Callback] = None):
+        self.tempo_limite = tempo_limite  # orçamento de tempo de relógio, em segundos
+        self.limite_estagnacao = limite_estagnacao  # iterações seguidas sem melhoria do melhor custo
+        self.custo_alvo = custo_alvo  # para assim que o melhor custo for menor ou igual a este valor
+        self.callback = callback
+        self.reiniciar()
+
+    # Zera o relógio e o contador de estagnação
+    def reiniciar(self) -> None:
+        self.inicio = time.perf_counter()
+        self.melhor_custo = np.inf
+        self.sem_melhoria = 0
+        self.motivo = None
+
+    # Tempo decorrido desde o início, em segundos
+    def tempo_decorrido(self) -> float:
+        return time.perf_counter() - self.inicio
+
+    # Verifica os critérios depois da iteração "iteracao" e devolve True se a execução deve parar
+    def atualizar(self, iteracao: int, melhor_rota: np.ndarray, melhor_custo: float) -> bool:
+        if melhor_custo < self.melhor_custo:
+            self.melhor_custo = melhor_custo
+            self.sem_melhoria = 0
+        else:
+            self.sem_melhoria += 1
+
+        # O callback é chamado em toda iteração, mesmo quando outro critério também será atingido
+        if self.callback is not None and self.callback(iteracao, melhor_rota, melhor_custo):
+            self.motivo = 'callback'
+        elif self.custo_alvo is not None and melhor_custo <= self.custo_alvo:
+            self.motivo = 'custo_alvo'
+        elif self.limite_estagnacao is not None and self.sem_melhoria >= self.limite_estagnacao:
+            self.motivo = 'estagnacao'
+        elif self.tempo_limite is not None and self.tempo_decorrido() >= self.tempo_limite:
+            self.motivo = 'tempo_limite'
+        return self.motivo is not None
+
+    # Indica se algum critério foi configurado (sem nenhum, o resolvedor roda todas as iterações)
+    def ativo(self) -> bool:
+        return any(valor is not None for valor in (self.tempo_limite, self.limite_estagnacao, self.custo_alvo, self.callback))
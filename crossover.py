@@ -0,0 +1,132 @@
+from typing import Optional, Tuple
+import numpy as np
+
+# Operadores de crossover para permutações em tempo linear.
+# Cada operador recebe lotes de pares de pais, arrays (n_pares, n_genes), e os pontos
+# de corte de cada par (inclusive), e devolve os dois lotes de filhos.
+# As buscas "gene in filho" / np.where(filho == gene) foram trocadas por arrays de
+# posição (permutação inversa), atualizados a cada troca.
+
+OPERADORES = ('pmx', 'ox', 'erx')
+
+# Calcula a permutação inversa de cada linha: posicao[r, pop[r, i]] = i
+def posicoes(pop: np.ndarray) -> np.ndarray:
+    linhas = np.arange(pop.shape[0])[:, None]
+    posicao = np.empty_like(pop)
+    posicao[linhas, pop] = np.arange(pop.shape[1])[None, :]
+    return posicao
+
+# Monta os lotes de filhos a partir de (base, doador): o filho 1 parte do pai 1 e recebe o trecho do pai 2,
+# o filho 2 faz o contrário
+def _empilhar(pais_1: np.ndarray, pais_2: np.ndarray, cortes_1: np.ndarray, cortes_2: np.ndarray):
+    base = np.concatenate((pais_1, pais_2))
+    doador = np.concatenate((pais_2, pais_1))
+    return base, doador, np.concatenate((cortes_1, cortes_1)), np.concatenate((cortes_2, cortes_2))
+
+# Partially Mapped Crossover (PMX) em lote
+# O filho começa como cópia do pai base e, para cada posição do trecho, a troca que coloca o gene do doador
+# naquela posição é feita com o array de posições: o resultado é o mesmo do mapeamento em cadeia do PMX
+def pmx_lote(pais_1: np.ndarray, pais_2: np.ndarray, cortes_1: np.ndarray, cortes_2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    n_pares = pais_1.shape[0]
+    if n_pares == 0:
+        return pais_1.copy(), pais_2.copy()
+    filhos, doador, cortes_1, cortes_2 = _empilhar(pais_1, pais_2, cortes_1, cortes_2)
+    posicao = posicoes(filhos)
+    linhas = np.arange(filhos.shape[0])
+    for k in range(int(cortes_1.min()), int(cortes_2.max()) + 1):
+        ativas = linhas[(cortes_1 <= k) & (k <= cortes_2)]
+        gene = doador[ativas, k]
+        atual = filhos[ativas, k]
+        j = posicao[ativas, gene]
+        filhos[ativas, k] = gene
+        filhos[ativas, j] = atual
+        posicao[ativas, gene] = k
+        posicao[ativas, atual] = j
+    return filhos[:n_pares], filhos[n_pares:]
+
+# Order Crossover (OX) em lote
+# O filho mantém o trecho do pai base e recebe os demais genes na ordem em que aparecem no doador,
+# a partir da posição seguinte ao segundo corte
+def ox_lote(pais_1: np.ndarray, pais_2: np.ndarray, cortes_1: np.ndarray, cortes_2: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    n_pares = pais_1.shape[0]
+    base, doador, cortes_1, cortes_2 = _empilhar(pais_1, pais_2, cortes_1, cortes_2)
+    n_linhas, n_genes = base.shape
+    linhas = np.arange(n_linhas)[:, None]
+    passos = np.arange(n_genes)[None, :]
+
+    # Posições a partir do segundo corte, dando a volta: as n - tamanho primeiras estão fora do trecho
+    ordem = (cortes_2[:, None] + 1 + passos) % n_genes
+    sequencia = doador[linhas, ordem]
+    posicao_base = posicoes(base)[linhas, sequencia]
+    no_trecho = (posicao_base >= cortes_1[:, None]) & (posicao_base <= cortes_2[:, None])
+    # Leva os genes que não estão no trecho para o começo, mantendo a ordem do doador
+    sequencia = np.take_along_axis(sequencia, np.argsort(no_trecho, axis=1, kind='stable'), axis=1)
+
+    filhos = base.copy()
+    fora = passos < (n_genes - (cortes_2 - cortes_1 + 1))[:, None]
+    filhos[np.broadcast_to(linhas, fora.shape)[fora], ordem[fora]] = sequencia[fora]
+    return filhos[:n_pares], filhos[n_pares:]
+
+# Edge Recombination Crossover (ERX) de um par de pais, começando pela cidade "inicio"
+# A tabela de arestas tem no máximo 4 vizinhos por cidade, então cada passo é O(1) e o filho sai em O(n)
+def erx(pai_1: np.ndarray, pai_2: np.ndarray, inicio: int, rng: Optional[np.random.Generator] = None) -> np.ndarray:
+    rng = np.random.default_rng(rng)
+    n_genes = len(pai_1)
+    # Sorteios usados quando a cidade atual não tem vizinho livre, feitos todos de uma vez
+    sorteios = rng.random(n_genes).tolist()
+    # Vizinho anterior e seguinte de cada cidade em cada pai, indexados pela permutação inversa
+    posicao_1, posicao_2 = posicoes(np.stack((pai_1, pai_2)))
+    adjacencia = np.stack((np.roll(pai_1, 1)[posicao_1], np.roll(pai_1, -1)[posicao_1],
+                           np.roll(pai_2, 1)[posicao_2], np.roll(pai_2, -1)[posicao_2]), axis=1)
+    # Remove os vizinhos repetidos (arestas presentes nos dois pais)
+    for coluna in range(1, 4):
+        repetido = (adjacencia[:, coluna:coluna + 1] == adjacencia[:, :coluna]).any(axis=1)
+        adjacencia[repetido, coluna] = -1
+    adjacencia = adjacencia.tolist()
+    grau = [sum(1 for v in vizinhos if v >= 0) for vizinhos in adjacencia]
+
+    # Cidades não visitadas, com remoção O(1) (troca com a última)
+    restantes = list(range(n_genes))
+    indice = list(range(n_genes))
+    visitada = [False] * n_genes
+
+    filho = np.empty(n_genes, dtype=pai_1.dtype)
+    atual = int(inicio)
+    for passo in range(n_genes):
+        filho[passo] = atual
+        visitada[atual] = True
+        ultimo = restantes[-1]
+        restantes[indice[atual]] = ultimo
+        indice[ultimo] = indice[atual]
+        restantes.pop()
+
+        proximo, menor_grau = -1, 5
+        for vizinho in adjacencia[atual]:
+            if vizinho >= 0 and not visitada[vizinho]:
+                grau[vizinho] -= 1
+                if grau[vizinho] < menor_grau:
+                    proximo, menor_grau = vizinho, grau[vizinho]
+        if proximo < 0 and restantes:
+            proximo = restantes[int(sorteios[passo] * len(restantes))]
+        atual = proximo
+    return filho
+
+# ERX em lote: o filho 1 começa pela primeira cidade do pai 1 e o filho 2 pela primeira cidade do pai 2
+def erx_lote(pais_1: np.ndarray, pais_2: np.ndarray, rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    rng = np.random.default_rng(rng)
+    filhos_1 = np.empty_like(pais_1)
+    filhos_2 = np.empty_like(pais_2)
+    for i in range(pais_1.shape[0]):
+        filhos_1[i] = erx(pais_1[i], pais_2[i], pais_1[i, 0], rng)
+        filhos_2[i] = erx(pais_2[i], pais_1[i], pais_2[i, 0], rng)
+    return filhos_1, filhos_2
+
+# Aplica o operador escolhido a um lote de pares de pais
+def crossover_lote(pais_1: np.ndarray, pais_2: np.ndarray, cortes_1: np.ndarray, cortes_2: np.ndarray, operador: str = 'pmx', rng: Optional[np.random.Generator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    if operador == 'pmx':
+        return pmx_lote(pais_1, pais_2, cortes_1, cortes_2)
+    if operador == 'ox':
+        return ox_lote(pais_1, pais_2, cortes_1, cortes_2)
+    if operador == 'erx':
+        return erx_lote(pais_1, pais_2, rng)
+    raise ValueError('Operador de crossover desconhecido: %s' % operador)
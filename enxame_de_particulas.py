@@ -1,82 +1,177 @@
-from operator import attrgetter
-import random, sys, time, copy
-import matplotlib.pyplot as plt
+import sys
+import numpy as np
+from busca_local import busca_local
+from checkpoint import carregar_checkpoint, estado_criterio, estado_rng, restaurar_criterio, restaurar_rng, salvar_checkpoint
+from construcao import rotas_construidas
+from criterios import CriterioParada
+from instrumentacao import ou_desligadas
+from movimentos import delta_troca_lote
+from tsplib import ler_tsplib, matriz_distancias
+from vizinhanca import DistanciasSobDemanda, vizinhos_da_matriz, vizinhos_mais_proximos
 
 
 # Classe que representa um grafo
+# As arestas ficam numa matriz densa NumPy (n x n) em vez de um dicionário indexado por tuplas
 class Grafo:
 
-    def __init__(self, quantidade_vertices):
-        self.arestas = {}  # dicionário de arestas
+    def __init__(self, quantidade_vertices, dtype=np.int32):
+        self.matriz = np.zeros((quantidade_vertices, quantidade_vertices), dtype=dtype)  # matriz de custos
+        self.existentes = np.zeros((quantidade_vertices, quantidade_vertices), dtype=bool)  # arestas adicionadas
         self.vertices = set()  # conjunto de vértices
         self.quantidade_vertices = quantidade_vertices  # quantidade de vértices
+        self.vizinhos = None  # listas de vizinhos mais próximos (calculadas sob demanda)
+        self.coordenadas = None  # coordenadas dos vértices, quando o grafo foi criado a partir delas
+
+    # Cria um grafo completo a partir de um array de coordenadas (n, 2) numa única passada vetorizada
+    # As distâncias seguem o EDGE_WEIGHT_TYPE do TSPLIB indicado em "tipo_peso"
+    @classmethod
+    def deCoordenadas(cls, coordenadas, tipo_peso='EUC_2D', dtype=np.int32, tamanho_bloco=1024):
+        n = len(coordenadas)
+        grafo = cls(n, dtype=dtype)
+        # Calcula em blocos de linhas para não alocar o array (n, n, 2) de diferenças de uma vez
+        grafo.matriz = matriz_distancias(coordenadas, tipo_peso, dtype=dtype, tamanho_bloco=tamanho_bloco)
+        grafo.existentes[:] = True
+        np.fill_diagonal(grafo.existentes, False)
+        grafo.vertices = set(range(n))
+        grafo.coordenadas = np.asarray(coordenadas, dtype=np.float64)
+        return grafo
+
+    # Cria um grafo completo a partir de uma matriz de custos já calculada (ex.: atualizada por reotimizacao.py)
+    # "vizinhos", se informado, evita recalcular as listas de vizinhos mais próximos
+    @classmethod
+    def deMatriz(cls, matriz, coordenadas=None, vizinhos=None):
+        # Cria o grafo vazio (sem alocar outra matriz n x n) e adota a matriz informada
+        grafo = cls(0, dtype=matriz.dtype)
+        grafo.quantidade_vertices = len(matriz)
+        grafo.matriz = matriz
+        grafo.existentes = ~np.eye(len(matriz), dtype=bool)
+        grafo.vertices = set(range(len(matriz)))
+        grafo.vizinhos = vizinhos
+        grafo.coordenadas = None if coordenadas is None else np.asarray(coordenadas, dtype=np.float64)
+        return grafo
 
     # Adiciona uma aresta ligando "src" a "dest" com um "custo"
     def adicionarAresta(self, src, dest, custo=0):
         # Verifica se a aresta já existe
-        if not self.existeAresta(src, dest):
-            self.arestas[(src, dest)] = custo
+        if not self.existentes[src, dest]:
+            self.matriz[src, dest] = custo
+            self.existentes[src, dest] = True
+            self.vizinhos = None
             self.vertices.add(src)
             self.vertices.add(dest)
 
     # Verifica se existe uma aresta ligando "src" a "dest"
     def existeAresta(self, src, dest):
-        return (True if (src, dest) in self.arestas else False)
+        return bool(self.existentes[src, dest])
 
     # Mostra todas as ligações do grafo
     def mostrarGrafo(self):
         print('Mostrando o grafo:\n')
-        for aresta in self.arestas:
-            print('%d ligado em %d com custo %d' % (aresta[0], aresta[1], self.arestas[aresta]))
+        for src, dest in zip(*np.nonzero(self.existentes)):
+            print('%d ligado em %d com custo %d' % (src, dest, self.matriz[src, dest]))
 
     # Retorna o custo total do caminho
     def getCustoCaminho(self, caminho):
+        caminho = np.asarray(caminho[:self.quantidade_vertices])
+        # Soma todas as arestas, incluindo a última (de volta ao início), de uma só vez
+        custos = self.matriz[caminho, np.roll(caminho, -1)]
+        return custos.sum(dtype=np.float64 if custos.dtype.kind == 'f' else np.int64).item()
 
-        custo_total = 0
-        for i in range(self.quantidade_vertices - 1):
-            custo_total += self.arestas[(caminho[i], caminho[i + 1])]
-
-        # Adiciona o custo da última aresta
-        custo_total += self.arestas[(caminho[self.quantidade_vertices - 1], caminho[0])]
-        return custo_total
+    # Retorna as listas dos "k" vizinhos mais próximos de cada vértice (calculadas uma única vez)
+    def getVizinhos(self, k=10):
+        if self.vizinhos is None:
+            self.vizinhos, _ = vizinhos_da_matriz(self.matriz, k)
+        return self.vizinhos
 
     # Obtém caminhos únicos aleatórios - retorna uma lista de listas de caminhos
-    def getCaminhosAleatorios(self, tamanho_maximo):
+    # "rng" é um numpy.random.Generator ou uma semente
+    # "caminhos_iniciais" (rotas já construídas) entram primeiro, girados para começar no vértice inicial
+    # A unicidade é verificada num conjunto com os bytes de cada caminho (O(1) por caminho)
+    def getCaminhosAleatorios(self, tamanho_maximo, rng=None, caminhos_iniciais=None):
 
+        rng = np.random.default_rng(rng)
         caminhos_aleatorios, lista_vertices = [], list(self.vertices)
 
-        vertice_inicial = random.choice(lista_vertices)
+        vertice_inicial = lista_vertices[rng.integers(len(lista_vertices))]
         if vertice_inicial not in lista_vertices:
             print('Erro: vértice inicial %d não existe!' % vertice_inicial)
             sys.exit(1)
 
         lista_vertices.remove(vertice_inicial)
         lista_vertices.insert(0, vertice_inicial)
-
-        for i in range(tamanho_maximo):
-            lista_temporaria = lista_vertices[1:]
-            random.shuffle(lista_temporaria)
-            lista_temporaria.insert(0, vertice_inicial)
-
-            if lista_temporaria not in caminhos_aleatorios:
-                caminhos_aleatorios.append(lista_temporaria)
+        vistos = set()
+
+        for caminho in (caminhos_iniciais or [])[:tamanho_maximo]:
+            caminho = np.asarray(caminho, dtype=np.int64)
+            caminho = np.roll(caminho, -int(np.flatnonzero(caminho == vertice_inicial)[0]))
+            if caminho.tobytes() not in vistos:
+                vistos.add(caminho.tobytes())
+                caminhos_aleatorios.append(caminho.tolist())
+
+        # Sorteia todas as permutações de uma vez
+        restantes = tamanho_maximo - len(caminhos_aleatorios)
+        permutacoes = rng.permuted(np.tile(np.array(lista_vertices[1:], dtype=np.int64), (max(restantes, 0), 1)), axis=1)
+        permutacoes = np.concatenate((np.full((len(permutacoes), 1), vertice_inicial, dtype=np.int64), permutacoes), axis=1)
+        for lista_temporaria in permutacoes:
+            if lista_temporaria.tobytes() not in vistos:
+                vistos.add(lista_temporaria.tobytes())
+                caminhos_aleatorios.append(lista_temporaria.tolist())
 
         return caminhos_aleatorios
 
 # Classe que representa um grafo completo
 class GrafoCompleto(Grafo):
 
-    # Gera um grafo completo
-    def gerar(self):
-        for i in range(self.quantidade_vertices):
-            for j in range(self.quantidade_vertices):
-                if i != j:
-                    peso = random.randint(1, 10)
-                    self.adicionarAresta(i, j, peso)
+    # Gera um grafo completo; "semente" é um inteiro ou um numpy.random.Generator
+    def gerar(self, semente=None):
+        n = self.quantidade_vertices
+        pesos = np.random.default_rng(semente).integers(1, 11, size=(n, n))
+        # Só preenche as arestas que ainda não existem, como adicionarAresta faria
+        novas = ~self.existentes & ~np.eye(n, dtype=bool)
+        self.matriz[novas] = pesos[novas]
+        self.existentes |= novas
+        self.vizinhos = None
+        if n > 1:
+            self.vertices.update(range(n))
+
+# Grafo completo implícito para instâncias grandes: nenhuma matriz n x n é alocada.
+# O custo de qualquer aresta é calculado sob demanda a partir das coordenadas e só as
+# listas dos "k_vizinhos" mais próximos de cada vértice ficam guardadas
+class GrafoCandidatos(Grafo):
+
+    # "vizinhos" (n, k), se informado, é usado no lugar da busca na grade (ex.: listas atualizadas por reotimizacao.py)
+    def __init__(self, coordenadas, k_vizinhos=10, tipo_peso='EUC_2D', vizinhos=None):
+        self.quantidade_vertices = len(coordenadas)
+        self.matriz = DistanciasSobDemanda(coordenadas, tipo_peso)
+        self.vertices = set(range(self.quantidade_vertices))
+        self.coordenadas = self.matriz.coordenadas
+        # Vizinhos mais próximos de cada vértice e os respectivos custos
+        if vizinhos is None:
+            self.vizinhos, self.custos_vizinhos = vizinhos_mais_proximos(coordenadas, k_vizinhos, tipo_peso)
+        else:
+            self.vizinhos = np.asarray(vizinhos)
+            self.custos_vizinhos = self.matriz[np.arange(self.quantidade_vertices)[:, None], self.vizinhos]
+
+    # As arestas são definidas pelas coordenadas: o grafo de candidatos é somente leitura
+    def adicionarAresta(self, src, dest, custo=0):
+        raise TypeError('GrafoCandidatos é somente leitura: os custos vêm das coordenadas')
+
+    # Todo par de vértices distintos está ligado
+    def existeAresta(self, src, dest):
+        return src != dest and 0 <= src < self.quantidade_vertices and 0 <= dest < self.quantidade_vertices
+
+    # Mostra apenas as ligações com os vizinhos mais próximos
+    def mostrarGrafo(self):
+        print('Mostrando as listas de candidatos do grafo:\n')
+        for src in range(self.quantidade_vertices):
+            for dest, custo in zip(self.vizinhos[src], self.custos_vizinhos[src]):
+                print('%d ligado em %d com custo %d' % (src, dest, custo))
 
 # Classe que representa uma partícula
 class Particula:
 
+    __slots__ = ('solucao', 'pbest', 'custo_solucao_atual', 'custo_pbest_solucao', 'velocidade')
+
     def __init__(self, solucao, custo):
 
         # Solução atual
@@ -137,35 +232,174 @@ class Particula:
     def limparVelocidade(self):
         del self.velocidade[:]
 
+# Visão de uma partícula do enxame: mesma interface de Particula, mas os dados ficam
+# nas linhas "indice" dos arrays do PSO (nada é copiado até ser lido)
+class ParticulaEnxame(Particula):
+
+    __slots__ = ('enxame', 'indice')
+
+    def __init__(self, enxame, indice):
+        self.enxame = enxame
+        self.indice = indice
+
+    @property
+    def solucao(self):
+        return self.enxame.posicoes[self.indice].tolist()
+
+    @solucao.setter
+    def solucao(self, solucao):
+        self.enxame.posicoes[self.indice] = solucao
+
+    @property
+    def pbest(self):
+        return self.enxame.pbests[self.indice].tolist()
+
+    @pbest.setter
+    def pbest(self, pbest):
+        self.enxame.pbests[self.indice] = pbest
+
+    @property
+    def custo_solucao_atual(self):
+        return self.enxame.custos[self.indice].item()
+
+    @custo_solucao_atual.setter
+    def custo_solucao_atual(self, custo):
+        self.enxame.custos[self.indice] = custo
+
+    @property
+    def custo_pbest_solucao(self):
+        return self.enxame.custos_pbest[self.indice].item()
+
+    @custo_pbest_solucao.setter
+    def custo_pbest_solucao(self, custo):
+        self.enxame.custos_pbest[self.indice] = custo
+
+    # A velocidade da última iteração, reconstruída dos arrays de trocas como lista de (i, j, probabilidade)
+    @property
+    def velocidade(self):
+        velocidade = []
+        for trocas, probabilidade in ((self.enxame.trocas_pbest, self.enxame.alfa), (self.enxame.trocas_gbest, self.enxame.beta)):
+            for i, j in enumerate(trocas[self.indice].tolist()):
+                if j >= 0:
+                    velocidade.append((i, j, probabilidade))
+        return velocidade
+
+    # Grava a velocidade nas linhas dos arrays de trocas: cada (i, j, probabilidade) vai para a sequência
+    # do pbest se a probabilidade for "alfa", senão para a do gbest se for "beta" (no máximo uma troca por posição i)
+    @velocidade.setter
+    def velocidade(self, velocidade):
+        n = self.enxame.posicoes.shape[1]
+        pbest, gbest = np.full(n, -1), np.full(n, -1)
+        for i, j, probabilidade in velocidade:
+            if probabilidade == self.enxame.alfa:
+                linha = pbest
+            elif probabilidade == self.enxame.beta:
+                linha = gbest
+            else:
+                raise ValueError('probabilidade %r não é alfa nem beta do enxame' % (probabilidade,))
+            if not (0 <= i < n and 0 <= j < n) or linha[i] >= 0:
+                raise ValueError('troca (%d, %d) inválida ou repetida na posição %d' % (i, j, i))
+            linha[i] = j
+        self.enxame.trocas_pbest[self.indice] = pbest
+        self.enxame.trocas_gbest[self.indice] = gbest
+
+    # Remove todas as trocas da partícula nos arrays do enxame
+    def limparVelocidade(self):
+        self.velocidade = []
+
 # Algoritmo PSO
+# O enxame fica em arrays NumPy (n_particulas, n): posições, pbests e custos. As sequências de troca
+# de todas as partículas são calculadas juntas, posição a posição, com arrays de permutação inversa,
+# e os operadores são aplicados com máscaras aleatórias sorteadas em lote
 class PSO:
 
-    def __init__(self, grafo, iteracoes, tamanho_populacao, beta=1, alfa=1):
+    # aplicarTrocas usa o delta quando (passos da sequência de trocas) * ELEMENTOS_POR_PASSO não passa
+    # do número de arestas a reavaliar: cada passo custa algumas chamadas numpy, cada aresta uma consulta
+    ELEMENTOS_POR_PASSO = 1024
+
+    # "fracao_construida" (0 a 1) do enxame inicial vem das heurísticas de construção (construcao.py);
+    # exige um grafo criado a partir de coordenadas
+    # "caminhos_iniciais" (ex.: os pbests de uma execução anterior) entram no enxame antes dos construídos
+    def __init__(self, grafo, iteracoes, tamanho_populacao, beta=1, alfa=1, melhoria_local=None, semente=None, fracao_construida=0.0, caminhos_iniciais=None):
         self.grafo = grafo  # o grafo
         self.iteracoes = iteracoes  # máximo de iterações
         self.tamanho_populacao = tamanho_populacao  # tamanho da população
-        self.particulas = []  # lista de partículas
         self.beta = beta  # a probabilidade de todos os operadores de troca na sequência de troca (gbest - x(t-1))
         self.alfa = alfa  # a probabilidade de todos os operadores de troca na sequência de troca (pbest - x(t-1))
-
-        # Inicializado com um grupo de partículas (soluções) aleatórias
-        solucoes = self.grafo.getCaminhosAleatorios(self.tamanho_populacao)
+        self.melhoria_local = melhoria_local  # None, 'gbest' ou 'pbest': onde aplicar a busca local 2-opt / Or-opt
+        self.rng = np.random.default_rng(semente)  # gerador de números aleatórios (semente ou numpy.random.Generator)
+        self.criterio = None  # critério de parada da última execução (CriterioParada)
+        self.estatisticas = None  # estatísticas da última execução (instrumentacao.Estatisticas)
+        self.iteracao = 0  # próxima iteração a executar (diferente de 0 só ao retomar um checkpoint)
+        self._estado_criterio = None  # estado do critério de parada trazido do checkpoint
+
+        # Inicializado com um grupo de partículas (soluções) aleatórias, parte delas construídas
+        iniciais = list(caminhos_iniciais) if caminhos_iniciais is not None else []
+        if fracao_construida > 0:
+            if getattr(self.grafo, 'coordenadas', None) is None:
+                raise ValueError('fracao_construida exige um grafo criado a partir de coordenadas')
+            iniciais += rotas_construidas(self.grafo.coordenadas, int(round(fracao_construida * self.tamanho_populacao)), self.rng)
+        solucoes = self.grafo.getCaminhosAleatorios(self.tamanho_populacao, self.rng, iniciais or None)
 
         # Verifica se existem soluções
         if not solucoes:
             print('População inicial vazia! Tente executar o algoritmo novamente...')
             sys.exit(1)
 
-        # Cria as partículas e inicialização das sequências de troca em todas as partículas
-        for solucao in solucoes:
-            # Cria uma nova partícula
-            particula = Particula(solucao=solucao, custo=grafo.getCustoCaminho(solucao))
-            # Adiciona a partícula
-            self.particulas.append(particula)
-
-        # Atualiza o "tamanho_populacao"
+        # Arrays do enxame
+        self.posicoes = np.array(solucoes, dtype=np.int64)  # solução atual de cada partícula
+        self.pbests = self.posicoes.copy()  # melhor solução de cada partícula
+        self.custos = self.custosCaminhos(self.posicoes)  # custo da solução atual
+        self.custos_pbest = self.custos.copy()  # custo do pbest
+        # Sequências de troca da última iteração: trocas[p, i] = j para o operador SO(i, j), -1 se não há troca
+        self.trocas_pbest = -np.ones_like(self.posicoes)
+        self.trocas_gbest = -np.ones_like(self.posicoes)
+
+        self.criarVisoes()
+
+    # Cria as visões compatíveis com Particula e atualiza o gbest e o "tamanho_populacao"
+    def criarVisoes(self):
+        self.particulas = [ParticulaEnxame(self, i) for i in range(len(self.posicoes))]
+        self.gbest = self.particulas[int(np.argmin(self.custos_pbest))]
         self.tamanho_populacao = len(self.particulas)
 
+    # Grava o estado completo do enxame (arrays, gerador, iteração e parâmetros) num arquivo ".npz"
+    # "iteracao" é a próxima iteração a executar
+    def salvarCheckpoint(self, arquivo, iteracao):
+        metadados = {'iteracao': iteracao, 'iteracoes': self.iteracoes, 'beta': self.beta, 'alfa': self.alfa,
+                     'melhoria_local': self.melhoria_local, 'rng': estado_rng(self.rng),
+                     'criterio': estado_criterio(self.criterio) if self.criterio is not None else None}
+        salvar_checkpoint(arquivo, metadados, posicoes=self.posicoes, pbests=self.pbests, custos=self.custos,
+                          custos_pbest=self.custos_pbest, trocas_pbest=self.trocas_pbest, trocas_gbest=self.trocas_gbest)
+
+    # Recria o PSO a partir de um checkpoint; executar() continua da iteração gravada
+    # O grafo não é gravado: deve ser o mesmo usado na execução original
+    @classmethod
+    def deCheckpoint(cls, grafo, arquivo):
+        metadados, arrays = carregar_checkpoint(arquivo)
+        if arrays['posicoes'].shape[1] != grafo.quantidade_vertices:
+            raise ValueError('O checkpoint tem %d vértices, mas o grafo tem %d' % (arrays['posicoes'].shape[1], grafo.quantidade_vertices))
+        pso = cls.__new__(cls)
+        pso.grafo = grafo
+        pso.iteracoes = metadados['iteracoes']
+        pso.beta = metadados['beta']
+        pso.alfa = metadados['alfa']
+        pso.melhoria_local = metadados['melhoria_local']
+        pso.rng = restaurar_rng(metadados['rng'])
+        pso.criterio = None
+        pso.estatisticas = None
+        pso.iteracao = metadados['iteracao']
+        pso._estado_criterio = metadados['criterio']
+        for nome in ('posicoes', 'pbests', 'custos', 'custos_pbest', 'trocas_pbest', 'trocas_gbest'):
+            setattr(pso, nome, arrays[nome])
+        pso.criarVisoes()
+        return pso
+
+    # Calcula o custo de várias rotas (n_rotas, n) de uma vez
+    def custosCaminhos(self, caminhos):
+        custos = self.grafo.matriz[caminhos, np.roll(caminhos, -1, axis=1)]
+        return custos.sum(axis=1, dtype=np.float64 if custos.dtype.kind == 'f' else np.int64)
+
     # Define o gbest (melhor partícula da população)
     def setGBest(self, novo_gbest):
         self.gbest = novo_gbest
@@ -174,6 +408,14 @@ class PSO:
     def getGBest(self):
         return self.gbest
 
+    # Aplica a busca local 2-opt / Or-opt ao pbest da partícula, mantendo o resultado só se ele for melhor
+    def melhorarPBest(self, particula):
+        caminho, _ = busca_local(particula.getPBest(), self.grafo.matriz, self.grafo.getVizinhos())
+        custo = self.grafo.getCustoCaminho(caminho)
+        if custo < particula.getCustoPBest():
+            particula.setPBest(caminho.tolist())
+            particula.setCustoPBest(custo)
+
     # Mostra as informações das partículas
     def mostrarParticulas(self):
 
@@ -184,123 +426,170 @@ class PSO:
                             particula.getCustoSolucaoAtual()))
         print('')
 
-    def executar(self):
-
-        # Para cada passo de tempo (iteração)
-        for t in range(self.iteracoes):
-
-            # Atualiza o gbest (melhor partícula da população)
-            self.gbest = min(self.particulas, key=attrgetter('custo_pbest_solucao'))
-
-            # Para cada partícula no enxame
-            for particula in self.particulas:
-
-                particula.limparVelocidade()  # Limpa a velocidade da partícula
-                velocidade_temporaria = []
-                solucao_gbest = copy.copy(self.gbest.getPBest())  # Obtém a solução do gbest
-                solucao_pbest = particula.getPBest()[:]  # Cópia da solução pbest
-                solucao_particula = particula.getSolucaoAtual()[:]  # Obtém cópia da solução atual da partícula
-
-                # Gera todos os operadores de troca para calcular (pbest - x(t-1))
-                for i in range(self.grafo.quantidade_vertices):
-                    if solucao_particula[i] != solucao_pbest[i]:
-                        # Gera operador de troca
-                        operador_troca = (i, solucao_pbest.index(solucao_particula[i]), self.alfa)
-
-                        # Adiciona operador de troca na lista de velocidade
-                        velocidade_temporaria.append(operador_troca)
-
-                        # Realiza a troca
-                        aux = solucao_pbest[operador_troca[0]]
-                        solucao_pbest[operador_troca[0]] = solucao_pbest[operador_troca[1]]
-                        solucao_pbest[operador_troca[1]] = aux
-
-                # Gera todos os operadores de troca para calcular (gbest - x(t-1))
-                for i in range(self.grafo.quantidade_vertices):
-                    if solucao_particula[i] != solucao_gbest[i]:
-                        # Gera operador de troca
-                        operador_troca = (i, solucao_gbest.index(solucao_particula[i]), self.beta)
-
-                        # Adiciona operador de troca na lista de velocidade
-                        velocidade_temporaria.append(operador_troca)
-
-                        # Realiza a troca
-                        aux = solucao_gbest[operador_troca[0]]
-                        solucao_gbest[operador_troca[0]] = solucao_gbest[operador_troca[1]]
-                        solucao_gbest[operador_troca[1]] = aux
-
-                # Atualiza a velocidade
-                particula.setVelocidade(velocidade_temporaria)
-
-                # Gera nova solução para a partícula
-                for operador_troca in velocidade_temporaria:
-                    if random.random() <= operador_troca[2]:
-                        # Realiza a troca
-                        aux = solucao_particula[operador_troca[0]]
-                        solucao_particula[operador_troca[0]] = solucao_particula[operador_troca[1]]
-                        solucao_particula[operador_troca[1]] = aux
-
-                # Atualiza a solução atual
-                particula.setSolucaoAtual(solucao_particula)
-                # Obtém o custo da solução atual
-                custo_solucao_atual = self.grafo.getCustoCaminho(solucao_particula)
-                # Atualiza o custo da solução atual
-                particula.setCustoSolucaoAtual(custo_solucao_atual)
-
-                # Verifica se a solução atual é a solução pbest
-                if custo_solucao_atual < particula.getCustoPBest():
-                    particula.setPBest(solucao_particula)
-                    particula.setCustoPBest(custo_solucao_atual)
-
-# Leitura dos dados do "berlim52" (supondo que você tem um arquivo chamado "berlim52.tsp")
-def lerDadosBerlim52():
-    coordenadas = {}
-    with open("berlim52.tsp", "r") as file:
-        lines = file.readlines()
-        for line in lines:
-            if line.startswith("NODE_COORD_SECTION"):
-                break
-        for line in lines:
-            if line.startswith("EOF"):
-                break
-            parts = line.strip().split()
-            if len(parts) == 3:
-                node, x, y = map(int, parts)
-                coordenadas[node] = (x, y)
-    return coordenadas
+    # Calcula, para todas as partículas, a sequência de trocas que leva "alvos" até as posições atuais
+    # (mesmos operadores que o laço com list.index gerava, mas com a permutação inversa atualizada a cada troca)
+    def sequenciaTrocas(self, alvos):
+        alvos = alvos.copy()
+        n_particulas, n = alvos.shape
+        posicao = np.empty_like(alvos)
+        posicao[np.arange(n_particulas)[:, None], alvos] = np.arange(n)[None, :]
+        trocas = -np.ones_like(alvos)
+        for i in range(n):
+            linhas = np.flatnonzero(self.posicoes[:, i] != alvos[:, i])
+            if len(linhas) == 0:
+                continue
+            cidade = self.posicoes[linhas, i]
+            j = posicao[linhas, cidade]
+            trocas[linhas, i] = j
+            # Realiza a troca nos alvos
+            anterior = alvos[linhas, i]
+            alvos[linhas, i] = cidade
+            alvos[linhas, j] = anterior
+            posicao[linhas, cidade] = i
+            posicao[linhas, anterior] = j
+        return trocas
+
+    # Aplica os operadores de troca com a probabilidade dada, atualiza self.custos e devolve
+    # (partículas que mudaram, consultas à matriz de distâncias)
+    # Quando cada partícula recebe poucas trocas diante do tamanho do caminho, as trocas são aplicadas
+    # por ordem dentro da sequência de cada partícula (um passo por posição na sequência, não por coluna)
+    # e o custo é atualizado pelo delta de cada troca (até oito arestas); senão, aplicadas coluna a coluna
+    # e as partículas que mudaram são reavaliadas de uma vez. A ordem das trocas de cada partícula é a
+    # mesma nos dois casos, então as posições resultantes são idênticas
+    def aplicarTrocas(self, trocas, probabilidade):
+        ativos = (trocas >= 0) & (self.rng.random(trocas.shape) <= probabilidade)
+        mudaram = ativos.any(axis=1)
+        linhas, colunas = np.nonzero(ativos)
+        if len(linhas) == 0:
+            return mudaram, 0
+        n = self.posicoes.shape[1]
+        n_mudaram = int(np.count_nonzero(mudaram))
+        # Posição de cada troca na sequência da sua partícula (np.nonzero devolve as linhas em ordem)
+        ordem = np.arange(len(linhas)) - np.searchsorted(linhas, linhas)
+        passos = int(ordem.max()) + 1
+        if passos * self.ELEMENTOS_POR_PASSO <= n_mudaram * n:
+            for k in range(passos):
+                selecionadas = ordem == k
+                linhas_k = linhas[selecionadas]
+                i = colunas[selecionadas]
+                j = trocas[linhas_k, i]
+                self.custos[linhas_k] += delta_troca_lote(self.posicoes[linhas_k], i, j, self.grafo.matriz).astype(self.custos.dtype)
+                # Realiza a troca
+                aux = self.posicoes[linhas_k, i]
+                self.posicoes[linhas_k, i] = self.posicoes[linhas_k, j]
+                self.posicoes[linhas_k, j] = aux
+            return mudaram, 8 * len(linhas)
+        for i in np.unique(colunas):
+            linhas_i = np.flatnonzero(ativos[:, i])
+            j = trocas[linhas_i, i]
+            # Realiza a troca
+            aux = self.posicoes[linhas_i, i]
+            self.posicoes[linhas_i, i] = self.posicoes[linhas_i, j]
+            self.posicoes[linhas_i, j] = aux
+        # Reavalia de uma vez só as partículas que mudaram (um gather para o enxame todo)
+        indices = np.flatnonzero(mudaram)
+        self.custos[indices] = self.custosCaminhos(self.posicoes[indices])
+        return mudaram, n_mudaram * n
+
+    # "semente", se informada, reinicia o gerador de números aleatórios antes da execução
+    # "tempo_limite" (segundos), "limite_estagnacao" (iterações sem melhoria do gbest), "custo_alvo" e
+    # "callback(iteracao, melhor_caminho, melhor_custo)" podem encerrar a execução antes de "iteracoes";
+    # o motivo da parada fica em self.criterio.motivo e o gbest é sempre o melhor encontrado até ali
+    # "estatisticas" (instrumentacao.Estatisticas) recebe o tempo das etapas velocidade, aplicacao
+    # (que inclui a avaliação das partículas) e atualizacao e os contadores da execução; fica também em self.estatisticas
+    # Com "arquivo_checkpoint", o estado do enxame é gravado a cada "intervalo_checkpoint" iterações e ao final
+    def executar(self, semente=None, tempo_limite=None, limite_estagnacao=None, custo_alvo=None, callback=None, estatisticas=None,
+                 arquivo_checkpoint=None, intervalo_checkpoint=50):
+
+        if semente is not None:
+            self.rng = np.random.default_rng(semente)
+        self.criterio = CriterioParada(tempo_limite, limite_estagnacao, custo_alvo, callback)
+        restaurar_criterio(self.criterio, self._estado_criterio)
+        self._estado_criterio = None
+        verificar = self.criterio.ativo()
+        self.estatisticas = estatisticas
+        medicao = ou_desligadas(estatisticas)
+        medicao.iniciar()
+
+        # O tempo total e a memória são fechados mesmo se uma iteração (ou o callback) falhar
+        try:
+            # Para cada passo de tempo (iteração)
+            t = self.iteracao - 1
+            for t in range(self.iteracao, self.iteracoes):
+
+                # Atualiza o gbest (melhor partícula da população)
+                self.gbest = self.particulas[int(np.argmin(self.custos_pbest))]
+                if self.melhoria_local == 'gbest':
+                    with medicao.etapa('busca_local'):
+                        self.melhorarPBest(self.gbest)
+
+                # Gera todos os operadores de troca para calcular (pbest - x(t-1)) e (gbest - x(t-1))
+                with medicao.etapa('velocidade'):
+                    self.trocas_pbest = self.sequenciaTrocas(self.pbests)
+                    self.trocas_gbest = self.sequenciaTrocas(np.broadcast_to(self.pbests[self.gbest.indice], self.pbests.shape))
+
+                # Gera nova solução para cada partícula
+                with medicao.etapa('aplicacao'):
+                    mudaram, consultas = self.aplicarTrocas(self.trocas_pbest, self.alfa)
+                    mudaram_gbest, consultas_gbest = self.aplicarTrocas(self.trocas_gbest, self.beta)
+                    mudaram |= mudaram_gbest
+
+                # Os custos já foram atualizados em aplicarTrocas (pelo delta ou reavaliando as que mudaram)
+                medicao.contar('avaliacoes', int(mudaram.sum()))
+                medicao.contar('consultas_distancia', consultas + consultas_gbest)
+
+                # Verifica quais soluções atuais são novos pbests
+                with medicao.etapa('atualizacao'):
+                    melhoraram = np.flatnonzero(self.custos < self.custos_pbest)
+                    self.pbests[melhoraram] = self.posicoes[melhoraram]
+                    self.custos_pbest[melhoraram] = self.custos[melhoraram]
+                if self.melhoria_local == 'pbest':
+                    with medicao.etapa('busca_local'):
+                        for i in melhoraram:
+                            self.melhorarPBest(self.particulas[i])
+                medicao.contar('iteracoes')
+
+                parar = False
+                if verificar:
+                    melhor = int(np.argmin(self.custos_pbest))
+                    parar = self.criterio.atualizar(t, self.pbests[melhor].copy(), self.custos_pbest[melhor].item())
+                if arquivo_checkpoint and (t + 1) % intervalo_checkpoint == 0:
+                    with medicao.etapa('checkpoint'):
+                        self.salvarCheckpoint(arquivo_checkpoint, t + 1)
+                if parar:
+                    break
+
+            # Checkpoint final (fim das iterações ou parada antecipada)
+            if arquivo_checkpoint and (t + 1) % intervalo_checkpoint != 0:
+                with medicao.etapa('checkpoint'):
+                    self.salvarCheckpoint(arquivo_checkpoint, t + 1)
+            # A próxima chamada de executar() volta a rodar todas as iterações
+            self.iteracao = 0
+
+            # O gbest reflete também as melhorias da última iteração
+            self.gbest = self.particulas[int(np.argmin(self.custos_pbest))]
+        finally:
+            medicao.finalizar()
+
+# Leitura dos dados do "berlin52" - retorna um dicionário {nó: (x, y)} com os nós numerados a partir de 1
+def lerDadosBerlim52(arquivo='berlin52.tsp'):
+    instancia = ler_tsplib(arquivo)
+    return {i + 1: (x, y) for i, (x, y) in enumerate(instancia.coordenadas.tolist())}
 
 # Função principal
 def main():
-    coordenadas = []
-
     # Lê as coordenadas do arquivo "berlin52.tsp"
-    a = 'berlin52.tsp'
-    with open(a) as obj_file:
-        lines = obj_file.readlines()
-        read_coordinates = False
-        for line in lines:
-            if line.strip() == "NODE_COORD_SECTION":
-                read_coordinates = True
-                continue
-            elif read_coordinates and line.strip() != "EOF":
-                parts = line.strip().split()
-                if len(parts) == 3:
-                    _, x, y = parts
-                    coordenadas.append((float(x), float(y)))
-
-    # Cria uma instância de Grafo com base nas coordenadas lidas
-    grafo_berlim52 = Grafo(quantidade_vertices=len(coordenadas))
-    
-    # Adicione as arestas ao grafo com as distâncias calculadas a partir das coordenadas
-    for i in range(len(coordenadas)):
-        for j in range(i + 1, len(coordenadas)):
-            x1, y1 = coordenadas[i]
-            x2, y2 = coordenadas[j]
-            distancia = round(((x1 - x2) ** 2 + (y1 - y2) ** 2) ** 0.5)
-            grafo_berlim52.adicionarAresta(i, j, distancia)
-            grafo_berlim52.adicionarAresta(j, i, distancia)
-
-    pso_berlim52 = PSO(grafo_berlim52, iteracoes=300, tamanho_populacao=300,  beta=0.3, alfa=0.5)
+    instancia = ler_tsplib('berlin52.tsp')
+
+    # Cria uma instância de Grafo com as distâncias calculadas a partir das coordenadas lidas
+    grafo_berlim52 = Grafo.deCoordenadas(instancia.coordenadas, instancia.tipo_peso)
+
+    # Parâmetros padrão, substituídos pelos ajustados por autotuning.py para o tamanho da instância quando o arquivo existe
+    # (importado aqui porque autotuning importa este módulo)
+    from autotuning import parametros_ajustados
+    parametros = parametros_ajustados('pso', instancia.dimensao, {'iteracoes': 300, 'tamanho_populacao': 300, 'beta': 0.3, 'alfa': 0.5})
+
+    pso_berlim52 = PSO(grafo_berlim52, **parametros)
     pso_berlim52.executar()  # Executa o algoritmo PSO
     pso_berlim52.mostrarParticulas()  # Mostra as partículas
 
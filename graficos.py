@@ -0,0 +1,32 @@
+from typing import Dict, Optional, Sequence, Union
+
+# Gráficos dos resolvedores, gravados em arquivo (sem janela e sem bloquear a execução).
+# matplotlib e seaborn só são importados quando um gráfico é pedido, então importar os
+# resolvedores como biblioteca (em lotes, no servidor, sem display) não paga esse custo.
+# As figuras usam a API orientada a objetos (matplotlib.figure.Figure), que não depende
+# do backend interativo do pyplot.
+
+# Cria uma figura nova e seus eixos
+def _nova_figura(tamanho=(10, 6)):
+    from matplotlib.figure import Figure
+    figura = Figure(figsize=tamanho)
+    return figura, figura.add_subplot()
+
+# Grava a curva "valores" (um valor por passo) em "arquivo"; com "boxplot", desenha com seaborn
+# "valores" também pode ser um dicionário {rótulo: valores} para várias curvas no mesmo gráfico (com legenda)
+def salvar_grafico(valores: Union[Sequence[float], Dict[str, Sequence[float]]], arquivo: str, titulo: str = '', rotulo_x: str = '', rotulo_y: str = '', eixo_x: Optional[Sequence[float]] = None, boxplot: bool = False) -> str:
+    figura, eixos = _nova_figura()
+    if boxplot:
+        import seaborn as sns
+        sns.boxplot(data=list(valores), whis=1.5, ax=eixos)
+    elif isinstance(valores, dict):
+        for rotulo, curva in valores.items():
+            eixos.plot(list(eixo_x) if eixo_x is not None else range(len(curva)), list(curva), label=rotulo)
+        eixos.legend()
+    else:
+        eixos.plot(list(eixo_x) if eixo_x is not None else range(len(valores)), list(valores))
+    eixos.set_xlabel(rotulo_x)
+    eixos.set_ylabel(rotulo_y)
+    eixos.set_title(titulo)
+    figura.savefig(arquivo)
+    return arquivo
@@ -0,0 +1,92 @@
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import List, Optional, Tuple
+import numpy as np
+from algoritmo_genetico import Semente, avaliar_pop_vetorizado, busca_local_pop, calcular_distancias, executar_geracoes, pop_inicial
+from vizinhanca import vizinhos_da_matriz
+
+# Algoritmo genético em modelo de ilhas: cada ilha evolui uma população independente
+# num processo do pool e, a cada "intervalo_migracao" gerações, os melhores indivíduos
+# de cada ilha substituem os piores da ilha seguinte (topologia em anel).
+# A matriz de distâncias fica em memória compartilhada: os processos só recebem o nome
+# do bloco, em vez de receberem a matriz serializada a cada tarefa.
+
+# Estado de cada processo do pool (preenchido por _iniciar_processo)
+_memoria = None
+_distancias = None
+_vizinhos_busca = None
+
+# Conecta o processo ao bloco de memória compartilhada com a matriz de distâncias
+def _iniciar_processo(nome_memoria: str, forma: Tuple[int, int], dtype: str, vizinhos_busca: Optional[np.ndarray]) -> None:
+    global _memoria, _distancias, _vizinhos_busca
+    # O bloco é criado e removido pelo processo principal; o processo do pool só o usa
+    _memoria = shared_memory.SharedMemory(name=nome_memoria)
+    _distancias = np.ndarray(forma, dtype=dtype, buffer=_memoria.buf)
+    _vizinhos_busca = vizinhos_busca
+
+# Evolui uma ilha por "n_geracoes" gerações (executado dentro do pool)
+# Cada ilha tem seu próprio gerador (fluxo independente), que volta com o resultado para a época seguinte
+def _evoluir_ilha(pop: np.ndarray, fitness: np.ndarray, taxa_mutacao: float, n_geracoes: int, rng: np.random.Generator, operador_crossover: str) -> Tuple[np.ndarray, np.ndarray, List[float], np.random.Generator]:
+    pop, fitness, historico = executar_geracoes(pop, fitness, _distancias, taxa_mutacao, n_geracoes, avaliar_pop_vetorizado, None, _vizinhos_busca, operador_crossover, rng=rng)
+    return pop, fitness, historico, rng
+
+# Migração em anel: os "n_migrantes" melhores de cada ilha substituem os piores da ilha seguinte
+def migrar(populacoes: List[np.ndarray], fitnesses: List[np.ndarray], n_migrantes: int) -> None:
+    n_ilhas = len(populacoes)
+    if n_ilhas < 2 or n_migrantes <= 0:
+        return
+    melhores = []
+    for pop, fitness in zip(populacoes, fitnesses):
+        idx = np.argsort(fitness, kind='stable')[:n_migrantes]
+        melhores.append((pop[idx].copy(), fitness[idx].copy()))
+    for i in range(n_ilhas):
+        destino = (i + 1) % n_ilhas
+        migrantes, fitness_migrantes = melhores[i]
+        piores = np.argsort(fitnesses[destino], kind='stable')[::-1][:len(migrantes)]
+        populacoes[destino][piores] = migrantes
+        fitnesses[destino][piores] = fitness_migrantes
+
+# Função principal do modelo de ilhas
+# Retorna a melhor rota global e o histórico (fitness_ao_longo_geracoes) de cada ilha
+def evolucao_ilhas(coordenadas, taxa_mutacao: float, n_pop: int, n_geracoes: int, n_ilhas: int = 4, intervalo_migracao: int = 20, n_migrantes: int = 2, n_processos: Optional[int] = None, memetico: bool = False, semente: Semente = None, operador_crossover: str = 'pmx') -> Tuple[np.ndarray, List[List[float]]]:
+    n_genes = len(coordenadas)
+    distancias = calcular_distancias(coordenadas)
+    vizinhos_busca = vizinhos_da_matriz(distancias, 10)[0] if memetico else None
+    geradores = np.random.default_rng(semente).spawn(n_ilhas)
+
+    populacoes, fitnesses = [], []
+    for i in range(n_ilhas):
+        pop = pop_inicial(n_pop, n_genes, geradores[i])
+        fitness = avaliar_pop_vetorizado(pop, distancias)
+        if memetico:
+            busca_local_pop(pop, fitness, distancias, vizinhos_busca)
+        populacoes.append(pop)
+        fitnesses.append(fitness)
+    historicos = [[] for _ in range(n_ilhas)]
+
+    memoria = shared_memory.SharedMemory(create=True, size=max(distancias.nbytes, 1))
+    compartilhada = None
+    try:
+        compartilhada = np.ndarray(distancias.shape, dtype=distancias.dtype, buffer=memoria.buf)
+        compartilhada[:] = distancias
+        with ProcessPoolExecutor(max_workers=n_processos or n_ilhas, initializer=_iniciar_processo,
+                                 initargs=(memoria.name, distancias.shape, distancias.dtype.str, vizinhos_busca)) as pool:
+            geracoes_restantes = n_geracoes
+            while geracoes_restantes > 0:
+                geracoes_epoca = min(intervalo_migracao, geracoes_restantes)
+                tarefas = [pool.submit(_evoluir_ilha, populacoes[i], fitnesses[i], taxa_mutacao, geracoes_epoca, geradores[i], operador_crossover)
+                           for i in range(n_ilhas)]
+                for i, tarefa in enumerate(tarefas):
+                    populacoes[i], fitnesses[i], historico, geradores[i] = tarefa.result()
+                    historicos[i].extend(historico)
+                geracoes_restantes -= geracoes_epoca
+                if geracoes_restantes > 0:
+                    migrar(populacoes, fitnesses, n_migrantes)
+    finally:
+        # A visão precisa sair antes de close(), senão o buffer ainda exportado impede o fechamento
+        del compartilhada
+        memoria.close()
+        memoria.unlink()
+
+    ilha = min(range(n_ilhas), key=lambda i: fitnesses[i].min())
+    return populacoes[ilha][np.argmin(fitnesses[ilha])], historicos
@@ -0,0 +1,129 @@
+import time, tracemalloc
+from collections import defaultdict
+from contextlib import nullcontext
+from typing import Optional
+
+# Instrumentação dos resolvedores: tempo gasto em cada etapa do laço principal, contadores
+# (avaliações de fitness, consultas à matriz de distâncias) e, opcionalmente, pico de memória
+# e maiores alocações via tracemalloc.
+# Os resolvedores recebem um objeto Estatisticas; sem ele usam SEM_ESTATISTICAS, cujos métodos
+# não fazem nada, então a instrumentação desligada custa só algumas chamadas vazias por geração.
+
+# Cronômetro de uma etapa, usado com "with estatisticas.etapa('nome'):"
+class _Cronometro:
+
+    __slots__ = ('estatisticas', 'nome', 'inicio')
+
+    def __init__(self, estatisticas, nome):
+        self.estatisticas = estatisticas
+        self.nome = nome
+
+    def __enter__(self):
+        self.inicio = time.perf_counter()
+
+    def __exit__(self, *excecao):
+        self.estatisticas.tempos[self.nome] += time.perf_counter() - self.inicio
+        self.estatisticas.chamadas[self.nome] += 1
+
+class Estatisticas:
+
+    def __init__(self, memoria: bool = False, n_alocacoes: int = 10):
+        self.tempos = defaultdict(float)  # segundos acumulados por etapa
+        self.chamadas = defaultdict(int)  # vezes que cada etapa foi executada
+        self.contadores = defaultdict(int)  # avaliacoes, consultas_distancia, ...
+        self.series = defaultdict(list)  # um valor por geração / iteração (acertos do cache, diversidade, ...)
+        self.memoria = memoria  # mede o pico de memória e guarda as maiores alocações (tracemalloc)
+        self.n_alocacoes = n_alocacoes
+        self.tempo_total = 0.0
+        self.pico_memoria_mb = None
+        self.maiores_alocacoes = []
+        self._inicio = None
+        self._iniciou_tracemalloc = False
+
+    # Marca o início da execução (e liga o tracemalloc, se pedido)
+    def iniciar(self) -> None:
+        self._inicio = time.perf_counter()
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+        elif self.memoria:
+            tracemalloc.reset_peak()
+
+    # Marca o fim da execução: acumula o tempo total e tira o snapshot de memória
+    def finalizar(self) -> None:
+        if self._inicio is not None:
+            self.tempo_total += time.perf_counter() - self._inicio
+            self._inicio = None
+        if self.memoria and tracemalloc.is_tracing():
+            self.pico_memoria_mb = tracemalloc.get_traced_memory()[1] / 2 ** 20
+            estatisticas = tracemalloc.take_snapshot().statistics('lineno')[:self.n_alocacoes]
+            self.maiores_alocacoes = [str(estatistica) for estatistica in estatisticas]
+            if self._iniciou_tracemalloc:
+                tracemalloc.stop()
+                self._iniciou_tracemalloc = False
+
+    # Cronometra uma etapa
+    def etapa(self, nome: str) -> _Cronometro:
+        return _Cronometro(self, nome)
+
+    # Soma "quantidade" ao contador "nome"
+    def contar(self, nome: str, quantidade: int = 1) -> None:
+        self.contadores[nome] += int(quantidade)
+
+    # Acrescenta "valor" à série "nome" (uma medida por geração / iteração)
+    def registrar(self, nome: str, valor: float) -> None:
+        self.series[nome].append(valor)
+
+    # Resultado estruturado (pronto para JSON)
+    def como_dict(self) -> dict:
+        return {
+            'tempo_total_s': self.tempo_total,
+            'tempos_s': dict(self.tempos),
+            'chamadas': dict(self.chamadas),
+            'contadores': dict(self.contadores),
+            'series': {nome: list(valores) for nome, valores in self.series.items()},
+            'avaliacoes_por_s': self.contadores['avaliacoes'] / self.tempo_total if self.tempo_total > 0 else None,
+            'pico_memoria_mb': self.pico_memoria_mb,
+            'maiores_alocacoes': list(self.maiores_alocacoes),
+        }
+
+    # Tabela com o tempo de cada etapa e a fração do tempo total
+    def relatorio(self) -> str:
+        linhas = ['%-20s %10s %8s %8s' % ('etapa', 'tempo (s)', '%', 'chamadas')]
+        total = self.tempo_total or sum(self.tempos.values()) or 1.0
+        for nome, tempo in sorted(self.tempos.items(), key=lambda item: -item[1]):
+            linhas.append('%-20s %10.4f %7.1f%% %8d' % (nome, tempo, 100.0 * tempo / total, self.chamadas[nome]))
+        for nome, valor in sorted(self.contadores.items()):
+            linhas.append('%-20s %d' % (nome, valor))
+        for nome, valores in sorted(self.series.items()):
+            if valores:
+                linhas.append('%-20s inicio %.4g  fim %.4g' % (nome, valores[0], valores[-1]))
+        if self.pico_memoria_mb is not None:
+            linhas.append('pico de memória: %.2f MB' % self.pico_memoria_mb)
+        return '\n'.join(linhas)
+
+# Estatísticas desligadas: mesma interface, nenhuma medição
+class _SemEstatisticas:
+
+    _contexto = nullcontext()
+
+    def iniciar(self) -> None:
+        pass
+
+    def finalizar(self) -> None:
+        pass
+
+    def etapa(self, nome: str):
+        return self._contexto
+
+    def contar(self, nome: str, quantidade: int = 1) -> None:
+        pass
+
+    def registrar(self, nome: str, valor: float) -> None:
+        pass
+
+SEM_ESTATISTICAS = _SemEstatisticas()
+
+# Devolve "estatisticas" ou o objeto desligado quando não foi informado
+def ou_desligadas(estatisticas: Optional[Estatisticas]):
+    return SEM_ESTATISTICAS if estatisticas is None else estatisticas
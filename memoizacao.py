@@ -0,0 +1,73 @@
+from collections import OrderedDict
+from typing import Callable, List, Optional, Set, Tuple
+import numpy as np
+from movimentos import chaves_rotas
+
+# Memoização do fitness e eliminação de rotas repetidas no algoritmo genético.
+# Com mutação baixa e seleção elitista, a população se enche de cópias da mesma rota (às vezes
+# giradas ou invertidas). A chave canônica de movimentos.chave_rota identifica essas cópias, então:
+# - CacheFitness guarda o custo de cada rota já avaliada (LRU limitado a "capacidade" rotas) e só
+#   avalia, numa única chamada vetorizada, as rotas que ainda não estão no cache;
+# - novas_rotas descarta os filhos repetidos entre si ou iguais a alguém da população.
+
+class CacheFitness:
+
+    def __init__(self, capacidade: int = 100000):
+        self.capacidade = capacidade
+        self.valores = OrderedDict()  # chave canônica -> custo
+        self.acertos = 0  # rotas encontradas no cache (inclusive repetições dentro do mesmo lote)
+        self.faltas = 0  # rotas realmente avaliadas
+
+    def __len__(self):
+        return len(self.valores)
+
+    # Guarda o custo de cada rota (ex.: depois da mutação, que atualiza o custo pelo delta)
+    def guardar(self, chaves: List[bytes], custos: np.ndarray) -> None:
+        for chave, custo in zip(chaves, custos.tolist()):
+            self.valores[chave] = custo
+            self.valores.move_to_end(chave)
+        while len(self.valores) > self.capacidade:
+            self.valores.popitem(last=False)
+
+    # Custo de cada rota de "pop"; as que faltam no cache são avaliadas com avaliar(pop, distancias)
+    # "chaves" evita recalcular as chaves canônicas quando o chamador já as tem
+    def avaliar(self, pop: np.ndarray, distancias, avaliar: Callable, chaves: Optional[List[bytes]] = None) -> np.ndarray:
+        chaves = chaves_rotas(pop) if chaves is None else chaves
+        fitness = np.empty(len(pop))
+        faltando = {}  # chave -> posições da população com essa rota
+        for i, chave in enumerate(chaves):
+            custo = self.valores.get(chave)
+            if custo is not None:
+                self.valores.move_to_end(chave)
+                fitness[i] = custo
+            else:
+                faltando.setdefault(chave, []).append(i)
+        if faltando:
+            primeiras = [posicoes[0] for posicoes in faltando.values()]
+            custos = avaliar(pop[primeiras], distancias)
+            for posicoes, custo in zip(faltando.values(), custos):
+                fitness[posicoes] = custo
+            self.guardar(list(faltando), custos)
+        self.faltas += len(faltando)
+        self.acertos += len(pop) - len(faltando)
+        return fitness
+
+# Posições das rotas de "chaves" que não repetem uma anterior do lote nem uma chave de "existentes"
+def novas_rotas(chaves: List[bytes], existentes: Set[bytes]) -> np.ndarray:
+    vistas = set(existentes)
+    manter = []
+    for i, chave in enumerate(chaves):
+        if chave not in vistas:
+            vistas.add(chave)
+            manter.append(i)
+    return np.array(manter, dtype=np.int64)
+
+# Medidas de diversidade da população: (fração de rotas distintas, fração de arestas distintas)
+# A fração de arestas é o número de arestas (não orientadas) diferentes dividido pelo total de
+# arestas da população: 1 / n_pop quando todas as rotas são iguais, perto de 1 para rotas aleatórias
+def diversidade(pop: np.ndarray, chaves: Optional[List[bytes]] = None) -> Tuple[float, float]:
+    chaves = chaves_rotas(pop) if chaves is None else chaves
+    n_pop, n = pop.shape
+    seguintes = np.roll(pop, -1, axis=1)
+    arestas = np.minimum(pop, seguintes).astype(np.int64) * n + np.maximum(pop, seguintes)
+    return len(set(chaves)) / n_pop, len(np.unique(arestas)) / arestas.size
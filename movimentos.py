@@ -0,0 +1,138 @@
+from typing import List
+import numpy as np
+
+# Avaliação incremental (delta) de movimentos sobre uma rota circular.
+# "distancias" pode ser qualquer estrutura indexável por distancias[a, b]:
+# a matriz NumPy do algoritmo genético ou o dicionário de arestas do Grafo.
+# Todas as funções devolvem (custo_novo - custo_antigo) em O(1).
+# No fim do módulo ficam as chaves canônicas de rotas, usadas para reconhecer a mesma rota girada ou invertida.
+
+# Variação de custo ao trocar as cidades das posições "i" e "j"
+def delta_troca(rota, i: int, j: int, distancias) -> float:
+    n = len(rota)
+    if i == j or n < 3:
+        return 0
+
+    # Cidade que ocupará a posição "p" depois da troca
+    def cidade(p):
+        p %= n
+        if p == i:
+            return rota[j]
+        if p == j:
+            return rota[i]
+        return rota[p]
+
+    # Só as arestas que começam nessas posições mudam (até quatro)
+    posicoes = {(i - 1) % n, i, (j - 1) % n, j}
+    antes = 0
+    depois = 0
+    for p in posicoes:
+        antes += distancias[rota[p], rota[(p + 1) % n]]
+        depois += distancias[cidade(p), cidade(p + 1)]
+    return depois - antes
+
+# Arestas antes e depois da troca, como colunas de [anterior_i, i, seguinte_i, anterior_j, j, seguinte_j]:
+# (origens, destinos), as quatro primeiras antes (somam com sinal -1) e as quatro últimas depois (sinal +1)
+_ORIGENS = np.array([0, 1, 3, 4, 0, 4, 3, 1])
+_DESTINOS = np.array([1, 2, 4, 5, 4, 2, 1, 5])
+_SINAIS = np.array([-1.0, -1.0, -1.0, -1.0, 1.0, 1.0, 1.0, 1.0])
+
+# Versão em lote de delta_troca: troca as posições i[r] e j[r] de cada rota r de "rotas" (m, n)
+# Devolve o array (m,) das variações, igual a chamar delta_troca rota por rota (a diagonal das distâncias deve ser nula)
+# As cidades e as arestas envolvidas são lidas com um único gather cada, então o custo por chamada é quase constante
+def delta_troca_lote(rotas: np.ndarray, i, j, distancias) -> np.ndarray:
+    m, n = rotas.shape
+    if n < 3:
+        return np.zeros(m)
+    colunas = np.empty((m, 6), dtype=np.int64)
+    colunas[:, 1] = i
+    colunas[:, 4] = j
+    colunas[:, 0] = colunas[:, 1] - 1
+    colunas[:, 2] = colunas[:, 1] + 1
+    colunas[:, 3] = colunas[:, 4] - 1
+    colunas[:, 5] = colunas[:, 4] + 1
+    colunas %= n
+    cidades = rotas[np.arange(m)[:, None], colunas]
+    delta = np.asarray(distancias[cidades[:, _ORIGENS], cidades[:, _DESTINOS]], dtype=np.float64) @ _SINAIS
+    # Posições vizinhas: a aresta entre elas foi descontada duas vezes e a invertida não foi somada
+    # (os termos "depois" dessa aresta caem na diagonal, que é nula)
+    vizinhas = (colunas[:, 2] == colunas[:, 4]) | (colunas[:, 5] == colunas[:, 1])
+    if vizinhas.any():
+        ci, cj = cidades[vizinhas, 1], cidades[vizinhas, 4]
+        delta[vizinhas] += distancias[ci, cj] + distancias[cj, ci]
+    delta[colunas[:, 1] == colunas[:, 4]] = 0.0
+    return delta
+
+# Variação de custo ao inverter o trecho rota[i..j] (movimento 2-opt, instância simétrica)
+def delta_2opt(rota, i: int, j: int, distancias) -> float:
+    n = len(rota)
+    if i > j:
+        i, j = j, i
+    if i == j or (i == 0 and j == n - 1):
+        return 0
+    a, b = rota[i - 1], rota[i]
+    c, d = rota[j], rota[(j + 1) % n]
+    return distancias[a, c] + distancias[b, d] - distancias[a, b] - distancias[c, d]
+
+# Aplica o movimento 2-opt avaliado por delta_2opt
+def aplicar_2opt(rota: np.ndarray, i: int, j: int) -> None:
+    if i > j:
+        i, j = j, i
+    rota[i:j + 1] = rota[i:j + 1][::-1].copy()
+
+# Variação de custo ao mover o trecho rota[i..i+tamanho-1] para entre as posições
+# "p" e p+1 (Or-opt), opcionalmente invertido. "p" deve estar fora do trecho.
+def delta_or_opt(rota, i: int, tamanho: int, p: int, distancias, invertido: bool = False) -> float:
+    n = len(rota)
+    fim = i + tamanho - 1
+    if tamanho < 1 or fim >= n or tamanho > n - 2 or i <= p <= fim:
+        return 0
+    anterior, proximo = rota[(i - 1) % n], rota[(fim + 1) % n]
+    # Mover o trecho para logo depois da sua cidade anterior não muda a rota
+    if p == (i - 1) % n and not invertido:
+        return 0
+    inicio_trecho, fim_trecho = rota[i], rota[fim]
+    if invertido:
+        inicio_trecho, fim_trecho = fim_trecho, inicio_trecho
+    c, d = rota[p], rota[(p + 1) % n]
+    # Se o trecho for colocado entre as mesmas vizinhas, c == anterior e d == inicio do trecho
+    if p == (i - 1) % n:
+        d = proximo
+        removido = distancias[anterior, rota[i]] + distancias[rota[fim], proximo]
+        adicionado = distancias[c, inicio_trecho] + distancias[fim_trecho, d]
+        return adicionado - removido
+    removido = distancias[anterior, rota[i]] + distancias[rota[fim], proximo] + distancias[c, d]
+    adicionado = distancias[anterior, proximo] + distancias[c, inicio_trecho] + distancias[fim_trecho, d]
+    return adicionado - removido
+
+# Aplica o movimento Or-opt avaliado por delta_or_opt e devolve a nova rota
+def aplicar_or_opt(rota: np.ndarray, i: int, tamanho: int, p: int, invertido: bool = False) -> np.ndarray:
+    trecho = rota[i:i + tamanho]
+    if invertido:
+        trecho = trecho[::-1]
+    destino = rota[p]
+    resto = np.concatenate((rota[:i], rota[i + tamanho:]))
+    posicao = int(np.flatnonzero(resto == destino)[0])
+    return np.concatenate((resto[:posicao + 1], trecho, resto[posicao + 1:]))
+
+# Chave canônica de uma rota circular: começa na cidade 0 e segue no sentido em que o segundo elemento
+# é o menor, então rotações e inversões da mesma rota têm a mesma chave (comparação por hash em O(1))
+def chave_rota(rota) -> bytes:
+    rota = np.asarray(rota, dtype=np.int64)
+    rota = np.roll(rota, -int(np.flatnonzero(rota == 0)[0])) if len(rota) else rota
+    if len(rota) > 2 and rota[-1] < rota[1]:
+        rota = np.concatenate((rota[:1], rota[:0:-1]))
+    return rota.tobytes()
+
+# Chaves canônicas de todas as rotas de uma população (n_rotas, n) de uma vez (iguais às de chave_rota)
+def chaves_rotas(rotas: np.ndarray) -> List[bytes]:
+    rotas = np.asarray(rotas, dtype=np.int64)
+    if rotas.size == 0:
+        return [b''] * len(rotas)
+    n = rotas.shape[1]
+    deslocamentos = np.argmax(rotas == 0, axis=1)
+    giradas = np.take_along_axis(rotas, (deslocamentos[:, None] + np.arange(n)) % n, axis=1)
+    if n > 2:
+        invertidas = giradas[:, -1] < giradas[:, 1]
+        giradas[invertidas, 1:] = giradas[invertidas, :0:-1]
+    return [rota.tobytes() for rota in giradas]
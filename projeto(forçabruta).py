@@ -1,23 +1,7 @@
 #Algoritmo - Força bruta
 
 import time
-import matplotlib.pyplot as plt
-
-#Definindo da função permutar (função núcleo do problema)
-def permutar(pontos_de_entrega):
-    #Caso base:
-    if len(pontos_de_entrega) <= 1:
-        return [pontos_de_entrega]
-
-    #Lista vazia para adicionar os pontos que faltam
-    permutacoes = []
-
-    #Recursiva para salvar os pontos que já passou
-    for i, ponto_atual in enumerate(pontos_de_entrega):
-        pontos_restantes = pontos_de_entrega[:i] + pontos_de_entrega[i+1:]
-        for permutacao in permutar(pontos_restantes):
-            permutacoes.append([ponto_atual] + permutacao)
-    return permutacoes
+from solucao_exata import forca_bruta, forca_bruta_paralela
 
 #Definindo a função de distância dos pontos
 def dist_pontos(p1,p2):
@@ -31,43 +15,49 @@ def dist_percurso(percurso):
         d += dist_pontos(percurso[i-1],percurso[i])
     return d
 
+#Matriz de distâncias entre todos os pontos, calculada uma única vez (o resolvedor exato só consulta a matriz)
+def matriz_manhattan(pontos):
+    return [[dist_pontos(a, b) for b in pontos] for a in pontos]
+
 #Definindo variáveis
 p = [(3,0),(1,1),(3,2),(0,4),(2,4)]    #Lista com coordenadas
 entradas=['R','A','B','C','D']         #letras respectivas das coordenadas
 num_entradas = len(entradas)           #Lista para armazenar o número total de entradas
 
-lista_tempos = []                      #Lista para armazenar os tempos de execução dos pontos
-#Laço principal que itera sobre as permutações dos pontos de entrega e para cada permutação calcula a distância total do percurso.
-for i in range(1, num_entradas+1):
-    tic = time.process_time_ns()
-    menor = float("inf")
-    menores_percursos = []
-    for j in permutar(p[1:i]):
-        j = [p[0]] + j + [p[0]]
-        dist = dist_percurso(j)
-        if dist < menor:
-            menor = dist
-            menores_percursos = [j]
-        elif dist == menor:
-            menores_percursos.append(j)
-    toc = time.process_time_ns()
-    lista_tempos.append(toc - tic)
-
-# Criação do dicionário para mapear as coordenadas para as entradas (estabelecendo uma troca de coordenada para letra)
-coordenadas_para_entradas = {}
-for i in range(len(entradas)):
-    entrada = entradas[i]
-    coordenada = p[i]
-    coordenadas_para_entradas[coordenada] = entrada
-
-# Imprime todas as menores rotas possíveis para o número total de entradas escolhido pelo usuário
-for percurso in menores_percursos:
-    percurso_entradas = [coordenadas_para_entradas[coordenada] for coordenada in percurso]
-    # Adicionado para exibir o tempo médio em nanossegundos
-print(f"Tempo médio para {num_entradas} entradas: {(toc - tic) / num_entradas} nanossegundos")
-
-#Criação do gráfico para comparar os tempos de execução
-plt.plot(range(1, num_entradas+1), lista_tempos)
-plt.xlabel('Número de entradas')
-plt.ylabel('Tempo de processamento (ns)')
-plt.show()
+#O pool de processos exige o bloco principal protegido (no Windows cada processo reimporta este arquivo)
+if __name__ == "__main__":
+    tempos_sequencial = []                 #Tempo da busca em um único processo, para cada quantidade de pontos
+    tempos_paralelo = []                   #Tempo da busca dividida por prefixos entre os processos, para cada quantidade de pontos
+    #Laço principal que, para cada quantidade de pontos, encontra todos os percursos de menor distância total.
+    #O tempo é de relógio (perf_counter), porque o tempo de processador do processo principal não inclui o dos processos do pool
+    for i in range(1, num_entradas+1):
+        distancias = matriz_manhattan(p[:i])   #Matriz calculada uma vez e compartilhada com os processos
+        tic = time.perf_counter_ns()
+        forca_bruta(distancias)
+        tempos_sequencial.append(time.perf_counter_ns() - tic)
+        #Busca exata dividida pelos prefixos das rotas: cada processo gera as rotas uma a uma, com poda, e devolve seus ótimos locais
+        tic = time.perf_counter_ns()
+        menor, rotas, resultados = forca_bruta_paralela(distancias)
+        toc = time.perf_counter_ns()
+        tempos_paralelo.append(toc - tic)
+        menores_percursos = [[p[k] for k in rota] + [p[0]] for rota in rotas]
+        print(f"{i} pontos: {tempos_sequencial[-1]} ns em um processo, {toc - tic} ns em paralelo ({len(resultados)} prefixos)")
+
+    # Criação do dicionário para mapear as coordenadas para as entradas (estabelecendo uma troca de coordenada para letra)
+    coordenadas_para_entradas = {}
+    for i in range(len(entradas)):
+        entrada = entradas[i]
+        coordenada = p[i]
+        coordenadas_para_entradas[coordenada] = entrada
+
+    # Imprime todas as menores rotas possíveis para o número total de entradas escolhido pelo usuário
+    for percurso in menores_percursos:
+        percurso_entradas = [coordenadas_para_entradas[coordenada] for coordenada in percurso]
+        print(' -> '.join(percurso_entradas), f"(distância {dist_percurso(percurso)})")
+    # Tempo da busca com todas as entradas (a busca é uma só, não há média a tirar)
+    print(f"Tempo para {num_entradas} entradas: {tempos_sequencial[-1]} ns em um processo, {tempos_paralelo[-1]} ns em paralelo")
+
+    #Gráfico da escala do tempo com o número de pontos, em um processo e em paralelo, gravado em arquivo (matplotlib só é importado aqui)
+    from graficos import salvar_grafico
+    salvar_grafico({'um processo': tempos_sequencial, 'paralelo': tempos_paralelo}, 'tempos_forca_bruta.png', rotulo_x='Número de entradas',
+                   rotulo_y='Tempo de processamento (ns)', eixo_x=range(1, num_entradas+1))
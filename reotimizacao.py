@@ -0,0 +1,209 @@
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+from algoritmo_genetico import Semente, avaliar_pop_vetorizado, busca_local_pop, executar_geracoes
+from construcao import populacao_semeada
+from criterios import Callback, CriterioParada
+from enxame_de_particulas import Grafo, GrafoCandidatos, PSO
+from instrumentacao import Estatisticas, ou_desligadas
+from tsplib import distancias_entre, matriz_distancias
+from vizinhanca import DistanciasSobDemanda, vizinhos_mais_proximos
+
+# Reotimização incremental: quando alguns pontos de entrega entram ou saem, as estruturas de distância
+# e as rotas já otimizadas são atualizadas em vez de recalculadas do zero.
+# - Numeração: os pontos que ficam mantêm a ordem relativa (renumerados de 0 em diante) e os inseridos
+#   vão para o final; "mapa" leva o índice antigo ao novo (-1 para os removidos).
+# - Matriz de distâncias: os valores dos pontos que ficam são copiados e só as linhas / colunas dos
+#   inseridos são calculadas (O(n·m) distâncias novas, m = inseridos). Com distâncias sob demanda
+#   não há nada a atualizar além das coordenadas.
+# - Listas de vizinhos: só as cidades que perderam um vizinho são recalculadas (em média k por ponto
+#   removido, O(n) cada); as demais só comparam o k-ésimo vizinho com os pontos inseridos, O(n·(k + m)).
+# - Rotas: os removidos são retirados da sequência e os inseridos entram pela inserção mais barata.
+#   A população reparada inicia o GA / PSO a quente.
+
+# Aplica a alteração às coordenadas: retorna (novas coordenadas, mapa do índice antigo para o novo)
+def aplicar_alteracao(coordenadas, removidos: Sequence[int] = (), inseridos=()) -> Tuple[np.ndarray, np.ndarray]:
+    coordenadas = np.asarray(coordenadas, dtype=np.float64)
+    inseridos = np.asarray(inseridos, dtype=np.float64).reshape(-1, 2)
+    removidos = np.asarray(removidos, dtype=np.int64)
+    if len(removidos) and (removidos.min() < 0 or removidos.max() >= len(coordenadas)):
+        raise ValueError('Índice removido fora do intervalo 0..%d' % (len(coordenadas) - 1))
+    ficam = np.ones(len(coordenadas), dtype=bool)
+    ficam[removidos] = False
+    mapa = np.where(ficam, np.cumsum(ficam) - 1, -1)
+    novas = np.concatenate((coordenadas[ficam], inseridos))
+    if len(novas) < 3:
+        raise ValueError('A alteração deixaria menos de 3 pontos')
+    return novas, mapa
+
+# Atualiza a matriz de distâncias: copia a parte dos pontos que ficam e calcula só a dos inseridos
+def atualizar_matriz(matriz: np.ndarray, coordenadas: np.ndarray, mapa: np.ndarray, tipo_peso: Optional[str] = None) -> np.ndarray:
+    ficam = np.flatnonzero(mapa >= 0)
+    n_ficam, n = len(ficam), len(coordenadas)
+    nova = np.empty((n, n), dtype=matriz.dtype)
+    nova[:n_ficam, :n_ficam] = matriz if n_ficam == len(matriz) else matriz[np.ix_(ficam, ficam)]
+    if n > n_ficam:
+        bloco = distancias_entre(coordenadas[n_ficam:], coordenadas, tipo_peso)
+        nova[n_ficam:, :] = bloco
+        nova[:, n_ficam:] = bloco.T
+        # GEO não zera a diagonal sozinho (acos(1) + 1 arredondado), como em matriz_distancias
+        novos = np.arange(n_ficam, n)
+        nova[novos, novos] = 0
+    return nova
+
+# Distância euclidiana ao quadrado entre cada ponto de "origem" e cada ponto de "destino" (ordem da grade)
+def _quadrados(origem: np.ndarray, destino: np.ndarray) -> np.ndarray:
+    return ((origem[:, None, :] - destino[None, :, :]) ** 2).sum(axis=2)
+
+# Os "k" mais próximos de cada linha de "quadrado" (n_linhas, n_candidatos), ordenados
+def _k_menores(candidatos: np.ndarray, quadrado: np.ndarray, k: int) -> np.ndarray:
+    melhores = np.argpartition(quadrado, k - 1, axis=1)[:, :k]
+    ordem = np.argsort(np.take_along_axis(quadrado, melhores, axis=1), axis=1, kind='stable')
+    melhores = np.take_along_axis(melhores, ordem, axis=1)
+    return np.take_along_axis(candidatos, melhores, axis=1) if candidatos.ndim == 2 else candidatos[melhores]
+
+# Atualiza as listas de vizinhos (n_antigo, k) depois da alteração descrita por "mapa"
+# Retorna (vizinhos, distancias) como vizinhos_mais_proximos, com as distâncias em "tipo_peso"
+def atualizar_vizinhos(vizinhos: np.ndarray, coordenadas: np.ndarray, mapa: np.ndarray, tipo_peso: Optional[str] = None,
+                       tamanho_bloco: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+    n, k = len(coordenadas), vizinhos.shape[1]
+    if k > n - 1 or k == 0:
+        return vizinhos_mais_proximos(coordenadas, k, tipo_peso)
+    n_ficam = int((mapa >= 0).sum())
+    novos = np.arange(n_ficam, n)
+    atualizados = np.empty((n, k), dtype=vizinhos.dtype)
+
+    # Cidades que ficam: os vizinhos removidos saem da lista e os inseridos entram se forem mais próximos
+    antigos = mapa[vizinhos[mapa >= 0]]
+    perderam = (antigos < 0).any(axis=1)
+    candidatos = np.concatenate((antigos, np.broadcast_to(novos, (n_ficam, len(novos)))), axis=1)
+    quadrado = ((coordenadas[:n_ficam, None, :] - coordenadas[np.maximum(candidatos, 0)]) ** 2).sum(axis=2)
+    quadrado[candidatos < 0] = np.inf
+    atualizados[:n_ficam] = _k_menores(candidatos, quadrado, k)
+
+    # Quem perdeu um vizinho não sabe quem vem depois do último que sobrou: busca completa, e o
+    # mesmo para os inseridos
+    refazer = np.concatenate((np.flatnonzero(perderam), novos))
+    todos = np.arange(n)
+    for inicio in range(0, len(refazer), tamanho_bloco):
+        linhas = refazer[inicio:inicio + tamanho_bloco]
+        quadrado = _quadrados(coordenadas[linhas], coordenadas)
+        quadrado[np.arange(len(linhas)), linhas] = np.inf
+        atualizados[linhas] = _k_menores(todos, quadrado, k)
+    return atualizados, distancias_entre_listas(coordenadas, atualizados, tipo_peso)
+
+# Distâncias (em "tipo_peso") de cada cidade aos vizinhos da sua lista
+def distancias_entre_listas(coordenadas: np.ndarray, vizinhos: np.ndarray, tipo_peso: Optional[str] = None) -> np.ndarray:
+    return DistanciasSobDemanda(coordenadas, tipo_peso)[np.arange(len(coordenadas))[:, None], vizinhos]
+
+# Tira os pontos removidos e renumera as rotas (uma rota (n,) ou uma população (n_rotas, n))
+def remover_das_rotas(rotas: np.ndarray, mapa: np.ndarray) -> np.ndarray:
+    renumeradas = mapa[np.asarray(rotas)]
+    return renumeradas[renumeradas >= 0].reshape(renumeradas.shape[:-1] + (-1,))
+
+# Insere cada cidade de "cidades" em todas as rotas (n_rotas, n) na posição mais barata
+def inserir_mais_barato(rotas: np.ndarray, cidades: Sequence[int], distancias) -> np.ndarray:
+    rotas = np.atleast_2d(np.asarray(rotas, dtype=np.int64))
+    linhas = np.arange(len(rotas))
+    for cidade in cidades:
+        tamanho = rotas.shape[1]
+        if tamanho < 2:
+            rotas = np.concatenate((rotas, np.full((len(rotas), 1), cidade)), axis=1)
+            continue
+        seguintes = np.roll(rotas, -1, axis=1)
+        acrescimo = distancias[rotas, cidade] + distancias[cidade, seguintes] - distancias[rotas, seguintes]
+        posicao = np.argmin(acrescimo, axis=1)[:, None] + 1  # a cidade entra logo depois da melhor aresta
+        colunas = np.arange(tamanho + 1)[None, :]
+        origem = np.minimum(np.where(colunas < posicao, colunas, colunas - 1), tamanho - 1)
+        rotas = np.take_along_axis(rotas, origem, axis=1)
+        rotas[linhas, posicao[:, 0]] = cidade
+    return rotas
+
+# Repara rotas da instância antiga para a nova: tira os removidos e insere os novos pontos
+def reparar_rotas(rotas: np.ndarray, mapa: np.ndarray, distancias) -> np.ndarray:
+    rotas = np.asarray(rotas)
+    reparadas = inserir_mais_barato(remover_das_rotas(np.atleast_2d(rotas), mapa), range(int((mapa >= 0).sum()), len(distancias)), distancias)
+    return reparadas[0] if rotas.ndim == 1 else reparadas
+
+# Estado de um planejamento que muda ao longo do dia: coordenadas, estrutura de distâncias,
+# listas de vizinhos e a última população / melhor rota de cada resolvedor
+# Com "matriz", a matriz n x n é mantida (e atualizada a cada alteração); sem ela, as distâncias são
+# calculadas sob demanda e só as listas de "k_vizinhos" ficam guardadas (como k_vizinhos em evolucao)
+class Replanejamento:
+
+    def __init__(self, coordenadas, tipo_peso: Optional[str] = None, k_vizinhos: int = 10, matriz: bool = True,
+                 melhor_rota: Optional[np.ndarray] = None, populacao: Optional[np.ndarray] = None):
+        self.coordenadas = np.asarray(coordenadas, dtype=np.float64)
+        self.tipo_peso = tipo_peso
+        self.matriz = matriz
+        self.distancias = matriz_distancias(self.coordenadas, tipo_peso) if matriz else DistanciasSobDemanda(self.coordenadas, tipo_peso)
+        self.vizinhos, self.custos_vizinhos = vizinhos_mais_proximos(self.coordenadas, k_vizinhos, tipo_peso)
+        self.melhor_rota = None if melhor_rota is None else np.asarray(melhor_rota, dtype=np.int64)  # melhor rota conhecida
+        self.populacao = None if populacao is None else np.asarray(populacao, dtype=np.int64)  # população / pbests da última execução
+
+    # Custo da rota fechada
+    def custo(self, rota) -> float:
+        rota = np.asarray(rota)
+        return float(np.sum(self.distancias[rota, np.roll(rota, -1)]))
+
+    # Remove os pontos "removidos" (índices atuais) e acrescenta os pontos "inseridos" (coordenadas (m, 2))
+    # A melhor rota e a população são reparadas. Retorna o mapa do índice antigo para o novo (-1 se removido)
+    def alterar(self, removidos: Sequence[int] = (), inseridos=()) -> np.ndarray:
+        coordenadas, mapa = aplicar_alteracao(self.coordenadas, removidos, inseridos)
+        self.coordenadas = coordenadas
+        if self.matriz:
+            self.distancias = atualizar_matriz(self.distancias, coordenadas, mapa, self.tipo_peso)
+        else:
+            self.distancias = DistanciasSobDemanda(coordenadas, self.tipo_peso)
+        self.vizinhos, self.custos_vizinhos = atualizar_vizinhos(self.vizinhos, coordenadas, mapa, self.tipo_peso)
+        if self.melhor_rota is not None:
+            self.melhor_rota = reparar_rotas(self.melhor_rota, mapa, self.distancias)
+        if self.populacao is not None:
+            self.populacao = reparar_rotas(self.populacao, mapa, self.distancias)
+        return mapa
+
+    # Rotas que iniciam a próxima execução: a melhor rota e a população reparadas
+    def _rotas_iniciais(self) -> List[np.ndarray]:
+        rotas = [] if self.melhor_rota is None else [self.melhor_rota]
+        return rotas + ([] if self.populacao is None else list(self.populacao))
+
+    # Executa o algoritmo genético iniciado a quente pela população reparada
+    # Os parâmetros são os de evolucao; retorna (melhor_rota, fitness_ao_longo_geracoes)
+    def otimizar_ga(self, taxa_mutacao: float = 0.001, n_pop: int = 100, n_geracoes: int = 400, memetico: bool = False, operador_crossover: str = 'pmx',
+                    tamanho_torneio: int = 2, semente: Semente = None, fracao_construida: float = 0.0, tempo_limite: Optional[float] = None,
+                    limite_estagnacao: Optional[int] = None, custo_alvo: Optional[float] = None, callback: Optional[Callback] = None,
+                    estatisticas: Optional[Estatisticas] = None):
+        criterio = CriterioParada(tempo_limite, limite_estagnacao, custo_alvo, callback)
+        medicao = ou_desligadas(estatisticas)
+        medicao.iniciar()
+        rng = np.random.default_rng(semente)
+        try:
+            with medicao.etapa('inicializacao'):
+                pop = populacao_semeada(self.coordenadas, n_pop, fracao_construida, rng, rotas_iniciais=self._rotas_iniciais())
+                fitness = avaliar_pop_vetorizado(pop, self.distancias)
+            medicao.contar('avaliacoes', n_pop)
+            if memetico:
+                with medicao.etapa('busca_local'):
+                    busca_local_pop(pop, fitness, self.distancias, self.vizinhos)
+            # Como em evolucao: a mutação só fica restrita às listas de vizinhos sem a matriz
+            pop, fitness, historico = executar_geracoes(pop, fitness, self.distancias, taxa_mutacao, n_geracoes, avaliar_pop_vetorizado,
+                                                        None if self.matriz else self.vizinhos, self.vizinhos if memetico else None,
+                                                        operador_crossover, tamanho_torneio, rng, criterio, estatisticas)
+        finally:
+            medicao.finalizar()
+        self.populacao = pop
+        self.melhor_rota = pop[np.argmin(fitness)].copy()
+        return self.melhor_rota, historico
+
+    # Executa o PSO iniciado a quente pelos pbests reparados
+    # "parametros" vão para o construtor de PSO e "execucao" (tempo_limite, callback, ...) para executar(); retorna a melhor rota
+    def otimizar_pso(self, iteracoes: int = 300, tamanho_populacao: int = 300, beta: float = 0.3, alfa: float = 0.5, **parametros):
+        execucao = {nome: parametros.pop(nome) for nome in ('tempo_limite', 'limite_estagnacao', 'custo_alvo', 'callback', 'estatisticas') if nome in parametros}
+        if self.matriz:
+            grafo = Grafo.deMatriz(self.distancias, self.coordenadas, self.vizinhos)
+        else:
+            grafo = GrafoCandidatos(self.coordenadas, tipo_peso=self.tipo_peso, vizinhos=self.vizinhos)
+        pso = PSO(grafo, iteracoes, tamanho_populacao, beta, alfa, caminhos_iniciais=self._rotas_iniciais(), **parametros)
+        pso.executar(**execucao)
+        self.populacao = pso.pbests.copy()
+        self.melhor_rota = np.array(pso.getGBest().getPBest(), dtype=np.int64)
+        return self.melhor_rota
@@ -0,0 +1,620 @@
+import argparse, asyncio, hashlib, itertools, json, multiprocessing, os, threading, time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import resource_tracker, shared_memory
+from typing import Callable, Dict, List, Optional, Set, Tuple
+import numpy as np
+from algoritmo_genetico import DistanciasPreparadas, evolucao, OpcoesMemoizacao
+from enxame_de_particulas import Grafo, GrafoCandidatos, PSO
+from tsplib import InstanciaTSP, distancias_pares, ler_tsplib, matriz_distancias
+from vizinhanca import DistanciasSobDemanda, vizinhos_da_matriz, vizinhos_mais_proximos
+
+# Serviço local de resolução: um servidor asyncio que recebe pedidos em JSON, um por linha, e os
+# resolve num pool de processos com o algoritmo genético ou o PSO.
+# - As instâncias ficam num cache LRU indexado pelo hash do conteúdo (coordenadas + tipo de peso).
+# - Pedidos simultâneos para a mesma instância, chegando dentro de "janela_lote" segundos, formam um
+#   lote. A instância do lote é preparada uma vez só, por uma tarefa do pool: a matriz de distâncias
+#   e as listas de vizinhos que os pedidos usam vão para blocos de memória compartilhada, mantidos
+#   num cache LRU do servidor. Em seguida o lote inteiro é despachado de uma vez, uma tarefa por
+#   pedido, então os pedidos do lote rodam em paralelo e só recebem os nomes dos blocos.
+# - Cada processo do pool guarda num cache LRU os blocos já conectados e as estruturas montadas sobre
+#   eles (DistanciasPreparadas do GA, Grafo do PSO), então pedidos repetidos não recalculam nada.
+# - Os "parametros" do cliente passam por uma lista de nomes permitidos e faixas de valores
+#   (PARAMETROS_GA / PARAMETROS_PSO); qualquer outro nome ou valor fora da faixa é respondido com erro.
+# - Enquanto o resolvedor melhora, a melhor rota até o momento é enviada de volta ao cliente.
+#
+# Pedido:   {"id": ..., "coordenadas": [[x, y], ...], "tipo_peso": "EUC_2D"}  ou  {"id": ..., "arquivo": "berlin52.tsp"}
+#           com "resolvedor" ('ga' ou 'pso'), "parametros" (argumentos permitidos de evolucao / PSO), "semente" e "intervalo_parcial"
+# Respostas: {"id": ..., "tipo": "parcial", "custo": ..., "rota": [...], "iteracao": ...}  (zero ou mais)
+#            {"id": ..., "tipo": "final", "custo": ..., "rota": [...], "tempo_s": ..., "iteracoes": ...}  ou  {"id": ..., "tipo": "erro", "mensagem": ...}
+
+PORTA_PADRAO = 8765
+RESOLVEDORES = ('ga', 'pso')
+
+# Parâmetros padrão de cada resolvedor (os mesmos de principal() / main())
+PADRAO_GA = {'taxa_mutacao': 0.001, 'n_pop': 100, 'n_geracoes': 400}
+PADRAO_PSO = {'iteracoes': 300, 'tamanho_populacao': 300, 'beta': 0.3, 'alfa': 0.5}
+# Parâmetros do PSO que vão para executar() em vez do construtor
+PARAMETROS_EXECUCAO_PSO = ('tempo_limite', 'limite_estagnacao', 'custo_alvo')
+
+# Parâmetros que o cliente pode informar: nome -> (tipo, mínimo, máximo) ou tupla de opções
+# (arquivos de checkpoint, estatísticas e callbacks ficam de fora: são decididos pelo serviço)
+PARAMETROS_COMUNS = {
+    'k_vizinhos': (int, 1, 100),
+    'fracao_construida': (float, 0.0, 1.0),
+    'tempo_limite': (float, 0.0, 3600.0),
+    'limite_estagnacao': (int, 1, 1000000),
+    'custo_alvo': (float, 0.0, float('inf')),
+}
+PARAMETROS_GA = dict(PARAMETROS_COMUNS, **{
+    'taxa_mutacao': (float, 0.0, 1.0),
+    'n_pop': (int, 2, 10000),  # par: o crossover cruza a população em pares
+    'n_geracoes': (int, 1, 100000),
+    'vetorizado': (bool, False, True),
+    'memetico': (bool, False, True),
+    'operador_crossover': ('pmx', 'ox', 'erx'),
+    'tamanho_torneio': (int, 1, 100),
+    'capacidade_cache': (int, 0, 1000000),
+    'eliminar_duplicatas': (bool, False, True),
+})
+PARAMETROS_PSO = dict(PARAMETROS_COMUNS, **{
+    'iteracoes': (int, 1, 100000),
+    'tamanho_populacao': (int, 1, 10000),
+    'beta': (float, 0.0, 1.0),
+    'alfa': (float, 0.0, 1.0),
+    'melhoria_local': (None, 'gbest', 'pbest'),
+})
+
+# Confere os parâmetros do cliente contra a lista do resolvedor; levanta ValueError no primeiro problema
+def validar_parametros(resolvedor: str, parametros) -> dict:
+    if parametros is None:
+        return {}
+    if not isinstance(parametros, dict):
+        raise ValueError('"parametros" deve ser um objeto JSON')
+    permitidos = PARAMETROS_GA if resolvedor == 'ga' else PARAMETROS_PSO
+    for nome, valor in parametros.items():
+        if nome not in permitidos:
+            raise ValueError('Parâmetro não permitido para %s: %s' % (resolvedor, nome))
+        regra = permitidos[nome]
+        if not isinstance(regra[0], type):
+            if valor not in regra:
+                raise ValueError('"%s" deve ser um de %s' % (nome, list(regra)))
+            continue
+        tipo, minimo, maximo = regra
+        if valor is None and nome in PARAMETROS_COMUNS:
+            continue
+        # bool é subclasse de int: só vale onde o tipo é bool; int também vale onde o tipo é float
+        aceito = isinstance(valor, bool) if tipo is bool else \
+            not isinstance(valor, bool) and isinstance(valor, (int, float) if tipo is float else int)
+        if not aceito or not minimo <= valor <= maximo:
+            raise ValueError('"%s" deve ser %s entre %s e %s' % (nome, tipo.__name__, minimo, maximo))
+    if resolvedor == 'ga' and parametros.get('n_pop', PADRAO_GA['n_pop']) % 2:
+        raise ValueError('"n_pop" deve ser par')
+    return dict(parametros)
+
+# Hash do conteúdo de uma instância
+def chave_instancia(coordenadas: np.ndarray, tipo_peso: str) -> str:
+    resumo = hashlib.sha256(np.ascontiguousarray(coordenadas, dtype=np.float64).tobytes())
+    resumo.update(tipo_peso.encode())
+    return resumo.hexdigest()
+
+# Dicionário LRU de tamanho limitado
+# "ao_remover", se informado, recebe cada valor descartado (ex.: para liberar memória compartilhada)
+class CacheLRU:
+
+    def __init__(self, capacidade: int, ao_remover: Optional[Callable] = None):
+        self.capacidade = capacidade
+        self.ao_remover = ao_remover
+        self.itens = OrderedDict()
+        self.acertos = 0
+        self.faltas = 0
+
+    def obter(self, chave, criar: Callable):
+        if chave in self.itens:
+            self.itens.move_to_end(chave)
+            self.acertos += 1
+            return self.itens[chave]
+        self.faltas += 1
+        valor = criar()
+        self.itens[chave] = valor
+        while len(self.itens) > self.capacidade:
+            _, removido = self.itens.popitem(last=False)
+            if self.ao_remover is not None:
+                self.ao_remover(removido)
+        return valor
+
+# Estruturas que um pedido usa, pelo nome do bloco compartilhado:
+# 'matriz' (n x n), 'vizinhos_k' (k vizinhos mais próximos, pela grade) e 'vizinhos_matriz' (10 vizinhos, pela matriz)
+def estruturas_do_pedido(pedido: dict) -> Set[str]:
+    parametros = pedido.get('parametros') or {}
+    k_vizinhos = parametros.get('k_vizinhos')
+    if k_vizinhos:
+        return {'vizinhos_%d' % k_vizinhos}
+    busca_local = parametros.get('memetico') if pedido['resolvedor'] == 'ga' else parametros.get('melhoria_local')
+    return {'matriz', 'vizinhos_matriz'} if busca_local else {'matriz'}
+
+# Forma e dtype do bloco "nome" para uma instância de "n" cidades
+def forma_estrutura(nome: str, n: int) -> Tuple[Tuple[int, ...], str]:
+    if nome == 'matriz':
+        return (n, n), np.dtype(np.float64).str
+    k = 10 if nome == 'vizinhos_matriz' else int(nome.rpartition('_')[2])
+    return (n, max(min(k, n - 1), 0)), np.dtype(np.int32).str
+
+# Estruturas de uma instância, montadas uma vez em blocos de memória compartilhada
+# O servidor cria e remove os blocos; os processos do pool só se conectam a eles pelo nome
+class InstanciaPreparada:
+
+    def __init__(self, identificador: str):
+        self.identificador = identificador
+        self.blocos: Dict[str, shared_memory.SharedMemory] = {}
+        self.descritores: Dict[str, Tuple[str, Tuple[int, ...], str]] = {}  # nome -> (bloco, forma, dtype)
+        self.trava = asyncio.Lock()  # um lote por vez monta estruturas novas
+        self.pendentes = 0  # pedidos que ainda podem se conectar aos blocos
+        self.removida = False  # saiu do cache do servidor: os blocos são removidos quando "pendentes" zerar
+
+    def criar(self, nome: str, n: int) -> None:
+        forma, dtype = forma_estrutura(nome, n)
+        memoria = shared_memory.SharedMemory(create=True, size=max(int(np.prod(forma)) * np.dtype(dtype).itemsize, 1))
+        self.blocos[nome] = memoria
+        self.descritores[nome] = (memoria.name, forma, dtype)
+
+    def descartar(self, nome: str) -> None:
+        del self.descritores[nome]
+        memoria = self.blocos.pop(nome)
+        memoria.close()
+        memoria.unlink()
+
+    def liberar(self) -> None:
+        for nome in list(self.blocos):
+            self.descartar(nome)
+
+# ---------------------------------------------------------------------------------------------
+# Lado dos processos do pool
+
+_fila = None  # fila de mensagens de volta para o servidor (multiprocessing.Queue)
+_preparadas = None  # cache LRU dos blocos conectados e das estruturas montadas de cada instância
+
+def _iniciar_processo(fila, capacidade: int) -> None:
+    global _fila, _preparadas
+    _fila = fila
+    _preparadas = CacheLRU(capacidade, _desconectar)
+
+# Conecta a um bloco compartilhado e devolve (bloco, visão somente leitura)
+def _conectar(descritor: Tuple[str, Tuple[int, ...], str]) -> Tuple[shared_memory.SharedMemory, np.ndarray]:
+    nome_bloco, forma, dtype = descritor
+    memoria = shared_memory.SharedMemory(name=nome_bloco)
+    return memoria, np.ndarray(forma, dtype=dtype, buffer=memoria.buf)
+
+# Fecha os blocos de uma instância que saiu do cache do processo
+def _desconectar(preparada: dict) -> None:
+    memorias = preparada['memorias']
+    # As visões e as estruturas montadas sobre elas precisam sair antes de close()
+    preparada.clear()
+    for memoria in memorias:
+        try:
+            memoria.close()
+        except BufferError:
+            # Ainda há uma visão viva (ex.: num ciclo não coletado): o mapeamento sai junto com ela
+            pass
+
+# Visão do bloco "nome" da instância, conectando na primeira vez
+def _bloco(preparada: dict, descritores: dict, nome: str) -> np.ndarray:
+    visoes = preparada['visoes']
+    if nome not in visoes:
+        memoria, visao = _conectar(descritores[nome])
+        visao.flags.writeable = False
+        preparada['memorias'].append(memoria)
+        visoes[nome] = visao
+    return visoes[nome]
+
+# Monta as estruturas "nomes" nos blocos já criados pelo servidor (executado dentro do pool)
+def _preparar_estruturas(coordenadas: np.ndarray, tipo_peso: str, descritores: dict, nomes: List[str]) -> None:
+    usados = set(nomes) | ({'matriz'} if 'vizinhos_matriz' in nomes else set())
+    memorias, visoes = {}, {}
+    try:
+        for nome in usados:
+            memorias[nome], visoes[nome] = _conectar(descritores[nome])
+        if 'matriz' in nomes:
+            matriz_distancias(coordenadas, tipo_peso, saida=visoes['matriz'])
+        for nome in nomes:
+            if nome == 'vizinhos_matriz':
+                visoes[nome][:] = vizinhos_da_matriz(visoes['matriz'], visoes[nome].shape[1])[0]
+            elif nome != 'matriz':
+                visoes[nome][:] = vizinhos_mais_proximos(coordenadas, visoes[nome].shape[1])[0]
+    finally:
+        visoes.clear()
+        for memoria in memorias.values():
+            memoria.close()
+
+# Custo de uma rota fechada com a métrica da instância
+def _custo(coordenadas: np.ndarray, tipo_peso: str, rota: np.ndarray) -> float:
+    return float(distancias_pares(coordenadas[rota], coordenadas[np.roll(rota, -1)], tipo_peso).sum())
+
+# Resolve um pedido com a instância preparada, enviando as melhorias pela fila
+def _resolver(preparada: dict, descritores: dict, pedido: dict) -> None:
+    coordenadas, tipo_peso = preparada['coordenadas'], preparada['tipo_peso']
+    identificador = pedido['id_interno']
+    intervalo = pedido.get('intervalo_parcial', 0.1)
+    inicio = time.perf_counter()
+    ultimo_envio = [-np.inf, np.inf]  # instante do último envio e melhor custo já enviado
+    iteracoes = [0]
+
+    def progresso(iteracao, rota, custo):
+        iteracoes[0] = iteracao + 1
+        agora = time.perf_counter()
+        if intervalo is not None and custo < ultimo_envio[1] and agora - ultimo_envio[0] >= intervalo:
+            ultimo_envio[:] = [agora, custo]
+            _fila.put((identificador, {'tipo': 'parcial', 'iteracao': iteracao, 'rota': rota.tolist(),
+                                       'custo': _custo(coordenadas, tipo_peso, rota)}))
+
+    parametros = dict(pedido.get('parametros') or {})
+    if pedido['resolvedor'] == 'ga':
+        parametros = dict(PADRAO_GA, **parametros)
+        # Mesma métrica da instância (tipo_peso) que o custo devolvido ao cliente, com as listas de vizinhos do servidor
+        k_vizinhos, memetico = parametros.get('k_vizinhos'), bool(parametros.get('memetico'))
+        chave_distancias = ('distancias', k_vizinhos, memetico)
+        if chave_distancias not in preparada:
+            if k_vizinhos:
+                vizinhos = _bloco(preparada, descritores, 'vizinhos_%d' % k_vizinhos)
+                preparada[chave_distancias] = DistanciasPreparadas(DistanciasSobDemanda(coordenadas, tipo_peso), vizinhos, vizinhos)
+            else:
+                vizinhos_busca = _bloco(preparada, descritores, 'vizinhos_matriz') if memetico else None
+                preparada[chave_distancias] = DistanciasPreparadas(_bloco(preparada, descritores, 'matriz'), None, vizinhos_busca)
+        memoizacao = OpcoesMemoizacao(parametros.pop('capacidade_cache', None), parametros.pop('eliminar_duplicatas', False))
+        rota, _ = evolucao(coordenadas, semente=pedido.get('semente'), callback=progresso,
+                           distancias=preparada[chave_distancias], memoizacao=memoizacao, **parametros)
+    else:
+        parametros = dict(PADRAO_PSO, **parametros)
+        execucao = {nome: parametros.pop(nome) for nome in PARAMETROS_EXECUCAO_PSO if nome in parametros}
+        k_vizinhos = parametros.pop('k_vizinhos', None)
+        chave_grafo = ('grafo', k_vizinhos)
+        if chave_grafo not in preparada:
+            preparada[chave_grafo] = GrafoCandidatos(coordenadas, k_vizinhos, tipo_peso, _bloco(preparada, descritores, 'vizinhos_%d' % k_vizinhos)) \
+                if k_vizinhos else Grafo.deMatriz(_bloco(preparada, descritores, 'matriz'), coordenadas)
+        grafo = preparada[chave_grafo]
+        if grafo.vizinhos is None and 'vizinhos_matriz' in descritores:
+            grafo.vizinhos = _bloco(preparada, descritores, 'vizinhos_matriz')
+        pso = PSO(grafo, semente=pedido.get('semente'), **parametros)
+        pso.executar(callback=progresso, **execucao)
+        rota = np.array(pso.getGBest().getPBest())
+    _fila.put((identificador, {'tipo': 'final', 'rota': rota.tolist(), 'custo': _custo(coordenadas, tipo_peso, rota),
+                               'tempo_s': time.perf_counter() - inicio, 'iteracoes': iteracoes[0]}))
+
+# Resolve um pedido (executado dentro do pool); os blocos da instância ficam conectados no cache do processo
+def _resolver_pedido(identificador: str, coordenadas: np.ndarray, tipo_peso: str, descritores: dict, pedido: dict) -> None:
+    preparada = _preparadas.obter(identificador, lambda: {'coordenadas': coordenadas, 'tipo_peso': tipo_peso, 'memorias': [], 'visoes': {}})
+    try:
+        _resolver(preparada, descritores, pedido)
+    except Exception as erro:
+        _fila.put((pedido['id_interno'], {'tipo': 'erro', 'mensagem': '%s: %s' % (type(erro).__name__, erro)}))
+
+# ---------------------------------------------------------------------------------------------
+# Servidor
+
+class ServicoSolver:
+
+    def __init__(self, n_processos: Optional[int] = None, capacidade_cache: int = 16, janela_lote: float = 0.005, tamanho_maximo_lote: int = 32):
+        self.n_processos = n_processos or os.cpu_count() or 1
+        self.instancias = CacheLRU(capacidade_cache)  # instâncias lidas / recebidas, pelo hash do conteúdo
+        self.arquivos = CacheLRU(capacidade_cache)  # (caminho, data de modificação) -> hash
+        self.preparadas = CacheLRU(capacidade_cache, self._remover_preparada)  # hash -> InstanciaPreparada
+        self.capacidade_cache = capacidade_cache
+        self.janela_lote = janela_lote
+        self.tamanho_maximo_lote = tamanho_maximo_lote
+        self.lotes_despachados = 0
+        self.tarefas_despachadas = 0
+        self._lotes: Dict[str, Tuple[InstanciaTSP, List[dict]]] = {}
+        self._removidas: Set[InstanciaPreparada] = set()  # fora do cache, com pedidos ainda pendentes
+        self._despachos = set()
+        self._respostas: Dict[int, asyncio.Queue] = {}
+        self._contador = itertools.count()
+        self._servidor = None
+        self._pool = None
+        self._fila = None
+        self._leitor_fila = None
+        self._loop = None
+
+    # Sobe o pool e o servidor TCP; "porta" 0 escolhe uma porta livre. Retorna a porta usada
+    async def iniciar(self, host: str = '127.0.0.1', porta: int = PORTA_PADRAO) -> int:
+        self._loop = asyncio.get_running_loop()
+        self._fila = multiprocessing.Queue()
+        # O rastreador de recursos sobe antes do pool para ser herdado pelos processos: assim um bloco
+        # conectado por eles não é dado como vazado (e removido) quando um processo termina
+        resource_tracker.ensure_running()
+        self._pool = ProcessPoolExecutor(max_workers=self.n_processos, initializer=_iniciar_processo,
+                                         initargs=(self._fila, self.capacidade_cache))
+        self._leitor_fila = threading.Thread(target=self._ler_fila, daemon=True)
+        self._leitor_fila.start()
+        self._servidor = await asyncio.start_server(self._atender, host, porta, limit=2 ** 26)
+        return self._servidor.sockets[0].getsockname()[1]
+
+    # Atende até ser cancelado
+    async def servir(self) -> None:
+        async with self._servidor:
+            await self._servidor.serve_forever()
+
+    async def encerrar(self) -> None:
+        if self._servidor is not None:
+            self._servidor.close()
+            await self._servidor.wait_closed()
+        if self._pool is not None:
+            await self._loop.run_in_executor(None, self._pool.shutdown)
+        for preparada in list(self.preparadas.itens.values()) + list(self._removidas):
+            preparada.liberar()
+        self.preparadas.itens.clear()
+        self._removidas.clear()
+        if self._fila is not None:
+            self._fila.put(None)
+            self._leitor_fila.join()
+            self._fila.close()
+
+    # Thread que repassa as mensagens dos processos do pool para o laço de eventos
+    def _ler_fila(self) -> None:
+        while True:
+            item = self._fila.get()
+            if item is None:
+                return
+            self._loop.call_soon_threadsafe(self._entregar, *item)
+
+    def _entregar(self, identificador: int, mensagem: dict) -> None:
+        fila = self._respostas.get(identificador)
+        if fila is not None:
+            fila.put_nowait(mensagem)
+
+    # Lê a instância do pedido (coordenadas ou arquivo TSPLIB), usando o cache LRU
+    def _instancia(self, pedido: dict) -> Tuple[str, InstanciaTSP]:
+        if 'arquivo' in pedido:
+            caminho = pedido['arquivo']
+            def ler():
+                instancia = ler_tsplib(caminho)
+                chave = chave_instancia(instancia.coordenadas, instancia.tipo_peso)
+                self.instancias.obter(chave, lambda: instancia)
+                return chave
+            chave = self.arquivos.obter((caminho, os.path.getmtime(caminho)), ler)
+            return chave, self.instancias.obter(chave, lambda: ler_tsplib(caminho))
+        if 'coordenadas' not in pedido:
+            raise ValueError('O pedido precisa de "coordenadas" ou "arquivo"')
+        coordenadas = np.asarray(pedido['coordenadas'], dtype=np.float64)
+        if coordenadas.ndim != 2 or coordenadas.shape[1] != 2 or len(coordenadas) < 3:
+            raise ValueError('"coordenadas" deve ser uma lista de pelo menos 3 pares [x, y]')
+        tipo_peso = pedido.get('tipo_peso', 'EUC_2D')
+        chave = chave_instancia(coordenadas, tipo_peso)
+        return chave, self.instancias.obter(chave, lambda: InstanciaTSP(chave[:12], len(coordenadas), tipo_peso, coordenadas))
+
+    # Coloca o pedido no lote da instância; o lote é despachado ao fim da janela ou quando enche
+    def _agendar(self, chave: str, instancia: InstanciaTSP, pedido: dict) -> None:
+        if chave not in self._lotes:
+            self._lotes[chave] = (instancia, [])
+            self._loop.call_later(self.janela_lote, self._despachar, chave)
+        pedidos = self._lotes[chave][1]
+        pedidos.append(pedido)
+        if len(pedidos) >= self.tamanho_maximo_lote:
+            self._despachar(chave)
+
+    def _despachar(self, chave: str) -> None:
+        if chave not in self._lotes:
+            return
+        instancia, pedidos = self._lotes.pop(chave)
+        self.lotes_despachados += 1
+        despacho = self._loop.create_task(self._despachar_lote(chave, instancia, pedidos))
+        self._despachos.add(despacho)
+        despacho.add_done_callback(self._despachos.discard)
+
+    # Prepara a instância uma vez (só as estruturas que ainda faltam) e envia todos os pedidos do lote ao pool
+    async def _despachar_lote(self, chave: str, instancia: InstanciaTSP, pedidos: List[dict]) -> None:
+        coordenadas = np.asarray(instancia.coordenadas)
+        preparada = self.preparadas.obter(chave, lambda: InstanciaPreparada('%s-%d' % (chave[:16], next(self._contador))))
+        preparada.pendentes += len(pedidos)
+        try:
+            async with preparada.trava:
+                faltando = sorted(set().union(*map(estruturas_do_pedido, pedidos)) - set(preparada.descritores))
+                if faltando:
+                    for nome in faltando:
+                        preparada.criar(nome, len(coordenadas))
+                    try:
+                        await asyncio.wrap_future(self._pool.submit(_preparar_estruturas, coordenadas, instancia.tipo_peso,
+                                                                    dict(preparada.descritores), faltando))
+                    except BaseException:
+                        # Blocos pela metade não ficam no cache: o próximo lote tenta de novo
+                        for nome in faltando:
+                            preparada.descartar(nome)
+                        raise
+        except Exception as erro:
+            for pedido in pedidos:
+                self._entregar(pedido['id_interno'], {'tipo': 'erro', 'mensagem': '%s: %s' % (type(erro).__name__, erro)})
+            self._concluir(preparada, len(pedidos))
+            return
+
+        descritores = dict(preparada.descritores)
+        for pedido in pedidos:
+            self.tarefas_despachadas += 1
+            tarefa = self._pool.submit(_resolver_pedido, preparada.identificador, coordenadas, instancia.tipo_peso, descritores, pedido)
+
+            # Se o processo do pool morrer, o pedido recebe erro
+            def concluida(tarefa, pedido=pedido):
+                erro = tarefa.exception()
+                if erro is not None:
+                    self._loop.call_soon_threadsafe(self._entregar, pedido['id_interno'], {'tipo': 'erro', 'mensagem': str(erro)})
+                self._loop.call_soon_threadsafe(self._concluir, preparada, 1)
+            tarefa.add_done_callback(concluida)
+
+    # Os blocos de uma instância que saiu do cache só são removidos depois do último pedido que pode usá-los
+    def _remover_preparada(self, preparada: InstanciaPreparada) -> None:
+        preparada.removida = True
+        if preparada.pendentes:
+            self._removidas.add(preparada)
+        else:
+            preparada.liberar()
+
+    def _concluir(self, preparada: InstanciaPreparada, quantidade: int) -> None:
+        preparada.pendentes -= quantidade
+        if preparada.removida and not preparada.pendentes:
+            self._removidas.discard(preparada)
+            preparada.liberar()
+
+    # Processa um pedido e repassa as respostas ao cliente até a final (ou erro)
+    async def _processar(self, pedido: dict, responder) -> None:
+        identificador = pedido.get('id')
+        try:
+            resolvedor = pedido.get('resolvedor', 'ga')
+            if resolvedor not in RESOLVEDORES:
+                raise ValueError('Resolvedor desconhecido: %s' % resolvedor)
+            parametros = validar_parametros(resolvedor, pedido.get('parametros'))
+            semente, intervalo = pedido.get('semente'), pedido.get('intervalo_parcial', 0.1)
+            if semente is not None and (isinstance(semente, bool) or not isinstance(semente, int) or semente < 0):
+                raise ValueError('"semente" deve ser um inteiro não negativo')
+            if intervalo is not None and (isinstance(intervalo, bool) or not isinstance(intervalo, (int, float)) or intervalo < 0):
+                raise ValueError('"intervalo_parcial" deve ser um número não negativo')
+            chave, instancia = self._instancia(pedido)
+        except (OSError, ValueError, KeyError) as erro:
+            await responder({'id': identificador, 'tipo': 'erro', 'mensagem': str(erro)})
+            return
+        interno = next(self._contador)
+        fila = self._respostas[interno] = asyncio.Queue()
+        self._agendar(chave, instancia, {'id_interno': interno, 'resolvedor': resolvedor, 'parametros': parametros,
+                                         'semente': semente, 'intervalo_parcial': intervalo})
+        try:
+            while True:
+                mensagem = await fila.get()
+                mensagem['id'] = identificador
+                await responder(mensagem)
+                if mensagem['tipo'] != 'parcial':
+                    break
+        finally:
+            del self._respostas[interno]
+
+    # Conexão de um cliente: vários pedidos podem estar em andamento ao mesmo tempo
+    async def _atender(self, leitor: asyncio.StreamReader, escritor: asyncio.StreamWriter) -> None:
+        trava = asyncio.Lock()
+
+        async def responder(mensagem):
+            async with trava:
+                escritor.write((json.dumps(mensagem) + '\n').encode())
+                await escritor.drain()
+
+        tarefas = set()
+        try:
+            while True:
+                linha = await leitor.readline()
+                if not linha:
+                    break
+                try:
+                    pedido = json.loads(linha)
+                except ValueError:
+                    await responder({'tipo': 'erro', 'mensagem': 'JSON inválido'})
+                    continue
+                tarefa = asyncio.create_task(self._processar(pedido, responder))
+                tarefas.add(tarefa)
+                tarefa.add_done_callback(tarefas.discard)
+            await asyncio.gather(*tarefas, return_exceptions=True)
+        except ConnectionError:
+            pass
+        finally:
+            escritor.close()
+
+# ---------------------------------------------------------------------------------------------
+# Cliente
+
+class ClienteSolver:
+
+    def __init__(self, host: str = '127.0.0.1', porta: int = PORTA_PADRAO):
+        self.host = host
+        self.porta = porta
+        self._leitor = None
+        self._escritor = None
+        self._pendentes: Dict[int, Tuple[asyncio.Future, Optional[Callable]]] = {}
+        self._contador = itertools.count()
+        self._recebendo = None
+
+    async def conectar(self) -> None:
+        self._leitor, self._escritor = await asyncio.open_connection(self.host, self.porta, limit=2 ** 26)
+        self._recebendo = asyncio.create_task(self._receber())
+
+    async def fechar(self) -> None:
+        if self._escritor is not None:
+            self._escritor.close()
+            await self._escritor.wait_closed()
+        if self._recebendo is not None:
+            await asyncio.gather(self._recebendo, return_exceptions=True)
+
+    async def __aenter__(self):
+        await self.conectar()
+        return self
+
+    async def __aexit__(self, *excecao):
+        await self.fechar()
+
+    # Distribui as respostas pelos pedidos pendentes
+    async def _receber(self) -> None:
+        while True:
+            linha = await self._leitor.readline()
+            if not linha:
+                break
+            mensagem = json.loads(linha)
+            futuro, ao_progresso = self._pendentes.get(mensagem.get('id'), (None, None))
+            if futuro is None:
+                continue
+            if mensagem['tipo'] == 'parcial':
+                if ao_progresso is not None:
+                    ao_progresso(mensagem)
+            else:
+                del self._pendentes[mensagem['id']]
+                futuro.set_result(mensagem)
+        for futuro, _ in self._pendentes.values():
+            if not futuro.done():
+                futuro.set_exception(ConnectionError('conexão com o serviço encerrada'))
+
+    # Envia um pedido e espera a resposta final; "ao_progresso" recebe cada melhoria parcial
+    # Sem "arquivo", "coordenadas" é obrigatório. Levanta ValueError se o serviço responder com erro
+    async def resolver(self, coordenadas=None, arquivo: Optional[str] = None, resolvedor: str = 'ga', parametros: Optional[dict] = None,
+                       semente: Optional[int] = None, tipo_peso: str = 'EUC_2D', ao_progresso: Optional[Callable[[dict], None]] = None,
+                       intervalo_parcial: Optional[float] = 0.1) -> dict:
+        identificador = next(self._contador)
+        pedido = {'id': identificador, 'resolvedor': resolvedor, 'parametros': parametros or {}, 'semente': semente,
+                  'intervalo_parcial': intervalo_parcial}
+        if arquivo is not None:
+            pedido['arquivo'] = arquivo
+        else:
+            pedido['coordenadas'] = np.asarray(coordenadas, dtype=np.float64).tolist()
+            pedido['tipo_peso'] = tipo_peso
+        futuro = asyncio.get_running_loop().create_future()
+        self._pendentes[identificador] = (futuro, ao_progresso)
+        self._escritor.write((json.dumps(pedido) + '\n').encode())
+        await self._escritor.drain()
+        resposta = await futuro
+        if resposta['tipo'] == 'erro':
+            raise ValueError(resposta['mensagem'])
+        return resposta
+
+# Atalho síncrono: conecta, resolve um pedido e desconecta
+def resolver_remoto(host: str = '127.0.0.1', porta: int = PORTA_PADRAO, **pedido) -> dict:
+    async def executar():
+        async with ClienteSolver(host, porta) as cliente:
+            return await cliente.resolver(**pedido)
+    return asyncio.run(executar())
+
+def main():
+    parser = argparse.ArgumentParser(description='Serviço local de resolução (GA / PSO)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--porta', type=int, default=PORTA_PADRAO)
+    parser.add_argument('--processos', type=int, default=None)
+    parser.add_argument('--cache', type=int, default=16, help='instâncias mantidas no cache LRU')
+    parser.add_argument('--janela-lote', type=float, default=0.005, help='segundos de espera para agrupar pedidos da mesma instância')
+    args = parser.parse_args()
+
+    async def executar():
+        servico = ServicoSolver(args.processos, args.cache, args.janela_lote)
+        porta = await servico.iniciar(args.host, args.porta)
+        print('Serviço ouvindo em %s:%d' % (args.host, porta))
+        try:
+            await servico.servir()
+        finally:
+            await servico.encerrar()
+
+    try:
+        asyncio.run(executar())
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == "__main__":
+    main()
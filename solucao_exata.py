@@ -0,0 +1,250 @@
+import itertools, multiprocessing, os, time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from instrumentacao import Estatisticas, ou_desligadas
+
+# Resolvedores exatos para instâncias pequenas, usados para conferir as heurísticas.
+# Todos recebem uma matriz de distâncias (n x n) e devolvem (menor_custo, rotas), em que
+# "rotas" tem todas as rotas ótimas, cada uma como lista de índices que começa na cidade 0
+# (o depósito) e volta implicitamente para ela.
+
+# Tolerância para considerar dois custos iguais (empates entre rotas ótimas)
+TOLERANCIA = 1e-9
+
+# Gera todas as rotas que começam por "prefixo", uma de cada vez, com o custo calculado
+# incrementalmente (custo do prefixo + uma aresta por passo), sem montar a lista de permutações
+def enumerar_rotas(distancias, prefixo: Sequence[int] = (0,)) -> Iterator[Tuple[float, List[int]]]:
+    n = len(distancias)
+    rota = list(prefixo)
+    visitada = [False] * n
+    for cidade in rota:
+        visitada[cidade] = True
+    custo_prefixo = sum(distancias[rota[i - 1]][rota[i]] for i in range(1, len(rota)))
+
+    def estender(custo):
+        if len(rota) == n:
+            yield custo + distancias[rota[-1]][rota[0]], list(rota)
+            return
+        ultima = rota[-1]
+        for cidade in range(n):
+            if not visitada[cidade]:
+                visitada[cidade] = True
+                rota.append(cidade)
+                yield from estender(custo + distancias[ultima][cidade])
+                rota.pop()
+                visitada[cidade] = False
+
+    yield from estender(custo_prefixo)
+
+# Força bruta com poda por prefixo: um ramo é abandonado assim que o custo parcial passa do
+# melhor custo completo já encontrado. "limite" permite começar com um custo conhecido (ex.: de uma heurística)
+# "estatisticas" (instrumentacao.Estatisticas) recebe em "avaliacoes" as rotas completas que chegaram a ser avaliadas
+def forca_bruta(distancias, prefixo: Sequence[int] = (0,), limite: float = np.inf, estatisticas: Optional[Estatisticas] = None) -> Tuple[float, List[List[int]]]:
+    distancias = np.asarray(distancias).tolist()
+    n = len(distancias)
+    rota = list(prefixo)
+    visitada = [False] * n
+    for cidade in rota:
+        visitada[cidade] = True
+    melhor = [limite, []]
+    avaliadas = [0]
+
+    def estender(custo):
+        if custo > melhor[0] + TOLERANCIA:
+            return
+        ultima = rota[-1]
+        if len(rota) == n:
+            avaliadas[0] += 1
+            total = custo + distancias[ultima][rota[0]]
+            if total < melhor[0] - TOLERANCIA:
+                melhor[0], melhor[1] = total, [list(rota)]
+            elif total <= melhor[0] + TOLERANCIA:
+                melhor[1].append(list(rota))
+            return
+        for cidade in range(n):
+            if not visitada[cidade]:
+                visitada[cidade] = True
+                rota.append(cidade)
+                estender(custo + distancias[ultima][cidade])
+                rota.pop()
+                visitada[cidade] = False
+
+    estender(sum(distancias[rota[i - 1]][rota[i]] for i in range(1, len(rota))))
+    ou_desligadas(estatisticas).contar('avaliacoes', avaliadas[0])
+    return melhor[0], melhor[1]
+
+# Força bruta paralela: as rotas são divididas pelos prefixos fixos (0, a, b, ...) e cada processo do pool
+# resolve os prefixos que recebe com forca_bruta (geração preguiçosa + custo incremental + poda)
+# A matriz é enviada uma vez para cada processo (inicializador do pool), não uma vez por prefixo, e o
+# melhor custo já encontrado é compartilhado entre os processos para a poda valer entre prefixos
+_distancias = None  # matriz de distâncias do processo (lista de listas)
+_melhor = None  # melhor custo completo encontrado por qualquer processo (multiprocessing.Value)
+
+def _iniciar_processo(distancias: List[List[float]], melhor) -> None:
+    global _distancias, _melhor
+    _distancias = distancias
+    _melhor = melhor
+
+# Todos os prefixos de "tamanho" cidades que começam no depósito, em ordem lexicográfica
+def prefixos(n: int, tamanho: int) -> List[Tuple[int, ...]]:
+    return [(0,) + resto for resto in itertools.permutations(range(1, n), max(0, min(tamanho, n) - 1))]
+
+# Menor tamanho de prefixo que gera pelo menos "blocos_por_processo" tarefas para cada processo
+def tamanho_prefixo(n: int, n_processos: int, blocos_por_processo: int = 4) -> int:
+    tamanho, quantidade = 1, 1
+    while quantidade < n_processos * blocos_por_processo and tamanho < n:
+        quantidade *= n - tamanho
+        tamanho += 1
+    return tamanho
+
+# Resolve um prefixo no processo: devolve os ótimos locais e o tempo gasto
+def _resolver_prefixo(prefixo: Tuple[int, ...], limite: float) -> Dict:
+    inicio = time.perf_counter()
+    custo, rotas = forca_bruta(_distancias, prefixo, min(limite, _melhor.value))
+    with _melhor.get_lock():
+        _melhor.value = min(_melhor.value, custo)
+    return {'prefixo': prefixo, 'custo': custo, 'rotas': rotas, 'tempo_s': time.perf_counter() - inicio}
+
+# Junta os ótimos locais de cada prefixo: fica o menor custo com todas as rotas empatadas nele
+def reduzir(resultados: Sequence[Dict]) -> Tuple[float, List[List[int]]]:
+    menor = min((resultado['custo'] for resultado in resultados), default=np.inf)
+    rotas = [rota for resultado in resultados if resultado['custo'] <= menor + TOLERANCIA for rota in resultado['rotas']]
+    return menor, rotas
+
+# Força bruta em "n_processos" processos, dividida pelos prefixos de "tamanho" cidades (escolhido por tamanho_prefixo)
+# Cada prefixo começa com "limite" (por padrão, o custo da rota 0, 1, ..., n - 1, que nunca corta um ótimo)
+# Retorna (menor_custo, rotas, resultados): as rotas na mesma ordem de forca_bruta e o custo / tempo de cada prefixo
+def forca_bruta_paralela(distancias, n_processos: Optional[int] = None, tamanho: Optional[int] = None,
+                         limite: Optional[float] = None) -> Tuple[float, List[List[int]], List[Dict]]:
+    distancias = np.asarray(distancias).tolist()
+    n = len(distancias)
+    n_processos = n_processos or os.cpu_count() or 1
+    if limite is None:
+        limite = sum(distancias[i - 1][i] for i in range(1, n)) + (distancias[n - 1][0] if n else 0)
+    tarefas = prefixos(n, tamanho or tamanho_prefixo(n, n_processos)) if n else []
+    melhor = multiprocessing.Value('d', limite)
+    if n_processos == 1 or len(tarefas) <= 1:
+        _iniciar_processo(distancias, melhor)
+        resultados = [_resolver_prefixo(prefixo, limite) for prefixo in tarefas]
+    else:
+        with ProcessPoolExecutor(max_workers=n_processos, initializer=_iniciar_processo, initargs=(distancias, melhor)) as executor:
+            resultados = list(executor.map(_resolver_prefixo, tarefas, itertools.repeat(limite)))
+    menor, rotas = reduzir(resultados)
+    return menor, rotas, resultados
+
+# Programação dinâmica de Held-Karp com máscara de bits, em O(2^n * n^2) tempo e O(2^n * n) memória
+# custo[mascara, j] é o menor caminho que sai de 0, visita o conjunto "mascara" (bit b = cidade b + 1)
+# e termina em j + 1. Cada camada de subconjuntos do mesmo tamanho é calculada de uma vez com NumPy
+def held_karp(distancias) -> Tuple[float, List[List[int]]]:
+    distancias = np.asarray(distancias, dtype=np.float64)
+    n = len(distancias)
+    if n <= 2:
+        return float(distancias[0, -1] + distancias[-1, 0]) if n == 2 else 0.0, [list(range(n))]
+    m = n - 1
+    internas = distancias[1:, 1:]
+    custo = np.full((1 << m, m), np.inf)
+    bits = 1 << np.arange(m)
+    custo[bits, np.arange(m)] = distancias[0, 1:]
+
+    mascaras = np.arange(1 << m)
+    tamanhos = np.zeros(1 << m, dtype=np.int64)
+    for b in range(m):
+        tamanhos += (mascaras >> b) & 1
+    for tamanho in range(2, m + 1):
+        camada = mascaras[tamanhos == tamanho]
+        for k in range(m):
+            destino = camada[(camada & bits[k]) != 0]
+            # Menor custo para chegar em k vindo de algum j do conjunto sem k
+            custo[destino, k] = (custo[destino ^ bits[k]] + internas[:, k][None, :]).min(axis=1)
+
+    cheia = (1 << m) - 1
+    totais = custo[cheia] + distancias[1:, 0]
+    menor = float(totais.min())
+
+    # Reconstrói todas as rotas ótimas voltando pelos predecessores empatados
+    rotas = []
+    def voltar(mascara, k, sufixo):
+        if mascara == bits[k]:
+            rotas.append([0, k + 1] + sufixo)
+            return
+        anterior = mascara ^ bits[k]
+        candidatos = custo[anterior] + internas[:, k]
+        for j in np.flatnonzero(candidatos <= custo[mascara, k] + TOLERANCIA):
+            voltar(anterior, int(j), [k + 1] + sufixo)
+
+    for k in np.flatnonzero(totais <= menor + TOLERANCIA):
+        voltar(cheia, int(k), [])
+    rotas.sort()
+    return menor, rotas
+
+# Custo da árvore geradora mínima (Prim, O(n^2)) sobre as cidades "cidades" da matriz simétrica
+def _arvore_geradora_minima(simetrica: np.ndarray, cidades: np.ndarray) -> float:
+    if len(cidades) <= 1:
+        return 0.0
+    sub = simetrica[np.ix_(cidades, cidades)]
+    na_arvore = np.zeros(len(cidades), dtype=bool)
+    na_arvore[0] = True
+    ligacao = sub[0].copy()
+    total = 0.0
+    for _ in range(len(cidades) - 1):
+        ligacao[na_arvore] = np.inf
+        proxima = int(np.argmin(ligacao))
+        total += ligacao[proxima]
+        na_arvore[proxima] = True
+        ligacao = np.minimum(ligacao, sub[proxima])
+    return total
+
+# Branch-and-bound com limite inferior de 1-árvore
+# Para uma rota parcial 0 ... u, o restante é um caminho de u até 0 passando pelas cidades livres, então
+# custa pelo menos a árvore geradora mínima das cidades livres mais a menor aresta de u até elas e a menor
+# aresta delas até 0 (na raiz é a 1-árvore clássica). Para instâncias assimétricas o limite usa min(d[a, b], d[b, a])
+def branch_and_bound(distancias, limite: float = np.inf) -> Tuple[float, List[List[int]]]:
+    distancias = np.asarray(distancias, dtype=np.float64)
+    n = len(distancias)
+    if n <= 2:
+        return held_karp(distancias)
+    simetrica = np.minimum(distancias, distancias.T)
+    livre = np.ones(n, dtype=bool)
+    livre[0] = False
+    rota = [0]
+    melhor = [limite, []]
+
+    def limite_inferior(custo):
+        cidades = np.flatnonzero(livre)
+        ultima = rota[-1]
+        return custo + _arvore_geradora_minima(simetrica, cidades) \
+            + distancias[ultima, cidades].min() + distancias[cidades, 0].min()
+
+    def ramificar(custo):
+        ultima = rota[-1]
+        if len(rota) == n:
+            total = custo + distancias[ultima, 0]
+            if total < melhor[0] - TOLERANCIA:
+                melhor[0], melhor[1] = total, [list(rota)]
+            elif total <= melhor[0] + TOLERANCIA:
+                melhor[1].append(list(rota))
+            return
+        if limite_inferior(custo) > melhor[0] + TOLERANCIA:
+            return
+        # Visita primeiro as cidades mais próximas, para achar cedo uma rota boa e podar mais
+        cidades = np.flatnonzero(livre)
+        for cidade in cidades[np.argsort(distancias[ultima, cidades], kind='stable')].tolist():
+            livre[cidade] = False
+            rota.append(cidade)
+            ramificar(custo + distancias[ultima, cidade])
+            rota.pop()
+            livre[cidade] = True
+
+    ramificar(0.0)
+    melhor[1].sort()
+    return float(melhor[0]), melhor[1]
+
+# Escolhe o resolvedor exato pelo tamanho da instância
+def resolver_exato(distancias) -> Tuple[float, List[List[int]]]:
+    n = len(distancias)
+    if n <= 9:
+        return forca_bruta(distancias)
+    if n <= 20:
+        return held_karp(distancias)
+    return branch_and_bound(distancias)
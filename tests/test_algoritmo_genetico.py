@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from algoritmo_genetico import avaliar_individuo, avaliar_pop, avaliar_pop_vetorizado, calcular_distancias, evolucao, OpcoesCheckpoint, OpcoesMemoizacao, pop_inicial, retomar_evolucao, selecao_pais, selecao_sobreviventes, sortear_cortes
+from crossover import pmx_lote
+from tsplib import matriz_distancias
+
+COORDENADAS = np.random.default_rng(0).uniform(0, 1000, (25, 2))
+
+# Retomar um checkpoint com a mesma matriz informada em "distancias" reproduz a execução direta
+def test_retomar_com_distancias(tmp_path):
+    # Escala diferente da euclidiana padrão: se a retomada ignorasse "distancias", os filhos teriam custos 10x menores
+    distancias = matriz_distancias(COORDENADAS, None) * 10
+    arquivo = str(tmp_path / 'ga.npz')
+    direta, historico_direto = evolucao(COORDENADAS, 0.01, 30, 40, semente=5, distancias=distancias)
+    evolucao(COORDENADAS, 0.01, 30, 20, semente=5, distancias=distancias, checkpoint=OpcoesCheckpoint(arquivo, 10))
+    retomada, historico = retomar_evolucao(COORDENADAS, arquivo, n_geracoes=40, distancias=distancias)
+    assert np.array_equal(direta, retomada)
+    assert historico == pytest.approx(historico_direto)
+
+# Avaliação em laço, vetorizada e rota a rota dão exatamente o mesmo custo
+def test_avaliacao_vetorizada_igual_laco():
+    distancias = calcular_distancias(COORDENADAS)
+    pop = pop_inicial(40, len(COORDENADAS), np.random.default_rng(1))
+    laco = avaliar_pop(pop, distancias)
+    assert np.array_equal(avaliar_pop_vetorizado(pop, distancias), laco)
+    assert [avaliar_individuo(rota, distancias) for rota in pop] == laco.tolist()
+
+# PMX clássico, um par por vez: o trecho vem do doador e os genes de fora seguem o mapeamento em cadeia
+def pmx_referencia(base, doador, corte_1, corte_2):
+    filho = list(base)
+    filho[corte_1:corte_2 + 1] = doador[corte_1:corte_2 + 1]
+    trecho = {gene: base[k] for k, gene in enumerate(doador) if corte_1 <= k <= corte_2}
+    for k in list(range(corte_1)) + list(range(corte_2 + 1, len(base))):
+        gene = base[k]
+        while gene in trecho:
+            gene = trecho[gene]
+        filho[k] = gene
+    return filho
+
+# O PMX em lote dá os mesmos filhos que o PMX clássico par a par e que o lote de um par só
+@pytest.mark.parametrize('n_genes', [2, 3, 8, 25])
+def test_pmx_lote_igual_par_a_par(n_genes):
+    rng = np.random.default_rng(n_genes)
+    pais_1 = np.array([rng.permutation(n_genes) for _ in range(30)])
+    pais_2 = np.array([rng.permutation(n_genes) for _ in range(30)])
+    cortes_1, cortes_2 = sortear_cortes(30, n_genes, rng)
+    filhos_1, filhos_2 = pmx_lote(pais_1, pais_2, cortes_1, cortes_2)
+    for r in range(30):
+        a, b = int(cortes_1[r]), int(cortes_2[r])
+        assert filhos_1[r].tolist() == pmx_referencia(pais_1[r].tolist(), pais_2[r].tolist(), a, b)
+        assert filhos_2[r].tolist() == pmx_referencia(pais_2[r].tolist(), pais_1[r].tolist(), a, b)
+        sozinho_1, sozinho_2 = pmx_lote(pais_1[r:r + 1], pais_2[r:r + 1], cortes_1[r:r + 1], cortes_2[r:r + 1])
+        assert np.array_equal(sozinho_1[0], filhos_1[r]) and np.array_equal(sozinho_2[0], filhos_2[r])
+
+# Interromper num checkpoint e retomar dá a mesma rota e o mesmo histórico da execução direta,
+# também com memoização e eliminação de duplicatas ligadas
+@pytest.mark.parametrize('opcoes', [{}, {'memoizacao': OpcoesMemoizacao(1000, True)}, {'operador_crossover': 'ox', 'tamanho_torneio': 3}])
+def test_retomar_checkpoint_deterministico(tmp_path, opcoes):
+    arquivo = str(tmp_path / 'ga.npz')
+    direta, historico_direto = evolucao(COORDENADAS, 0.05, 30, 60, semente=3, **opcoes)
+    evolucao(COORDENADAS, 0.05, 30, 30, semente=3, checkpoint=OpcoesCheckpoint(arquivo, 10), **opcoes)
+    retomada, historico = retomar_evolucao(COORDENADAS, arquivo, n_geracoes=60)
+    assert np.array_equal(direta, retomada)
+    assert historico == historico_direto
+
+# Torneio: cada pai é o competidor de menor custo entre os "k" sorteados
+@pytest.mark.parametrize('k', [1, 2, 5])
+def test_selecao_pais_torneio(k):
+    pop = pop_inicial(30, 10, np.random.default_rng(0))
+    fitness = np.random.default_rng(1).permutation(30).astype(float)
+    pais = selecao_pais(pop, fitness, 30, k, np.random.default_rng(2))
+    competidores = np.random.default_rng(2).integers(0, 30, size=(30, k))
+    vencedores = [min(linha, key=lambda i: fitness[i]) for linha in competidores]
+    assert np.array_equal(pais, pop[vencedores])
+
+# Torneio com todos os indivíduos (k grande) escolhe quase sempre o melhor
+def test_selecao_pais_pressao():
+    pop = pop_inicial(20, 8, np.random.default_rng(0))
+    fitness = np.arange(20, dtype=float)
+    pais = selecao_pais(pop, fitness, 200, 60, np.random.default_rng(3))
+    assert (pais == pop[0]).all(axis=1).mean() > 0.9
+
+# (μ + λ): ficam os n_pop melhores entre pais e filhos, cada um com o seu custo
+@pytest.mark.parametrize('n_filhos', [0, 5, 20])
+def test_selecao_sobreviventes(n_filhos):
+    rng = np.random.default_rng(n_filhos)
+    pop, filhos = pop_inicial(20, 12, rng), pop_inicial(n_filhos, 12, rng)
+    distancias = calcular_distancias(COORDENADAS[:12])
+    fitness, fitness_filhos = avaliar_pop_vetorizado(pop, distancias), avaliar_pop_vetorizado(filhos, distancias)
+    sobreviventes, fitness_sobreviventes = selecao_sobreviventes(pop, filhos, fitness, fitness_filhos)
+    assert len(sobreviventes) == 20
+    assert np.sort(fitness_sobreviventes).tolist() == np.sort(np.concatenate((fitness, fitness_filhos)))[:20].tolist()
+    assert np.allclose(avaliar_pop_vetorizado(sobreviventes, distancias), fitness_sobreviventes)
@@ -0,0 +1,44 @@
+import numpy as np
+import pytest
+from autotuning import corrida, friedman, postos, qui_quadrado_sf, sobreviventes
+from benchmark import gerar_uniforme
+
+stats = pytest.importorskip('scipy.stats')
+
+# Estatística e valor-p do teste de Friedman (com empates) iguais aos do SciPy
+@pytest.mark.parametrize('semente', range(5))
+def test_friedman_scipy(semente):
+    rng = np.random.default_rng(semente)
+    custos = rng.integers(0, 6, (8, 4)).astype(float)  # valores pequenos: muitos empates
+    custos[:, 0] += 2  # uma configuração pior
+    estatistica, valor_p, somas = friedman(custos.tolist())
+    esperado = stats.friedmanchisquare(*custos.T)
+    assert estatistica == pytest.approx(esperado.statistic)
+    assert valor_p == pytest.approx(esperado.pvalue)
+    assert somas == pytest.approx(stats.rankdata(custos, axis=1).sum(axis=0))
+
+@pytest.mark.parametrize('graus', [1, 2, 5, 23])
+def test_qui_quadrado_sf(graus):
+    for x in (0.01, 0.5, 3.0, 10.0, 40.0):
+        assert qui_quadrado_sf(x, graus) == pytest.approx(stats.chi2.sf(x, graus), rel=1e-9, abs=1e-15)
+
+def test_postos_empates():
+    assert postos([3.0, 1.0, 3.0, 2.0]) == [3.5, 1.0, 3.5, 2.0]
+
+# Só saem as configurações cuja soma de postos passa da melhor pela diferença crítica
+def test_sobreviventes():
+    assert sobreviventes([10, 11, 12], 10, 0.05) == [0, 1, 2]
+    assert sobreviventes([10, 18, 30], 10, 0.05) == [0, 1]  # diferença crítica ~8,8
+
+# Uma configuração degenerada (população de 2, sem mutação) é eliminada no meio da corrida
+def test_corrida_elimina_configuracao_pior():
+    instancias = [gerar_uniforme(30, semente)._replace(nome='u%d' % semente) for semente in range(3)]
+    configuracoes = [{'taxa_mutacao': 0.05, 'n_pop': 50, 'operador_crossover': 'ox', 'tamanho_torneio': 3},
+                     {'taxa_mutacao': 0.1, 'n_pop': 50, 'operador_crossover': 'ox', 'tamanho_torneio': 3},
+                     {'taxa_mutacao': 0.0, 'n_pop': 2, 'operador_crossover': 'pmx', 'tamanho_torneio': 1}]
+    resultado = corrida('ga', configuracoes, instancias, sementes=(0, 1, 2), orcamento=2000, n_processos=2, min_blocos=3)
+    eliminadas = [j for eliminacao in resultado['eliminacoes'] for j in eliminacao['eliminadas']]
+    assert 2 in eliminadas
+    assert all(eliminacao['valor_p'] < 0.05 for eliminacao in resultado['eliminacoes'])
+    assert resultado['vencedora'] != configuracoes[2]
+    assert configuracoes[2] not in [sobrevivente['configuracao'] for sobrevivente in resultado['sobreviventes']]
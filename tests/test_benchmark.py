@@ -0,0 +1,16 @@
+import pytest
+from benchmark import executar_benchmark, gerar_uniforme
+from tsplib import InstanciaTSP
+
+# As avaliações vêm dos contadores dos resolvedores e os custos seguem o tipo_peso da instância
+def test_benchmark_avaliacoes_e_metrica():
+    base = gerar_uniforme(8)
+    instancia = InstanciaTSP('att8', 8, 'ATT', base.coordenadas)
+    parametros = {'n_pop': 10, 'n_geracoes': 5, 'iteracoes': 5, 'n_particulas': 10}
+    resultados = {linha['resolvedor']: linha for linha in executar_benchmark([instancia], sementes=(0,), parametros=parametros)}
+    # Sem cache de fitness o GA avalia a população inicial e os filhos de cada geração
+    assert resultados['ga']['avaliacoes'] == 10 * (5 + 1)
+    assert 10 <= resultados['pso']['avaliacoes'] <= 10 * (5 + 1)
+    assert 0 < resultados['exato']['avaliacoes'] < 5040
+    assert resultados['ga']['custo'] >= resultados['exato']['custo']
+    assert resultados['exato']['gap'] == pytest.approx(0.0)
@@ -0,0 +1,55 @@
+import numpy as np
+import pytest
+from busca_local import busca_local
+from movimentos import delta_2opt
+from vizinhanca import DistanciasSobDemanda, vizinhos_da_matriz
+
+def custo(rota, distancias):
+    return float(distancias[rota, np.roll(rota, -1)].sum())
+
+def instancia(n, semente):
+    pontos = np.random.default_rng(semente).uniform(0, 1000, (n, 2))
+    distancias = np.sqrt(((pontos[:, None, :] - pontos[None, :, :]) ** 2).sum(axis=2))
+    return pontos, distancias
+
+# Nunca piora a rota, devolve uma permutação válida, informa o delta certo e não altera a rota de entrada
+@pytest.mark.parametrize('n', [5, 6, 12, 60, 200])
+@pytest.mark.parametrize('usar_or_opt', [True, False])
+def test_busca_local_nao_piora(n, usar_or_opt):
+    for semente in range(3):
+        _, distancias = instancia(n, semente)
+        vizinhos, _ = vizinhos_da_matriz(distancias, 8)
+        rota = np.random.default_rng(semente).permutation(n)
+        original = rota.copy()
+        melhorada, delta = busca_local(rota, distancias, vizinhos, usar_or_opt)
+        assert np.array_equal(rota, original)
+        assert sorted(melhorada.tolist()) == list(range(n))
+        assert delta <= 0
+        assert custo(melhorada, distancias) == pytest.approx(custo(rota, distancias) + delta)
+
+# Com listas completas (k = n - 1) o resultado é um ótimo local 2-opt, e uma segunda passada não acha nada
+def test_busca_local_otimo_local():
+    n = 40
+    _, distancias = instancia(n, 7)
+    vizinhos, _ = vizinhos_da_matriz(distancias, n - 1)
+    melhorada, _ = busca_local(np.random.default_rng(7).permutation(n), distancias, vizinhos)
+    for i in range(n):
+        for j in range(i + 2, n):
+            assert delta_2opt(melhorada, i, j, distancias) >= -1e-6
+    _, delta = busca_local(melhorada, distancias, vizinhos)
+    assert delta == 0.0
+
+# Distâncias sob demanda dão o mesmo resultado que a matriz
+def test_busca_local_sob_demanda():
+    pontos, distancias = instancia(80, 3)
+    vizinhos, _ = vizinhos_da_matriz(distancias, 8)
+    rota = np.random.default_rng(3).permutation(80)
+    pela_matriz, _ = busca_local(rota, distancias, vizinhos)
+    sob_demanda, _ = busca_local(rota, DistanciasSobDemanda(pontos), vizinhos)
+    assert np.array_equal(pela_matriz, sob_demanda)
+
+# Rotas com menos de 5 cidades voltam inalteradas
+def test_busca_local_pequena():
+    _, distancias = instancia(4, 0)
+    rota, delta = busca_local([2, 0, 3, 1], distancias, vizinhos_da_matriz(distancias, 3)[0])
+    assert rota.tolist() == [2, 0, 3, 1] and delta == 0.0
@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+from construcao import CONSTRUTORES, arvore_geradora, populacao_semeada, rotas_construidas, vizinho_mais_proximo
+from movimentos import chave_rota, chaves_rotas
+
+# Instâncias uniforme e agrupada (grupos distantes deixam o grafo de candidatos desconexo)
+def instancias(n, semente=0):
+    rng = np.random.default_rng(semente)
+    uniforme = rng.uniform(0, 1000, (n, 2))
+    agrupada = np.concatenate([rng.normal(centro, 5.0, (len(grupo), 2)) for centro, grupo in
+                               zip(((0, 0), (1000, 0), (0, 1000), (1000, 1000)), np.array_split(np.arange(n), 4))])
+    return [uniforme, agrupada]
+
+@pytest.mark.parametrize('metodo', sorted(CONSTRUTORES))
+@pytest.mark.parametrize('n', [1, 2, 3, 5, 40, 200])
+def test_construtores_permutacao(metodo, n):
+    for coordenadas in instancias(n):
+        rota = CONSTRUTORES[metodo](coordenadas)
+        assert sorted(rota.tolist()) == list(range(len(coordenadas)))
+
+# A árvore geradora liga todas as cidades, mesmo com o grafo de candidatos desconexo
+def test_arvore_geradora_conexa():
+    for coordenadas in instancias(200):
+        arvore = arvore_geradora(coordenadas, k=3)
+        n = len(coordenadas)
+        assert len(arvore) == n - 1
+        pai = list(range(n))
+        def raiz(a):
+            while pai[a] != a:
+                a = pai[a]
+            return a
+        for a, b in arvore:
+            pai[raiz(a)] = raiz(b)
+        assert len({raiz(v) for v in range(n)}) == 1
+
+def test_vizinho_mais_proximo_inicio():
+    coordenadas = instancias(30)[0]
+    assert vizinho_mais_proximo(coordenadas, 7)[0] == 7
+
+# Rotas construídas e população semeada: permutações válidas, sem repetição (a menos de rotação / sentido)
+def test_rotas_construidas_e_populacao():
+    coordenadas = instancias(60)[0]
+    rotas = rotas_construidas(coordenadas, 8, np.random.default_rng(0))
+    assert len(rotas) == 8
+    assert len({chave_rota(rota) for rota in rotas}) == 8
+    pop = populacao_semeada(coordenadas, 30, 0.5, np.random.default_rng(0))
+    assert all(sorted(rota) == list(range(60)) for rota in pop.tolist())
+    assert len(set(chaves_rotas(pop))) == 30
+
+# A chave canônica é a mesma para todas as rotações e para o sentido inverso, e muda para outra rota
+@pytest.mark.parametrize('n', [1, 2, 3, 4, 9])
+def test_chave_rota_invariante(n):
+    rota = np.random.default_rng(n).permutation(n)
+    variantes = [np.roll(rota, d) for d in range(n)] + [np.roll(rota[::-1], d) for d in range(n)]
+    chave = chave_rota(rota)
+    assert all(chave_rota(variante) == chave for variante in variantes)
+    assert chaves_rotas(np.array(variantes)) == [chave] * len(variantes)
+    if n > 3:
+        outra = rota.copy()
+        outra[[0, 1]] = outra[[1, 0]]
+        assert chave_rota(outra) != chave
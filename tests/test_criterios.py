@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+from algoritmo_genetico import evolucao
+from criterios import CriterioParada
+from enxame_de_particulas import Grafo, PSO
+
+COORDENADAS = np.random.default_rng(0).uniform(0, 1000, (20, 2))
+ROTA = np.arange(3)
+
+def test_sem_criterios():
+    criterio = CriterioParada()
+    assert not criterio.ativo()
+    assert not any(criterio.atualizar(i, ROTA, 10.0) for i in range(100))
+
+# A estagnação conta as iterações seguidas sem melhoria e volta a zero quando melhora
+def test_estagnacao():
+    criterio = CriterioParada(limite_estagnacao=3)
+    assert [criterio.atualizar(i, ROTA, custo) for i, custo in enumerate([10, 10, 9, 9, 9, 9])] == [False, False, False, False, False, True]
+    assert criterio.motivo == 'estagnacao'
+
+def test_custo_alvo_e_tempo():
+    criterio = CriterioParada(custo_alvo=5.0)
+    assert not criterio.atualizar(0, ROTA, 6.0)
+    assert criterio.atualizar(1, ROTA, 5.0) and criterio.motivo == 'custo_alvo'
+    criterio = CriterioParada(tempo_limite=0.0)
+    assert criterio.atualizar(0, ROTA, 1.0) and criterio.motivo == 'tempo_limite'
+
+# O callback é chamado em toda iteração e tem prioridade sobre os outros critérios
+def test_callback():
+    vistos = []
+
+    def callback(iteracao, rota, custo):
+        vistos.append(iteracao)
+        return iteracao == 2
+    criterio = CriterioParada(custo_alvo=0.0, callback=callback)
+    assert [criterio.atualizar(i, ROTA, 1.0) for i in range(3)] == [False, False, True]
+    assert vistos == [0, 1, 2] and criterio.motivo == 'callback'
+
+# GA: o callback recebe a melhor rota de cada geração, pode parar a execução e a rota devolvida é a melhor vista
+def test_ga_para_no_callback():
+    vistos = []
+
+    def callback(geracao, rota, custo):
+        vistos.append((geracao, custo, rota.copy()))
+        return geracao == 4
+    rota, historico = evolucao(COORDENADAS, 0.05, 20, 100, semente=0, callback=callback)
+    assert [geracao for geracao, _, _ in vistos] == list(range(5))
+    assert len(historico) == 5
+    assert np.array_equal(rota, min(vistos, key=lambda visto: visto[1])[2])
+
+@pytest.mark.parametrize('criterios, maximo', [({'tempo_limite': 0.0}, 1), ({'custo_alvo': 1e12}, 1), ({'limite_estagnacao': 2}, 100)])
+def test_ga_parada_antecipada(criterios, maximo):
+    _, historico = evolucao(COORDENADAS, 0.0, 4, 100, semente=0, **criterios)
+    assert 1 <= len(historico) <= maximo
+    if 'limite_estagnacao' in criterios:
+        # Para logo depois de duas gerações seguidas sem melhoria
+        assert len(historico) < 100 and historico[-1] == historico[-2] == historico[-3]
+
+def test_pso_parada_antecipada():
+    grafo = Grafo.deCoordenadas(COORDENADAS)
+    for criterios, motivo in (({'tempo_limite': 0.0}, 'tempo_limite'), ({'custo_alvo': 1e12}, 'custo_alvo'),
+                              ({'callback': lambda iteracao, rota, custo: iteracao == 3}, 'callback')):
+        pso = PSO(grafo, 50, 10, semente=0)
+        pso.executar(**criterios)
+        assert pso.criterio.motivo == motivo
+        assert pso.getGBest().getCustoPBest() == pso.custos_pbest.min()
@@ -0,0 +1,50 @@
+import numpy as np
+import pytest
+from enxame_de_particulas import Grafo, GrafoCandidatos, PSO
+
+COORDENADAS = np.random.default_rng(3).uniform(0, 1000, (40, 2))
+
+# O PSO chega às mesmas posições aplicando as trocas pelo delta ou reavaliando, e os custos batem com o recálculo
+def test_pso_delta_igual_reavaliacao():
+    resultados = []
+    for elementos in (0, 10 ** 12):
+        pso = PSO(Grafo.deCoordenadas(COORDENADAS), 30, 20, 0.3, 0.5, semente=0)
+        pso.ELEMENTOS_POR_PASSO = elementos
+        pso.executar()
+        assert np.array_equal(pso.custos, pso.custosCaminhos(pso.posicoes))
+        assert np.array_equal(pso.custos_pbest, pso.custosCaminhos(pso.pbests))
+        resultados.append(pso.posicoes.copy())
+    assert np.array_equal(resultados[0], resultados[1])
+
+# A velocidade gravada numa partícula do enxame vai para os arrays de trocas e volta igual
+def test_velocidade_particula_enxame():
+    coordenadas = np.random.default_rng(4).uniform(0, 100, (12, 2))
+    pso = PSO(Grafo.deCoordenadas(coordenadas), 5, 6, 0.3, 0.5, semente=0)
+    pso.executar()
+    particula = pso.particulas[2]
+    velocidade = particula.getVelocidade()
+    particula.setVelocidade(velocidade[::-1])
+    assert particula.getVelocidade() == velocidade
+    with pytest.raises(ValueError):
+        particula.setVelocidade([(0, 1, 0.9)])
+    particula.limparVelocidade()
+    assert particula.getVelocidade() == []
+    assert (pso.trocas_pbest[2] == -1).all() and (pso.trocas_gbest[2] == -1).all()
+    with pytest.raises(AttributeError):
+        particula.outro_atributo = 1
+
+# Parar num checkpoint e continuar com PSO.deCheckpoint dá o mesmo enxame da execução direta
+@pytest.mark.parametrize('criar_grafo', [Grafo.deCoordenadas, GrafoCandidatos])
+def test_retomar_checkpoint_deterministico(tmp_path, criar_grafo):
+    grafo = criar_grafo(COORDENADAS)
+    arquivo = str(tmp_path / 'pso.npz')
+    direta = PSO(grafo, 30, 20, 0.3, 0.5, semente=7)
+    direta.executar()
+    interrompida = PSO(grafo, 30, 20, 0.3, 0.5, semente=7)
+    interrompida.executar(arquivo_checkpoint=arquivo, intervalo_checkpoint=15, callback=lambda iteracao, rota, custo: iteracao == 14)
+    assert interrompida.criterio.motivo == 'callback'
+    retomada = PSO.deCheckpoint(grafo, arquivo)
+    retomada.executar()
+    for nome in ('posicoes', 'pbests', 'custos', 'custos_pbest'):
+        assert np.array_equal(getattr(retomada, nome), getattr(direta, nome))
+    assert retomada.getGBest().getPBest() == direta.getGBest().getPBest()
@@ -0,0 +1,39 @@
+import os, subprocess, sys
+import pytest
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Roda "codigo" num interpretador novo, sem display, e devolve a saída padrão
+def rodar_sem_display(codigo):
+    ambiente = {chave: valor for chave, valor in os.environ.items() if chave not in ('DISPLAY', 'MPLBACKEND', 'WAYLAND_DISPLAY')}
+    resultado = subprocess.run([sys.executable, '-c', codigo], cwd=RAIZ, env=ambiente, capture_output=True, text=True, timeout=120)
+    assert resultado.returncode == 0, resultado.stderr
+    return resultado.stdout
+
+# Importar os resolvedores como biblioteca não carrega matplotlib nem seaborn
+def test_importar_resolvedores_sem_matplotlib():
+    saida = rodar_sem_display(
+        'import sys\n'
+        'import algoritmo_genetico, enxame_de_particulas, solucao_exata, servico, benchmark, autotuning, reotimizacao, graficos\n'
+        "print(sorted(m for m in ('matplotlib', 'seaborn') if m in sys.modules))\n")
+    assert saida.strip() == '[]'
+
+# salvar_grafico grava o arquivo sem display e sem passar pelo pyplot; seaborn só entra com "boxplot"
+def test_salvar_grafico_sem_display(tmp_path):
+    pytest.importorskip('matplotlib')
+    saida = rodar_sem_display(
+        'import sys\n'
+        'from graficos import salvar_grafico\n'
+        f"salvar_grafico([3, 2, 1], {str(tmp_path / 'lista.png')!r}, 'titulo', 'x', 'y')\n"
+        f"salvar_grafico({{'a': [1, 2], 'b': [2, 1]}}, {str(tmp_path / 'dict.png')!r}, eixo_x=[10, 20])\n"
+        "print('matplotlib.pyplot' in sys.modules, 'seaborn' in sys.modules)\n")
+    assert saida.strip() == 'False False'
+    for nome in ('lista.png', 'dict.png'):
+        assert (tmp_path / nome).stat().st_size > 0
+
+# Boxplot com seaborn também é gravado sem display
+def test_salvar_boxplot_sem_display(tmp_path):
+    pytest.importorskip('seaborn')
+    arquivo = str(tmp_path / 'boxplot.png')
+    rodar_sem_display(f"from graficos import salvar_grafico\nsalvar_grafico([[1, 2, 3], [2, 3, 4]], {arquivo!r}, boxplot=True)\n")
+    assert os.path.getsize(arquivo) > 0
@@ -0,0 +1,17 @@
+import numpy as np
+import pytest
+from ilhas import evolucao_ilhas
+
+COORDENADAS = np.random.default_rng(0).uniform(0, 100, (15, 2))
+
+# Um erro dentro das ilhas chega ao chamador como está (a memória compartilhada é liberada sem BufferError)
+def test_erro_libera_memoria_compartilhada():
+    with pytest.raises(ValueError):
+        evolucao_ilhas(COORDENADAS, 0.01, 10, 5, n_ilhas=2, operador_crossover='xyz')
+
+# Mesma semente, mesmo resultado
+def test_ilhas_reprodutivel():
+    rota, historicos = evolucao_ilhas(COORDENADAS, 0.01, 10, 6, n_ilhas=2, intervalo_migracao=3, semente=1)
+    rota_2, historicos_2 = evolucao_ilhas(COORDENADAS, 0.01, 10, 6, n_ilhas=2, intervalo_migracao=3, semente=1)
+    assert sorted(rota) == list(range(15))
+    assert np.array_equal(rota, rota_2) and historicos == historicos_2
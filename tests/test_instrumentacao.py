@@ -0,0 +1,67 @@
+import tracemalloc
+import numpy as np
+import pytest
+import algoritmo_genetico
+from algoritmo_genetico import OpcoesMemoizacao, evolucao
+from enxame_de_particulas import Grafo, PSO
+from instrumentacao import Estatisticas
+
+COORDENADAS = np.random.default_rng(0).uniform(0, 1000, (25, 2))
+
+# Conta as rotas que passam de fato pela avaliação de fitness
+@pytest.fixture
+def avaliadas(monkeypatch):
+    contagem = [0]
+    original = algoritmo_genetico.avaliar_pop_vetorizado
+
+    def contar(pop, distancias):
+        contagem[0] += len(pop)
+        return original(pop, distancias)
+    monkeypatch.setattr(algoritmo_genetico, 'avaliar_pop_vetorizado', contar)
+    return contagem
+
+# O contador de avaliações do GA bate com as rotas avaliadas, com e sem cache de fitness
+@pytest.mark.parametrize('memoizacao', [None, OpcoesMemoizacao(1000, True)])
+def test_contador_avaliacoes_ga(avaliadas, memoizacao):
+    estatisticas = Estatisticas()
+    evolucao(COORDENADAS, 0.05, 20, 15, semente=1, estatisticas=estatisticas, memoizacao=memoizacao)
+    assert estatisticas.contadores['avaliacoes'] == avaliadas[0]
+    assert estatisticas.contadores['geracoes'] == 15
+
+# Ligar a instrumentação não muda nenhum resultado (mesmas sementes, mesmos números)
+def test_ga_identico_com_e_sem_estatisticas():
+    sem = evolucao(COORDENADAS, 0.05, 20, 15, semente=3, memoizacao=OpcoesMemoizacao(1000, True))
+    com = evolucao(COORDENADAS, 0.05, 20, 15, semente=3, memoizacao=OpcoesMemoizacao(1000, True), estatisticas=Estatisticas())
+    assert np.array_equal(sem[0], com[0])
+    assert sem[1] == com[1]
+
+def test_pso_identico_com_e_sem_estatisticas():
+    grafo = Grafo.deCoordenadas(COORDENADAS)
+    sem = PSO(grafo, 20, 30, beta=0.3, alfa=0.5, semente=4)
+    sem.executar()
+    com = PSO(grafo, 20, 30, beta=0.3, alfa=0.5, semente=4)
+    estatisticas = Estatisticas()
+    com.executar(estatisticas=estatisticas)
+    assert np.array_equal(sem.pbests, com.pbests)
+    assert np.array_equal(sem.custos_pbest, com.custos_pbest)
+    assert estatisticas.contadores['iteracoes'] == 20
+    assert 0 < estatisticas.contadores['avaliacoes'] <= 20 * 30
+
+# Uma exceção antes do laço (GA: matriz menor que a instância) ou dentro dele (PSO: callback)
+# ainda fecha o tempo total e o tracemalloc
+def test_finalizar_com_excecao():
+    def falhar(iteracao, rota, custo):
+        if iteracao == 2:
+            raise RuntimeError('parar')
+
+    estatisticas = Estatisticas(memoria=True)
+    with pytest.raises(IndexError):
+        evolucao(COORDENADAS, 0.05, 20, 10, semente=0, estatisticas=estatisticas, distancias=np.zeros((3, 3)))
+    assert estatisticas.tempo_total > 0 and estatisticas.pico_memoria_mb is not None
+    assert not tracemalloc.is_tracing()
+
+    estatisticas = Estatisticas(memoria=True)
+    with pytest.raises(RuntimeError):
+        PSO(Grafo.deCoordenadas(COORDENADAS), 10, 20, semente=0).executar(callback=falhar, estatisticas=estatisticas)
+    assert estatisticas.tempo_total > 0 and estatisticas.pico_memoria_mb is not None
+    assert not tracemalloc.is_tracing()
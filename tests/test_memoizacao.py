@@ -0,0 +1,93 @@
+import numpy as np
+import pytest
+from algoritmo_genetico import OpcoesMemoizacao, avaliar_pop_vetorizado, evolucao, executar_geracoes, pop_inicial
+from instrumentacao import Estatisticas
+from memoizacao import CacheFitness, diversidade, novas_rotas
+from movimentos import chaves_rotas
+from tsplib import matriz_distancias
+
+COORDENADAS = np.random.default_rng(0).uniform(0, 1000, (10, 2))
+# Distâncias inteiras (EUC_2D): o custo pelo delta da mutação e o recalculado do zero são exatamente iguais
+DISTANCIAS = matriz_distancias(COORDENADAS, 'EUC_2D')
+
+# Avaliação que registra quantas rotas recebeu
+class AvaliacaoContada:
+
+    def __init__(self):
+        self.rotas = 0
+
+    def __call__(self, pop, distancias):
+        self.rotas += len(pop)
+        return avaliar_pop_vetorizado(pop, distancias)
+
+# Só as rotas fora do cache são avaliadas, uma vez cada, mesmo repetidas no lote ou giradas / invertidas
+def test_cache_acertos_e_faltas():
+    cache, avaliar = CacheFitness(), AvaliacaoContada()
+    rota = np.arange(10)
+    lote = np.array([rota, np.roll(rota, 3), rota[::-1], np.random.default_rng(1).permutation(10)])
+    fitness = cache.avaliar(lote, DISTANCIAS, avaliar)
+    assert np.array_equal(fitness, avaliar_pop_vetorizado(lote, DISTANCIAS))
+    assert (avaliar.rotas, cache.faltas, cache.acertos, len(cache)) == (2, 2, 2, 2)
+    assert np.array_equal(cache.avaliar(lote[:2], DISTANCIAS, avaliar), fitness[:2])
+    assert (avaliar.rotas, cache.faltas, cache.acertos) == (2, 2, 4)
+
+# LRU: passando da capacidade sai a rota usada há mais tempo, e uma consulta renova a rota consultada
+def test_cache_remove_menos_recente():
+    cache, avaliar = CacheFitness(capacidade=2), AvaliacaoContada()
+    a, b, c = (np.random.default_rng(s).permutation(10)[None, :] for s in range(3))
+    cache.avaliar(a, DISTANCIAS, avaliar)
+    cache.avaliar(b, DISTANCIAS, avaliar)
+    cache.avaliar(a, DISTANCIAS, avaliar)
+    cache.avaliar(c, DISTANCIAS, avaliar)
+    assert len(cache) == 2 and avaliar.rotas == 3
+    cache.avaliar(a, DISTANCIAS, avaliar)
+    assert avaliar.rotas == 3
+    cache.avaliar(b, DISTANCIAS, avaliar)
+    assert avaliar.rotas == 4
+
+# guardar substitui o custo de uma rota já no cache e respeita a capacidade
+def test_cache_guardar():
+    cache = CacheFitness(capacidade=3)
+    pop = pop_inicial(5, 10, np.random.default_rng(2))
+    chaves = chaves_rotas(pop)
+    cache.guardar(chaves, np.arange(5.0))
+    assert len(cache) == 3 and list(cache.valores.values()) == [2.0, 3.0, 4.0]
+    cache.guardar(chaves[2:3], np.array([9.0]))
+    assert cache.avaliar(pop[2:3], DISTANCIAS, AvaliacaoContada()).tolist() == [9.0]
+
+# Filhos repetidos entre si ou iguais a uma rota da população ficam de fora; a primeira ocorrência fica
+def test_novas_rotas():
+    rota = np.arange(10)
+    filhos = np.array([rota, np.roll(rota, 2), np.random.default_rng(3).permutation(10), rota[::-1], np.random.default_rng(4).permutation(10)])
+    chaves = chaves_rotas(filhos)
+    assert novas_rotas(chaves, set()).tolist() == [0, 2, 4]
+    assert novas_rotas(chaves, {chaves[4]}).tolist() == [0, 2]
+    assert novas_rotas([], set()).tolist() == []
+
+# Diversidade: 1 / n_pop de arestas distintas quando todas as rotas são iguais
+def test_diversidade():
+    rota = np.arange(10)
+    assert diversidade(np.array([rota, np.roll(rota, 4), rota[::-1]])) == (pytest.approx(1 / 3), pytest.approx(1 / 3))
+    pop = pop_inicial(4, 10, np.random.default_rng(5))
+    assert diversidade(pop)[0] == 1.0
+
+# Com mutação e busca local mudando rotas já avaliadas, o custo guardado no cache continua o da rota:
+# a execução com cache é idêntica à sem cache e o fitness final é o recalculado do zero
+@pytest.mark.parametrize('memetico', [False, True])
+def test_cache_coerente_apos_mutacao_e_busca_local(memetico):
+    direta, historico_direto = evolucao(COORDENADAS, 0.3, 20, 40, memetico=memetico, semente=6, distancias=DISTANCIAS)
+    estatisticas = Estatisticas()
+    memoizada, historico = evolucao(COORDENADAS, 0.3, 20, 40, memetico=memetico, semente=6, distancias=DISTANCIAS,
+                                    memoizacao=OpcoesMemoizacao(1000), estatisticas=estatisticas)
+    assert np.array_equal(direta, memoizada)
+    assert historico == historico_direto
+    assert estatisticas.contadores['acertos_cache'] > 0
+
+# Com eliminação de duplicatas, a população final não tem rotas repetidas e cada custo é o da sua rota
+def test_executar_geracoes_sem_duplicatas():
+    rng = np.random.default_rng(7)
+    pop = pop_inicial(20, 10, rng)
+    pop, fitness, _ = executar_geracoes(pop, avaliar_pop_vetorizado(pop, DISTANCIAS), DISTANCIAS, 0.3, 30, rng=rng,
+                                        memoizacao=OpcoesMemoizacao(50, True))
+    assert len(set(chaves_rotas(pop))) == len(pop)
+    assert np.array_equal(fitness, avaliar_pop_vetorizado(pop, DISTANCIAS))
@@ -0,0 +1,65 @@
+import numpy as np
+import pytest
+from movimentos import aplicar_2opt, aplicar_or_opt, delta_2opt, delta_or_opt, delta_troca, delta_troca_lote
+
+# Custo do ciclo completo (recalculado do zero)
+def custo(rota, distancias):
+    return float(distancias[rota, np.roll(rota, -1)].sum())
+
+# Matriz simétrica de distâncias euclidianas e uma assimétrica, com diagonal nula
+def matrizes(n, semente=0):
+    rng = np.random.default_rng(semente)
+    pontos = rng.uniform(0, 100, (n, 2))
+    simetrica = np.sqrt(((pontos[:, None, :] - pontos[None, :, :]) ** 2).sum(axis=2))
+    assimetrica = rng.uniform(1, 100, (n, n))
+    np.fill_diagonal(assimetrica, 0)
+    return simetrica, assimetrica
+
+# Cada troca de posições (inclusive vizinhas e a primeira com a última) bate com o recálculo completo
+@pytest.mark.parametrize('n', [3, 4, 5, 9])
+def test_delta_troca(n):
+    for distancias in matrizes(n):
+        rota = np.random.default_rng(n).permutation(n)
+        for i in range(n):
+            for j in range(n):
+                nova = rota.copy()
+                nova[i], nova[j] = nova[j], nova[i]
+                assert delta_troca(rota, i, j, distancias) == pytest.approx(custo(nova, distancias) - custo(rota, distancias))
+
+# A versão em lote devolve o mesmo que delta_troca rota por rota
+@pytest.mark.parametrize('n', [1, 2, 3, 4, 5, 9, 30])
+def test_delta_troca_lote(n):
+    rng = np.random.default_rng(n)
+    for distancias in matrizes(n):
+        rotas = np.array([rng.permutation(n) for _ in range(50)])
+        i = rng.integers(0, n, 50)
+        j = rng.integers(0, n, 50)
+        esperado = [delta_troca(rota, a, b, distancias) if n >= 3 else 0 for rota, a, b in zip(rotas, i, j)]
+        assert np.allclose(delta_troca_lote(rotas, i, j, distancias), esperado)
+        assert np.allclose(delta_troca_lote(rotas, 1 % n, j, distancias), [delta_troca(rota, 1 % n, b, distancias) if n >= 3 else 0 for rota, b in zip(rotas, j)])
+
+# 2-opt (instância simétrica): delta igual à diferença de custo após aplicar o movimento
+def test_delta_2opt():
+    distancias, _ = matrizes(10)
+    rota = np.random.default_rng(1).permutation(10)
+    for i in range(10):
+        for j in range(10):
+            nova = rota.copy()
+            aplicar_2opt(nova, i, j)
+            assert delta_2opt(rota, i, j, distancias) == pytest.approx(custo(nova, distancias) - custo(rota, distancias))
+
+# Or-opt, com e sem inversão do trecho, nas duas matrizes
+def test_delta_or_opt():
+    n = 10
+    rota = np.random.default_rng(2).permutation(n)
+    for distancias, inverter in zip(matrizes(n), ((False, True), (False,))):
+        for tamanho in (1, 2, 3):
+            for i in range(n - tamanho + 1):
+                for p in range(n):
+                    if i <= p <= i + tamanho - 1:
+                        continue
+                    for invertido in inverter:
+                        nova = aplicar_or_opt(rota, i, tamanho, p, invertido)
+                        assert sorted(nova) == list(range(n))
+                        esperado = custo(nova, distancias) - custo(rota, distancias)
+                        assert delta_or_opt(rota, i, tamanho, p, distancias, invertido) == pytest.approx(esperado)
@@ -0,0 +1,98 @@
+import numpy as np
+import pytest
+from reotimizacao import Replanejamento, aplicar_alteracao, atualizar_matriz, atualizar_vizinhos, inserir_mais_barato, reparar_rotas, remover_das_rotas
+from tsplib import matriz_distancias
+from vizinhanca import vizinhos_mais_proximos
+
+COORDENADAS = np.random.default_rng(0).uniform(0, 1000, (40, 2))
+INSERIDOS = np.random.default_rng(1).uniform(0, 1000, (5, 2))
+REMOVIDOS = [0, 7, 8, 21, 39]
+
+# Os pontos que ficam mantêm a ordem relativa, os inseridos vão para o final e os removidos viram -1 no mapa
+def test_aplicar_alteracao():
+    novas, mapa = aplicar_alteracao(COORDENADAS, REMOVIDOS, INSERIDOS)
+    ficam = [i for i in range(40) if i not in REMOVIDOS]
+    assert np.array_equal(novas, np.concatenate((COORDENADAS[ficam], INSERIDOS)))
+    assert mapa[REMOVIDOS].tolist() == [-1] * 5
+    assert mapa[ficam].tolist() == list(range(35))
+
+# Índices fora do intervalo e alterações que deixam menos de 3 pontos são rejeitados
+def test_aplicar_alteracao_invalida():
+    with pytest.raises(ValueError):
+        aplicar_alteracao(COORDENADAS[:5], [5])
+    with pytest.raises(ValueError):
+        aplicar_alteracao(COORDENADAS[:4], [0, 1])
+
+# A matriz atualizada é igual à recalculada do zero, inclusive a diagonal dos inseridos em GEO
+@pytest.mark.parametrize('tipo_peso', [None, 'EUC_2D', 'GEO'])
+def test_atualizar_matriz_igual_recalculada(tipo_peso):
+    coordenadas = np.column_stack((COORDENADAS[:, 0] / 12 - 40, COORDENADAS[:, 1] / 6 - 80)) if tipo_peso == 'GEO' else COORDENADAS
+    inseridos = INSERIDOS / 12 if tipo_peso == 'GEO' else INSERIDOS
+    for removidos, novos in ((REMOVIDOS, inseridos), ([], inseridos), (REMOVIDOS, np.empty((0, 2)))):
+        novas, mapa = aplicar_alteracao(coordenadas, removidos, novos)
+        atualizada = atualizar_matriz(matriz_distancias(coordenadas, tipo_peso), novas, mapa, tipo_peso)
+        assert np.array_equal(atualizada, matriz_distancias(novas, tipo_peso))
+
+# As listas de vizinhos atualizadas são iguais às calculadas do zero pela grade
+@pytest.mark.parametrize('k', [1, 5, 10])
+def test_atualizar_vizinhos_igual_recalculado(k):
+    vizinhos, _ = vizinhos_mais_proximos(COORDENADAS, k)
+    novas, mapa = aplicar_alteracao(COORDENADAS, REMOVIDOS, INSERIDOS)
+    atualizados, custos = atualizar_vizinhos(vizinhos, novas, mapa, 'EUC_2D')
+    esperados, custos_esperados = vizinhos_mais_proximos(novas, k, 'EUC_2D')
+    assert np.array_equal(atualizados, esperados)
+    assert np.array_equal(custos, custos_esperados)
+
+# Tirar os removidos preserva a ordem das demais cidades, já renumeradas
+def test_remover_das_rotas():
+    _, mapa = aplicar_alteracao(np.zeros((6, 2)), [1, 4])
+    assert remover_das_rotas(np.array([5, 4, 3, 2, 1, 0]), mapa).tolist() == [3, 2, 1, 0]
+    assert remover_das_rotas(np.array([[0, 1, 2, 3, 4, 5], [4, 2, 0, 1, 5, 3]]), mapa).tolist() == [[0, 1, 2, 3], [1, 0, 3, 2]]
+
+# A cidade entra na posição de menor acréscimo, a mesma de uma busca exaustiva
+def test_inserir_mais_barato():
+    distancias = matriz_distancias(COORDENADAS[:9], None)
+    rotas = np.array([np.random.default_rng(s).permutation(8) for s in range(6)])
+    inseridas = inserir_mais_barato(rotas, [8], distancias)
+    for rota, inserida in zip(rotas, inseridas):
+        candidatas = [np.insert(rota, p, 8) for p in range(1, 9)]
+        melhor = min(float(np.sum(distancias[c, np.roll(c, -1)])) for c in candidatas)
+        assert np.sum(distancias[inserida, np.roll(inserida, -1)]) == pytest.approx(melhor)
+
+# Rotas reparadas são permutações da nova instância, uma rota ou uma população
+def test_reparar_rotas_permutacao():
+    novas, mapa = aplicar_alteracao(COORDENADAS, REMOVIDOS, INSERIDOS)
+    distancias = matriz_distancias(novas, None)
+    pop = np.array([np.random.default_rng(s).permutation(40) for s in range(4)])
+    reparadas = reparar_rotas(pop, mapa, distancias)
+    assert reparadas.shape == (4, 40)
+    assert all(sorted(rota) == list(range(40)) for rota in reparadas)
+    assert np.array_equal(reparar_rotas(pop[0], mapa, distancias), reparadas[0])
+
+# Depois de alterar, as estruturas do replanejamento são as da nova instância e a melhor rota continua válida
+@pytest.mark.parametrize('matriz', [True, False])
+def test_replanejamento_alterar(matriz):
+    plano = Replanejamento(COORDENADAS, 'EUC_2D', k_vizinhos=6, matriz=matriz, melhor_rota=np.arange(40))
+    plano.alterar(REMOVIDOS, INSERIDOS)
+    novas = np.concatenate((np.delete(COORDENADAS, REMOVIDOS, axis=0), INSERIDOS))
+    esperada = matriz_distancias(novas, 'EUC_2D')
+    todos = np.arange(40)
+    assert np.array_equal(plano.distancias[todos[:, None], todos[None, :]], esperada)
+    assert np.array_equal(plano.vizinhos, vizinhos_mais_proximos(novas, 6, 'EUC_2D')[0])
+    assert sorted(plano.melhor_rota) == list(range(40))
+    assert plano.custo(plano.melhor_rota) == pytest.approx(float(np.sum(esperada[plano.melhor_rota, np.roll(plano.melhor_rota, -1)])))
+
+# A reotimização a quente nunca piora a rota reparada (a melhor rota entra na população inicial)
+def test_otimizar_a_quente_nao_piora():
+    plano = Replanejamento(COORDENADAS, 'EUC_2D', k_vizinhos=6)
+    rota, _ = plano.otimizar_ga(0.05, 30, 40, memetico=True, semente=2)
+    plano.alterar(REMOVIDOS, INSERIDOS)
+    reparada = plano.custo(plano.melhor_rota)
+    rota, historico = plano.otimizar_ga(0.05, 30, 20, semente=3)
+    assert plano.custo(rota) <= reparada and historico[-1] == pytest.approx(plano.custo(rota))
+    assert len(plano.populacao) == 30
+    plano.alterar([0], INSERIDOS[:1] + 1)
+    reparada = plano.custo(plano.melhor_rota)
+    rota = plano.otimizar_pso(20, 30, semente=4)
+    assert sorted(rota) == list(range(40)) and plano.custo(rota) <= reparada
+
@@ -0,0 +1,78 @@
+import asyncio
+import numpy as np
+import pytest
+from multiprocessing import shared_memory
+from servico import CacheLRU, ClienteSolver, ServicoSolver, validar_parametros
+from tsplib import matriz_distancias
+
+# Só os nomes da lista do resolvedor, com valores dentro da faixa, passam
+@pytest.mark.parametrize('resolvedor, parametros', [
+    ('ga', {'arquivo_checkpoint': '/tmp/x'}),
+    ('ga', {'callback': None}),
+    ('ga', {'estatisticas': None}),
+    ('ga', {'n_pop': 10 ** 9}),
+    ('ga', {'n_pop': 21}),
+    ('ga', {'n_geracoes': True}),
+    ('ga', {'taxa_mutacao': '0.1'}),
+    ('ga', {'operador_crossover': 'xyz'}),
+    ('pso', {'n_pop': 10}),
+    ('pso', {'melhoria_local': 'todas'}),
+    ('pso', [1, 2]),
+])
+def test_parametros_rejeitados(resolvedor, parametros):
+    with pytest.raises(ValueError):
+        validar_parametros(resolvedor, parametros)
+
+def test_parametros_aceitos():
+    assert validar_parametros('ga', None) == {}
+    assert validar_parametros('ga', {'taxa_mutacao': 0, 'n_pop': 20, 'k_vizinhos': None}) == {'taxa_mutacao': 0, 'n_pop': 20, 'k_vizinhos': None}
+    assert validar_parametros('pso', {'alfa': 1, 'melhoria_local': None, 'tempo_limite': 2.5})
+
+# O cache descarta o menos usado e avisa "ao_remover"
+def test_cache_lru_remocao():
+    removidos = []
+    cache = CacheLRU(2, removidos.append)
+    cache.obter('a', lambda: 1)
+    cache.obter('b', lambda: 2)
+    cache.obter('a', lambda: None)
+    cache.obter('c', lambda: 3)
+    assert removidos == [2]
+    assert list(cache.itens) == ['a', 'c']
+    assert (cache.acertos, cache.faltas) == (1, 3)
+
+# Pedidos simultâneos da mesma instância formam um lote (preparado uma vez, uma tarefa por pedido),
+# o custo segue o tipo_peso e parâmetros não permitidos são respondidos com erro
+def test_servico_ida_e_volta():
+    coordenadas = np.random.default_rng(0).uniform(0, 1000, (20, 2))
+    distancias = matriz_distancias(coordenadas, 'ATT')
+    pedidos = [('ga', {'n_pop': 20, 'n_geracoes': 20}), ('ga', {'n_pop': 20, 'n_geracoes': 5, 'memetico': True}),
+               ('ga', {'n_pop': 20, 'n_geracoes': 20, 'k_vizinhos': 5}), ('pso', {'iteracoes': 10, 'tamanho_populacao': 20}),
+               ('pso', {'iteracoes': 10, 'tamanho_populacao': 20, 'k_vizinhos': 5, 'melhoria_local': 'gbest'})]
+
+    async def executar():
+        servico = ServicoSolver(2, janela_lote=0.05)
+        porta = await servico.iniciar(porta=0)
+        try:
+            async with ClienteSolver(porta=porta) as cliente:
+                respostas = await asyncio.gather(*[cliente.resolver(coordenadas, resolvedor=resolvedor, parametros=parametros, semente=i,
+                                                                    tipo_peso='ATT', intervalo_parcial=None)
+                                                   for i, (resolvedor, parametros) in enumerate(pedidos)])
+                with pytest.raises(ValueError):
+                    await cliente.resolver(coordenadas, parametros={'arquivo_checkpoint': 'x.npz'})
+            preparada, = servico.preparadas.itens.values()
+            blocos = {nome: descritor[0] for nome, descritor in preparada.descritores.items()}
+            return respostas, servico.lotes_despachados, servico.tarefas_despachadas, blocos
+        finally:
+            await servico.encerrar()
+
+    respostas, lotes, tarefas, blocos = asyncio.run(executar())
+    assert (lotes, tarefas) == (1, len(pedidos))
+    assert set(blocos) == {'matriz', 'vizinhos_matriz', 'vizinhos_5'}
+    for resposta in respostas:
+        rota = np.array(resposta['rota'])
+        assert sorted(rota) == list(range(20))
+        assert resposta['custo'] == pytest.approx(distancias[rota, np.roll(rota, -1)].sum())
+    # encerrar() remove os blocos compartilhados
+    for nome_bloco in blocos.values():
+        with pytest.raises(FileNotFoundError):
+            shared_memory.SharedMemory(name=nome_bloco)
@@ -0,0 +1,80 @@
+import itertools
+import numpy as np
+import pytest
+from instrumentacao import Estatisticas
+from solucao_exata import branch_and_bound, enumerar_rotas, forca_bruta, forca_bruta_paralela, held_karp
+
+# Ótimo e todas as rotas ótimas (começando em 0) por enumeração direta das permutações
+def enumeracao(distancias):
+    n = len(distancias)
+    custos = {}
+    for resto in itertools.permutations(range(1, n)):
+        rota = (0,) + resto
+        custos[rota] = sum(distancias[rota[i - 1]][rota[i]] for i in range(n))
+    menor = min(custos.values())
+    return menor, sorted(list(rota) for rota, custo in custos.items() if custo <= menor + 1e-9)
+
+# Instâncias pequenas: simétrica com muitos empates (Manhattan em grade inteira) e assimétrica
+def instancias(n):
+    rng = np.random.default_rng(n)
+    pontos = rng.integers(0, 5, (n, 2))
+    simetrica = np.abs(pontos[:, None, :] - pontos[None, :, :]).sum(axis=2).astype(np.float64)
+    assimetrica = rng.integers(1, 20, (n, n)).astype(np.float64)
+    np.fill_diagonal(assimetrica, 0)
+    return {'simetrica': simetrica, 'assimetrica': assimetrica}
+
+CASOS = [(n, tipo) for n in range(2, 9) for tipo in ('simetrica', 'assimetrica')]
+
+# A enumeração incremental gera cada rota uma vez, com o custo certo
+@pytest.mark.parametrize('n', [2, 4, 6])
+def test_enumerar_rotas(n):
+    distancias = instancias(n)['assimetrica']
+    rotas = {tuple(rota): custo for custo, rota in enumerar_rotas(distancias)}
+    assert len(rotas) == len(list(itertools.permutations(range(1, n))))
+    for rota, custo in rotas.items():
+        assert custo == pytest.approx(sum(distancias[rota[i - 1]][rota[i]] for i in range(n)))
+
+@pytest.mark.parametrize('n, tipo', CASOS)
+def test_forca_bruta(n, tipo):
+    distancias = instancias(n)[tipo]
+    menor, rotas = enumeracao(distancias)
+    custo, encontradas = forca_bruta(distancias)
+    assert custo == pytest.approx(menor)
+    assert sorted(encontradas) == rotas
+
+# O contador de avaliações conta as rotas completas: todas sem poda (custos iguais), menos com poda
+def test_forca_bruta_avaliacoes():
+    iguais = np.ones((7, 7)) - np.eye(7)
+    estatisticas = Estatisticas()
+    forca_bruta(iguais, estatisticas=estatisticas)
+    assert estatisticas.contadores['avaliacoes'] == len(list(itertools.permutations(range(1, 7))))
+    estatisticas = Estatisticas()
+    forca_bruta(instancias(7)['assimetrica'], estatisticas=estatisticas)
+    assert 0 < estatisticas.contadores['avaliacoes'] < len(list(itertools.permutations(range(1, 7))))
+
+@pytest.mark.parametrize('n, tipo', CASOS)
+def test_forca_bruta_paralela(n, tipo):
+    distancias = instancias(n)[tipo]
+    menor, rotas = enumeracao(distancias)
+    custo, encontradas, _ = forca_bruta_paralela(distancias, n_processos=1, tamanho=min(3, n))
+    assert custo == pytest.approx(menor)
+    assert sorted(encontradas) == rotas
+
+# Com processos de verdade, o resultado é o mesmo
+def test_forca_bruta_paralela_processos():
+    distancias = instancias(8)['assimetrica']
+    menor, rotas = enumeracao(distancias)
+    custo, encontradas, resultados = forca_bruta_paralela(distancias, n_processos=2)
+    assert custo == pytest.approx(menor)
+    assert sorted(encontradas) == rotas
+    assert len(resultados) > 1
+
+# Held-Karp e branch and bound devolvem o ótimo e todas as rotas empatadas com ele
+@pytest.mark.parametrize('resolvedor', [held_karp, branch_and_bound])
+@pytest.mark.parametrize('n, tipo', CASOS)
+def test_held_karp_branch_and_bound(resolvedor, n, tipo):
+    distancias = instancias(n)[tipo]
+    menor, rotas = enumeracao(distancias)
+    custo, encontradas = resolvedor(distancias)
+    assert custo == pytest.approx(menor)
+    assert sorted(encontradas) == rotas
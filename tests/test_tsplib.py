@@ -0,0 +1,88 @@
+import os
+import numpy as np
+import pytest
+from tsplib import caminho_cache, distancias_pares, ler_tsplib, matriz_distancias
+
+# ulysses16 (TSPLIB, GEO) e a rota ótima conhecida, de custo 6859
+ULYSSES16 = [(38.24, 20.42), (39.57, 26.15), (40.56, 25.32), (36.26, 23.12), (33.48, 10.54), (37.56, 12.19), (38.42, 13.11), (37.52, 20.44),
+             (41.23, 9.10), (41.17, 13.05), (36.08, -5.21), (38.47, 15.13), (38.15, 15.35), (37.51, 15.17), (35.49, 14.32), (39.36, 19.56)]
+OTIMA_ULYSSES16 = [1, 14, 13, 12, 7, 6, 15, 5, 11, 9, 10, 16, 3, 2, 4, 8]
+# Rota ótima do berlin52 (EUC_2D), de custo 7542
+OTIMA_BERLIN52 = [1, 49, 32, 45, 19, 41, 8, 9, 10, 43, 33, 51, 11, 52, 14, 13, 47, 26, 27, 28, 12, 25, 4, 6, 15, 5, 24, 48, 38, 37, 40, 39,
+                  36, 35, 34, 44, 46, 16, 29, 50, 20, 23, 30, 2, 7, 42, 21, 17, 3, 18, 31, 22]
+
+def escrever(caminho, coordenadas, tipo='EUC_2D', dimensao=None):
+    linhas = ['NAME: teste', 'TYPE: TSP', 'EDGE_WEIGHT_TYPE : %s' % tipo]
+    if dimensao is not None:
+        linhas.append('DIMENSION: %d' % dimensao)
+    linhas.append('NODE_COORD_SECTION')
+    linhas += ['%d %s %s' % (i + 1, x, y) for i, (x, y) in enumerate(coordenadas)]
+    linhas.append('EOF')
+    caminho.write_text('\n'.join(linhas) + '\n')
+    return str(caminho)
+
+def custo(distancias, rota):
+    rota = np.array(rota) - 1
+    return distancias[rota, np.roll(rota, -1)].sum()
+
+# Valores calculados à mão pelas fórmulas da especificação do TSPLIB
+@pytest.mark.parametrize('tipo, a, b, esperado', [
+    ('EUC_2D', (0, 0), (3, 4), 5), ('EUC_2D', (0, 0), (1, 1), 1), ('EUC_2D', (0, 0), (1.5, 0), 2),
+    ('CEIL_2D', (0, 0), (1, 1), 2), ('CEIL_2D', (0, 0), (3, 4), 5),
+    ('ATT', (0, 0), (10, 0), 4), ('ATT', (0, 0), (0, 30), 10), ('ATT', (0, 0), (30, 40), 16),
+])
+def test_distancias_conhecidas(tipo, a, b, esperado):
+    assert distancias_pares(np.array(a), np.array(b), tipo) == esperado
+
+def test_geo_ulysses16():
+    distancias = matriz_distancias(np.array(ULYSSES16), 'GEO')
+    assert np.all(np.diag(distancias) == 0)
+    assert np.array_equal(distancias, distancias.T)
+    assert custo(distancias, OTIMA_ULYSSES16) == 6859
+
+def test_berlin52(tmp_path):
+    origem = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'berlin52.tsp')
+    caminho = tmp_path / 'berlin52.tsp'
+    caminho.write_text(open(origem).read())
+    instancia = ler_tsplib(str(caminho))
+    assert (instancia.nome, instancia.dimensao, instancia.tipo_peso) == ('berlin52', 52, 'EUC_2D')
+    assert custo(matriz_distancias(instancia.coordenadas, instancia.tipo_peso), OTIMA_BERLIN52) == 7542
+
+# DIMENSION limita as linhas lidas; sem DIMENSION lê até o EOF; menos cidades que o declarado é erro
+def test_dimensao(tmp_path):
+    pontos = [(i, 2 * i) for i in range(6)]
+    assert ler_tsplib(escrever(tmp_path / 'a.tsp', pontos, dimensao=4), usar_cache=False).coordenadas.tolist() == [[i, 2 * i] for i in range(4)]
+    assert ler_tsplib(escrever(tmp_path / 'b.tsp', pontos), usar_cache=False).dimensao == 6
+    with pytest.raises(ValueError):
+        ler_tsplib(escrever(tmp_path / 'c.tsp', pontos, dimensao=8), usar_cache=False)
+
+def test_cabecalho_invalido(tmp_path):
+    with pytest.raises(ValueError):
+        ler_tsplib(escrever(tmp_path / 'a.tsp', [(0, 0)], tipo='EXPLICIT'), usar_cache=False)
+    caminho = tmp_path / 'b.tsp'
+    caminho.write_text('NAME: x\nDIMENSION: 1\nEOF\n')
+    with pytest.raises(ValueError):
+        ler_tsplib(str(caminho), usar_cache=False)
+
+# O cache ".npy" é criado, reaberto com memmap e descartado quando a instância fica mais nova ou muda de tamanho
+def test_cache_npy(tmp_path):
+    caminho = escrever(tmp_path / 'a.tsp', [(1, 2), (3, 4), (5, 6)], dimensao=3)
+    assert not isinstance(ler_tsplib(caminho, usar_cache=False).coordenadas, np.memmap)
+    assert not os.path.exists(caminho_cache(caminho))
+    primeira = ler_tsplib(caminho)
+    assert os.path.exists(caminho_cache(caminho))
+    segunda = ler_tsplib(caminho)
+    assert isinstance(segunda.coordenadas, np.memmap)
+    assert np.array_equal(primeira.coordenadas, segunda.coordenadas)
+
+    # Instância reescrita (mais nova que o cache): lida de novo
+    escrever(tmp_path / 'a.tsp', [(7, 8), (9, 10), (11, 12)], dimensao=3)
+    instante = os.path.getmtime(caminho_cache(caminho)) + 10
+    os.utime(caminho, (instante, instante))
+    assert ler_tsplib(caminho).coordenadas.tolist() == [[7, 8], [9, 10], [11, 12]]
+
+    # Cache com outra quantidade de cidades que o DIMENSION: ignorado mesmo sendo mais novo
+    np.save(caminho_cache(caminho), np.zeros((5, 2)))
+    instante = os.path.getmtime(caminho) + 10
+    os.utime(caminho_cache(caminho), (instante, instante))
+    assert ler_tsplib(caminho).coordenadas.tolist() == [[7, 8], [9, 10], [11, 12]]
@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+from enxame_de_particulas import GrafoCandidatos, PSO
+from tsplib import matriz_distancias
+from vizinhanca import DistanciasSobDemanda, vizinhos_da_matriz, vizinhos_mais_proximos
+
+# Distâncias dos k vizinhos mais próximos por força bruta (ordenadas)
+def distancias_bruto(coordenadas, k):
+    coordenadas = np.asarray(coordenadas, dtype=np.float64)
+    quadrado = ((coordenadas[:, None, :] - coordenadas[None, :, :]) ** 2).sum(axis=2)
+    np.fill_diagonal(quadrado, np.inf)
+    return np.sqrt(np.sort(quadrado, axis=1)[:, :k])
+
+RNG = np.random.default_rng(0)
+CASOS = {
+    'uniforme': RNG.uniform(0, 1000, (400, 2)),
+    'colineares_x': np.c_[RNG.uniform(0, 100, 300), np.zeros(300)],
+    'mesmo_x': np.c_[np.full(200, 7.0), RNG.uniform(0, 1, 200)],
+    'diagonal': np.c_[np.arange(150.0), np.arange(150.0)],
+    'coincidentes': np.zeros((40, 2)),
+    'repetidos': np.repeat(RNG.uniform(0, 10, (30, 2)), 4, axis=0),
+    'poucos_colineares': np.array([(0, 0), (5, 0), (9, 0), (12, 0)], dtype=np.float64),
+}
+
+# A grade devolve as mesmas distâncias que a busca exaustiva, inclusive com entradas degeneradas
+@pytest.mark.parametrize('nome', sorted(CASOS))
+def test_vizinhos_iguais_forca_bruta(nome):
+    coordenadas = CASOS[nome]
+    k = min(8, len(coordenadas) - 1)
+    vizinhos, distancias = vizinhos_mais_proximos(coordenadas, k)
+    assert vizinhos.shape == (len(coordenadas), k)
+    assert not (vizinhos == np.arange(len(coordenadas))[:, None]).any()
+    np.testing.assert_allclose(distancias, distancias_bruto(coordenadas, k))
+
+# A versão a partir da matriz concorda com a da grade
+def test_vizinhos_da_matriz():
+    coordenadas = CASOS['uniforme']
+    distancias = np.sqrt(((coordenadas[:, None, :] - coordenadas[None, :, :]) ** 2).sum(axis=2))
+    _, custos = vizinhos_da_matriz(distancias, 6)
+    np.testing.assert_allclose(custos, distancias_bruto(coordenadas, 6))
+
+# As distâncias sob demanda têm a mesma indexação da matriz
+def test_distancias_sob_demanda():
+    coordenadas = CASOS['uniforme'][:30]
+    matriz = np.sqrt(((coordenadas[:, None, :] - coordenadas[None, :, :]) ** 2).sum(axis=2))
+    sob_demanda = DistanciasSobDemanda(coordenadas)
+    assert sob_demanda[3, 7] == pytest.approx(matriz[3, 7])
+    rota = RNG.permutation(30)
+    np.testing.assert_allclose(sob_demanda[rota, np.roll(rota, -1)], matriz[rota, np.roll(rota, -1)])
+
+# O grafo de candidatos não aceita arestas novas
+def test_grafo_candidatos_somente_leitura():
+    grafo = GrafoCandidatos(CASOS['uniforme'][:20], k_vizinhos=5)
+    with pytest.raises(TypeError):
+        grafo.adicionarAresta(0, 1, 10)
+    assert grafo.existeAresta(0, 1) and not grafo.existeAresta(3, 3)
+
+# As distâncias sob demanda batem com a matriz densa em todos os tipos de peso, inclusive na diagonal
+@pytest.mark.parametrize('tipo_peso', ['EUC_2D', 'CEIL_2D', 'ATT', 'GEO'])
+def test_sob_demanda_igual_matriz(tipo_peso):
+    rng = np.random.default_rng(5)
+    coordenadas = np.c_[rng.uniform(-60, 60, 30), rng.uniform(-170, 170, 30)].round(2)
+    matriz = matriz_distancias(coordenadas, tipo_peso)
+    sob_demanda = DistanciasSobDemanda(coordenadas, tipo_peso)
+    indices = np.arange(30)
+    assert np.array_equal(sob_demanda[indices[:, None], indices[None, :]], matriz)
+    assert np.array_equal(sob_demanda[indices, indices], np.zeros(30))
+    for a, b in [(0, 0), (3, 7), (7, 3), (29, 29)]:
+        assert sob_demanda[a, b] == matriz[a, b]
+
+# Regressão: com GEO, o custo que o PSO acompanha pelo delta não se afasta do custo recalculado
+def test_pso_geo_custos_consistentes():
+    rng = np.random.default_rng(6)
+    coordenadas = np.c_[rng.uniform(30, 50, 60), rng.uniform(-10, 20, 60)].round(2)
+    pso = PSO(GrafoCandidatos(coordenadas, 5, 'GEO'), 20, 30, 0.3, 0.5, semente=0)
+    pso.ELEMENTOS_POR_PASSO = 0
+    pso.executar()
+    assert np.allclose(pso.custos, pso.custosCaminhos(pso.posicoes))
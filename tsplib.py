@@ -0,0 +1,159 @@
+import os
+from typing import NamedTuple, Optional
+import numpy as np
+
+# Leitor de instâncias TSPLIB compartilhado pelo algoritmo genético e pelo PSO.
+# As coordenadas são lidas linha a linha direto para um array NumPy e guardadas
+# num arquivo ".npy" ao lado da instância, que nas próximas execuções é aberto
+# com memmap em vez de ser lido de novo.
+
+TIPOS_SUPORTADOS = ('EUC_2D', 'CEIL_2D', 'ATT', 'GEO')
+
+# Raio da Terra e valor de PI definidos pela especificação do TSPLIB
+RAIO_TERRA = 6378.388
+PI_TSPLIB = 3.141592
+
+# Representa uma instância lida
+class InstanciaTSP(NamedTuple):
+    nome: str
+    dimensao: int
+    tipo_peso: str
+    coordenadas: np.ndarray
+
+# Lê as linhas de cabeçalho "CHAVE : VALOR" até o início da seção de coordenadas
+def ler_cabecalho(arquivo) -> dict:
+    cabecalho = {}
+    for linha in arquivo:
+        linha = linha.strip()
+        if not linha:
+            continue
+        if linha.startswith('NODE_COORD_SECTION'):
+            break
+        if linha.startswith('EOF'):
+            raise ValueError('Arquivo TSPLIB sem NODE_COORD_SECTION')
+        chave, _, valor = linha.partition(':')
+        cabecalho[chave.strip().upper()] = valor.strip()
+    else:
+        raise ValueError('Arquivo TSPLIB sem NODE_COORD_SECTION')
+    return cabecalho
+
+# Lê a seção de coordenadas linha a linha, sem carregar o arquivo inteiro na memória
+def ler_coordenadas(arquivo, dimensao: Optional[int]) -> np.ndarray:
+    if dimensao is None:
+        coordenadas = []
+        for linha in arquivo:
+            partes = linha.split()
+            if not partes or partes[0] == 'EOF':
+                break
+            coordenadas.append((float(partes[1]), float(partes[2])))
+        return np.array(coordenadas, dtype=np.float64).reshape(-1, 2)
+
+    coordenadas = np.empty((dimensao, 2), dtype=np.float64)
+    lidos = 0
+    for linha in arquivo:
+        if lidos == dimensao:
+            break
+        partes = linha.split()
+        if not partes:
+            continue
+        if partes[0] == 'EOF':
+            break
+        coordenadas[lidos, 0] = float(partes[1])
+        coordenadas[lidos, 1] = float(partes[2])
+        lidos += 1
+    if lidos != dimensao:
+        raise ValueError('DIMENSION indica %d cidades, mas foram lidas %d' % (dimensao, lidos))
+    return coordenadas
+
+# Caminho do arquivo de cache binário de uma instância
+def caminho_cache(caminho: str) -> str:
+    return caminho + '.npy'
+
+# Lê uma instância TSPLIB, usando (e criando) o cache ".npy" quando "usar_cache" é verdadeiro
+def ler_tsplib(caminho: str, usar_cache: bool = True) -> InstanciaTSP:
+    with open(caminho) as arquivo:
+        cabecalho = ler_cabecalho(arquivo)
+        tipo_peso = cabecalho.get('EDGE_WEIGHT_TYPE', 'EUC_2D').upper()
+        if tipo_peso not in TIPOS_SUPORTADOS:
+            raise ValueError('EDGE_WEIGHT_TYPE não suportado: %s' % tipo_peso)
+        dimensao = int(cabecalho['DIMENSION']) if 'DIMENSION' in cabecalho else None
+        nome = cabecalho.get('NAME', os.path.splitext(os.path.basename(caminho))[0])
+
+        arquivo_cache = caminho_cache(caminho)
+        coordenadas = None
+        if usar_cache and os.path.exists(arquivo_cache) \
+                and os.path.getmtime(arquivo_cache) >= os.path.getmtime(caminho):
+            coordenadas = np.load(arquivo_cache, mmap_mode='r')
+            if coordenadas.ndim != 2 or coordenadas.shape[1] != 2 \
+                    or (dimensao is not None and coordenadas.shape[0] != dimensao):
+                coordenadas = None
+
+        if coordenadas is None:
+            coordenadas = ler_coordenadas(arquivo, dimensao)
+            if usar_cache:
+                salvar_cache(arquivo_cache, coordenadas)
+
+    return InstanciaTSP(nome, len(coordenadas), tipo_peso, coordenadas)
+
+# Grava o cache de forma atômica, para que outra execução nunca leia um arquivo pela metade
+def salvar_cache(arquivo_cache: str, coordenadas: np.ndarray) -> None:
+    temporario = arquivo_cache + '.tmp.npy'
+    try:
+        np.save(temporario, coordenadas)
+        os.replace(temporario, arquivo_cache)
+    except OSError:
+        # Diretório somente leitura: segue sem cache
+        if os.path.exists(temporario):
+            os.remove(temporario)
+
+# Converte coordenadas GEO (graus.minutos) para radianos, como na especificação do TSPLIB
+def _geo_para_radianos(valores: np.ndarray) -> np.ndarray:
+    graus = np.trunc(valores)
+    minutos = valores - graus
+    return PI_TSPLIB * (graus + 5.0 * minutos / 3.0) / 180.0
+
+# Calcula as distâncias TSPLIB entre os pontos "a" (..., 2) e "b" (..., 2), elemento a elemento,
+# com broadcasting entre as dimensões iniciais
+# Se "tipo_peso" for None, devolve a distância euclidiana sem arredondamento
+def distancias_pares(a: np.ndarray, b: np.ndarray, tipo_peso: Optional[str] = 'EUC_2D') -> np.ndarray:
+    a = np.asarray(a, dtype=np.float64)
+    b = np.asarray(b, dtype=np.float64)
+    if tipo_peso == 'GEO':
+        lat_a, lon_a = _geo_para_radianos(a[..., 0]), _geo_para_radianos(a[..., 1])
+        lat_b, lon_b = _geo_para_radianos(b[..., 0]), _geo_para_radianos(b[..., 1])
+        q1 = np.cos(lon_a - lon_b)
+        q2 = np.cos(lat_a - lat_b)
+        q3 = np.cos(lat_a + lat_b)
+        cosseno = np.clip(0.5 * ((1.0 + q1) * q2 - (1.0 - q1) * q3), -1.0, 1.0)
+        return np.trunc(RAIO_TERRA * np.arccos(cosseno) + 1.0)
+
+    quadrado = (a[..., 0] - b[..., 0]) ** 2 + (a[..., 1] - b[..., 1]) ** 2
+    if tipo_peso is None:
+        return np.sqrt(quadrado)
+    if tipo_peso == 'EUC_2D':
+        return np.floor(np.sqrt(quadrado) + 0.5)
+    if tipo_peso == 'CEIL_2D':
+        return np.ceil(np.sqrt(quadrado))
+    if tipo_peso == 'ATT':
+        r = np.sqrt(quadrado / 10.0)
+        t = np.floor(r + 0.5)
+        return np.where(t < r, t + 1.0, t)
+    raise ValueError('EDGE_WEIGHT_TYPE não suportado: %s' % tipo_peso)
+
+# Calcula as distâncias TSPLIB entre cada ponto de "origem" (m, 2) e cada ponto de "destino" (n, 2)
+def distancias_entre(origem: np.ndarray, destino: np.ndarray, tipo_peso: Optional[str] = 'EUC_2D') -> np.ndarray:
+    origem = np.asarray(origem, dtype=np.float64)
+    destino = np.asarray(destino, dtype=np.float64)
+    return distancias_pares(origem[:, None, :], destino[None, :, :], tipo_peso)
+
+# Monta a matriz completa de distâncias em blocos de linhas
+# "saida", se informado, é o array (n, n) preenchido no lugar (ex.: um bloco de memória compartilhada)
+def matriz_distancias(coordenadas: np.ndarray, tipo_peso: Optional[str] = 'EUC_2D', dtype=np.float64, tamanho_bloco: int = 1024,
+                      saida: Optional[np.ndarray] = None) -> np.ndarray:
+    n = len(coordenadas)
+    matriz = np.empty((n, n), dtype=dtype) if saida is None else saida
+    for inicio in range(0, n, tamanho_bloco):
+        matriz[inicio:inicio + tamanho_bloco] = distancias_entre(coordenadas[inicio:inicio + tamanho_bloco], coordenadas, tipo_peso)
+    # GEO não zera a diagonal sozinho (acos(1) + 1 arredondado)
+    np.fill_diagonal(matriz, 0)
+    return matriz
@@ -0,0 +1,127 @@
+import math
+from typing import Optional, Tuple
+import numpy as np
+from tsplib import distancias_pares
+
+# Listas de candidatos com os k vizinhos mais próximos de cada cidade.
+# O índice espacial é uma grade uniforme (bucketing) sobre as coordenadas: cada
+# cidade só é comparada com as cidades das células ao redor da sua, então nenhuma
+# matriz n x n é alocada.
+
+# Distâncias de um grafo completo calculadas sob demanda a partir das coordenadas.
+# Aceita a mesma indexação da matriz NumPy (distancias[a, b], inclusive com arrays
+# de índices), então pode substituir a matriz em avaliar_pop, movimentos e Grafo.
+class DistanciasSobDemanda:
+
+    def __init__(self, coordenadas, tipo_peso: Optional[str] = None):
+        self.coordenadas = np.asarray(coordenadas, dtype=np.float64)
+        self.tipo_peso = tipo_peso
+        self.shape = (len(self.coordenadas), len(self.coordenadas))
+        self.dtype = np.dtype(np.float64)
+
+    def __len__(self):
+        return self.shape[0]
+
+    def __getitem__(self, indices):
+        a, b = indices
+        # Caminho rápido para um único par (movimentos delta)
+        if isinstance(a, (int, np.integer)) and isinstance(b, (int, np.integer)) and self.tipo_peso in (None, 'EUC_2D'):
+            xa, ya = self.coordenadas[a]
+            xb, yb = self.coordenadas[b]
+            distancia = math.sqrt((xa - xb) ** 2 + (ya - yb) ** 2)
+            return distancia if self.tipo_peso is None else math.floor(distancia + 0.5)
+        distancias = distancias_pares(self.coordenadas[a], self.coordenadas[b], self.tipo_peso)
+        # GEO não dá zero de uma cidade para ela mesma (acos(1) + 1 truncado): zera como matriz_distancias
+        if self.tipo_peso == 'GEO':
+            distancias = np.where(np.equal(a, b), 0.0, distancias)
+        return distancias
+
+# Calcula os "k" vizinhos mais próximos de cada cidade usando uma grade uniforme
+# Retorna (vizinhos, distancias), dois arrays (n, k) ordenados do mais próximo para o mais distante
+# A busca na grade usa a distância euclidiana no plano; as distâncias devolvidas seguem "tipo_peso"
+def vizinhos_mais_proximos(coordenadas, k: int, tipo_peso: Optional[str] = None, pontos_por_celula: float = 2.0) -> Tuple[np.ndarray, np.ndarray]:
+    coordenadas = np.asarray(coordenadas, dtype=np.float64)
+    n = len(coordenadas)
+    k = min(k, n - 1)
+    vizinhos = np.empty((n, max(k, 0)), dtype=np.int32)
+    if k <= 0:
+        return vizinhos, np.empty((n, 0))
+
+    # Dimensiona a grade para ter em média "pontos_por_celula" cidades por célula
+    # O lado nunca é menor que a maior extensão dividida pelo número de células: com pontos colineares
+    # (ou todos com o mesmo x / y) a área é nula e a grade vira uma única faixa de no máximo n_celulas células
+    minimo = coordenadas.min(axis=0)
+    extensao = coordenadas.max(axis=0) - minimo
+    n_celulas = max(1, int(n / pontos_por_celula))
+    maior = float(extensao.max())
+    lado = max(math.sqrt(extensao[0] * extensao[1] / n_celulas), maior / n_celulas) if maior > 0 else 1.0
+    colunas = max(1, int(math.ceil(extensao[0] / lado)))
+    linhas = max(1, int(math.ceil(extensao[1] / lado)))
+    celula_x = np.minimum(((coordenadas[:, 0] - minimo[0]) / lado).astype(np.int64), colunas - 1)
+    celula_y = np.minimum(((coordenadas[:, 1] - minimo[1]) / lado).astype(np.int64), linhas - 1)
+
+    # Ordena as cidades por célula (estrutura CSR): cidades da célula c ficam em ordem[inicio[c]:inicio[c + 1]]
+    id_celula = celula_y * colunas + celula_x
+    ordem = np.argsort(id_celula, kind='stable')
+    inicio = np.searchsorted(id_celula[ordem], np.arange(colunas * linhas + 1))
+
+    def cidades_do_anel(cx, cy, raio):
+        blocos = []
+        for y in range(cy - raio, cy + raio + 1):
+            if y < 0 or y >= linhas:
+                continue
+            # Linhas de cima e de baixo do anel inteiras, nas demais só as duas pontas
+            if abs(y - cy) == raio:
+                xs = range(max(cx - raio, 0), min(cx + raio, colunas - 1) + 1)
+            else:
+                xs = [x for x in (cx - raio, cx + raio) if 0 <= x < colunas]
+            for x in xs:
+                c = y * colunas + x
+                if inicio[c] < inicio[c + 1]:
+                    blocos.append(ordem[inicio[c]:inicio[c + 1]])
+        return blocos
+
+    for c in np.unique(id_celula):
+        cidades = ordem[inicio[c]:inicio[c + 1]]
+        cx, cy = int(c % colunas), int(c // colunas)
+        candidatos = []
+        raio = 0
+        while True:
+            candidatos.extend(cidades_do_anel(cx, cy, raio))
+            total = sum(len(b) for b in candidatos)
+            esgotado = raio > max(colunas, linhas)
+            if total > k or esgotado:
+                conjunto = np.concatenate(candidatos)
+                quadrado = ((coordenadas[cidades, None, :] - coordenadas[None, conjunto, :]) ** 2).sum(axis=2)
+                quadrado[cidades[:, None] == conjunto[None, :]] = np.inf
+                # O k-ésimo vizinho é garantido quando está dentro do raio já varrido pela grade
+                k_esimo = np.partition(quadrado, k - 1, axis=1)[:, k - 1]
+                if esgotado or np.sqrt(k_esimo.max()) <= raio * lado:
+                    break
+            raio += 1
+        melhores = np.argpartition(quadrado, k - 1, axis=1)[:, :k]
+        melhores_quadrado = np.take_along_axis(quadrado, melhores, axis=1)
+        melhores = np.take_along_axis(melhores, np.argsort(melhores_quadrado, axis=1, kind='stable'), axis=1)
+        vizinhos[cidades] = conjunto[melhores]
+
+    distancias = distancias_pares(coordenadas[:, None, :], coordenadas[vizinhos], tipo_peso)
+    return vizinhos, distancias
+
+# Calcula os "k" vizinhos mais próximos a partir de uma matriz de distâncias já existente
+def vizinhos_da_matriz(distancias: np.ndarray, k: int, tamanho_bloco: int = 1024) -> Tuple[np.ndarray, np.ndarray]:
+    n = len(distancias)
+    k = min(k, n - 1)
+    vizinhos = np.empty((n, max(k, 0)), dtype=np.int32)
+    custos = np.empty((n, max(k, 0)))
+    if k <= 0:
+        return vizinhos, custos
+    for inicio in range(0, n, tamanho_bloco):
+        bloco = np.array(distancias[inicio:inicio + tamanho_bloco], dtype=np.float64)
+        linhas = np.arange(len(bloco))
+        bloco[linhas, linhas + inicio] = np.inf
+        melhores = np.argpartition(bloco, k - 1, axis=1)[:, :k]
+        melhores_custos = np.take_along_axis(bloco, melhores, axis=1)
+        ordem = np.argsort(melhores_custos, axis=1, kind='stable')
+        vizinhos[inicio:inicio + tamanho_bloco] = np.take_along_axis(melhores, ordem, axis=1)
+        custos[inicio:inicio + tamanho_bloco] = np.take_along_axis(melhores_custos, ordem, axis=1)
+    return vizinhos, custos